@@ -0,0 +1,338 @@
+"""Benchmark chartroom's loaders and renderers on synthetic datasets.
+
+Usage:
+    python benchmarks/bench.py [--sizes 1e3,1e4,1e5] [-o results.json]
+    python benchmarks/bench.py --baseline benchmarks/baseline.json
+
+Generates CSV, TSV, JSON, JSONL and SQLite datasets of each size (cached in
+benchmarks/data/), times every loader in chartroom.io and every chart type,
+records peak memory with tracemalloc and writes the results as JSON. Given
+a baseline results file it exits with status 1 if anything got slower or
+used more memory than the threshold allows.
+"""
+
+import csv
+import datetime
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import click
+
+from chartroom.cache import _version
+from chartroom.cli import CHART_TYPES
+from chartroom.io import (
+    load_rows_from_csv,
+    load_rows_from_json,
+    load_rows_from_jsonl,
+    load_rows_from_sql,
+    load_rows_from_tsv,
+)
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+FIELDS = ("index", "name", "category", "value", "score")
+FORMATS = ("csv", "tsv", "json", "jsonl", "sqlite")
+
+# Columns each chart type is rendered with, as (x, y_cols)
+CHART_COLUMNS = {
+    "bar": ("name", ["value"]),
+    "line": ("index", ["value", "score"]),
+    "scatter": ("value", ["score"]),
+    "pie": ("name", ["value"]),
+    "histogram": (None, ["score"]),
+}
+
+# One bar or slice per row stops being meaningful (and takes minutes)
+# long before the other chart types run out of steam
+CHART_MAX_ROWS = {"bar": 10_000, "pie": 1_000}
+
+
+def _generate_rows(count, seed=0):
+    rng = random.Random(seed)
+    categories = [f"category{i}" for i in range(20)]
+    for i in range(count):
+        yield {
+            "index": i,
+            "name": f"item{i}",
+            "category": rng.choice(categories),
+            "value": rng.randint(0, 1000),
+            "score": round(rng.gauss(50, 15), 3),
+        }
+
+
+def _write_delimited(path, rows, delimiter):
+    with open(path, "w", newline="", encoding="utf-8") as fp:
+        writer = csv.DictWriter(fp, FIELDS, delimiter=delimiter)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _write_json(path, rows):
+    with open(path, "w", encoding="utf-8") as fp:
+        fp.write("[")
+        for i, row in enumerate(rows):
+            fp.write(",\n" if i else "\n")
+            fp.write(json.dumps(row))
+        fp.write("\n]\n")
+
+
+def _write_jsonl(path, rows):
+    with open(path, "w", encoding="utf-8") as fp:
+        for row in rows:
+            fp.write(json.dumps(row) + "\n")
+
+
+def _write_sqlite(path, rows):
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(
+            "create table data ([index] integer, name text, category text, "
+            "value integer, score real)"
+        )
+        conn.executemany(
+            "insert into data values (:index, :name, :category, :value, :score)",
+            rows,
+        )
+    conn.close()
+
+
+WRITERS = {
+    "csv": lambda path, rows: _write_delimited(path, rows, ","),
+    "tsv": lambda path, rows: _write_delimited(path, rows, "\t"),
+    "json": _write_json,
+    "jsonl": _write_jsonl,
+    "sqlite": _write_sqlite,
+}
+
+
+def dataset_path(data_dir, size, fmt):
+    """Path of the dataset of size rows in fmt, generating it if missing."""
+    extension = "db" if fmt == "sqlite" else fmt
+    path = os.path.join(data_dir, f"rows-{size}.{extension}")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        tmp_path = path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        WRITERS[fmt](tmp_path, _generate_rows(size))
+        os.replace(tmp_path, path)
+    return path
+
+
+def _file_loader(load_fn):
+    def load(path):
+        with open(path, "rb") as fp:
+            return load_fn(fp)
+
+    return load
+
+
+LOADERS = {
+    "csv": _file_loader(load_rows_from_csv),
+    "tsv": _file_loader(load_rows_from_tsv),
+    "json": _file_loader(load_rows_from_json),
+    "jsonl": _file_loader(load_rows_from_jsonl),
+    "sqlite": lambda path: load_rows_from_sql(path, "select * from data"),
+}
+
+
+def measure(fn, repeat=3, memory=True):
+    """Time fn, then run it once more under tracemalloc for its peak memory."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    result = {
+        "seconds": min(timings),
+        "median_seconds": statistics.median(timings),
+    }
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_benchmarks(sizes, formats, charts, data_dir, repeat=3, memory=True, log=None):
+    """Run the benchmarks, returning a list of result dictionaries."""
+    log = log or (lambda message: None)
+    results = []
+
+    def record(benchmark, size, fn):
+        log(f"{benchmark} ({size:,} rows)")
+        results.append(
+            {"benchmark": benchmark, "rows": size, **measure(fn, repeat, memory)}
+        )
+
+    if charts:
+        # Keep the one-off matplotlib import out of the first measurement
+        import chartroom.charts  # noqa: F401
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, "chart.png")
+        for size in sizes:
+            for fmt in formats:
+                path = dataset_path(data_dir, size, fmt)
+                record(f"load_{fmt}", size, lambda: LOADERS[fmt](path))
+            if not charts:
+                continue
+            # Render rows as the CLI would see them, with CSV's string values
+            rows = LOADERS["csv"](dataset_path(data_dir, size, "csv"))
+            for chart_type in charts:
+                if size > CHART_MAX_ROWS.get(chart_type, size):
+                    log(f"render_{chart_type} ({size:,} rows) skipped")
+                    continue
+                x_col, y_cols = CHART_COLUMNS[chart_type]
+                render_fn = CHART_TYPES[chart_type]
+                record(
+                    f"render_{chart_type}",
+                    size,
+                    lambda: render_fn(rows, x_col, y_cols, output_path),
+                )
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Compare results against a baseline, returning a list of regressions.
+
+    Each regression is a dictionary naming the benchmark, the metric and how
+    much it grew relative to the baseline.
+    """
+    previous = {(r["benchmark"], r["rows"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = previous.get((result["benchmark"], result["rows"]))
+        if old is None:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            if not old.get(metric) or metric not in result:
+                continue
+            change = result[metric] / old[metric] - 1
+            if change > threshold:
+                regressions.append(
+                    {
+                        "benchmark": result["benchmark"],
+                        "rows": result["rows"],
+                        "metric": metric,
+                        "baseline": old[metric],
+                        "value": result[metric],
+                        "change": round(change, 4),
+                    }
+                )
+    return regressions
+
+
+def _parse_list(value, choices=None, cast=str):
+    items = [cast(item.strip()) for item in value.split(",") if item.strip()]
+    if choices is not None:
+        unknown = [item for item in items if item not in choices]
+        if unknown:
+            raise click.BadParameter(
+                f"unknown value(s) {', '.join(unknown)}, "
+                f"choose from {', '.join(choices)}"
+            )
+    return items
+
+
+@click.command()
+@click.option(
+    "--sizes",
+    default="1e3,1e4,1e5",
+    help="Comma-separated dataset sizes in rows, e.g. 1e3,1e4,1e7",
+)
+@click.option(
+    "--formats",
+    default=",".join(FORMATS),
+    help="Comma-separated input formats to benchmark loading",
+)
+@click.option(
+    "--charts",
+    default=",".join(CHART_COLUMNS),
+    help="Comma-separated chart types to benchmark rendering (empty for none)",
+)
+@click.option("--repeat", default=3, type=click.IntRange(min=1), help="Timed runs")
+@click.option("--no-memory", is_flag=True, help="Skip the tracemalloc peak memory runs")
+@click.option(
+    "--data-dir",
+    default=DEFAULT_DATA_DIR,
+    type=click.Path(file_okay=False),
+    help="Where generated datasets are cached",
+)
+@click.option(
+    "-o", "--output", type=click.File("w"), default="-", help="Write results JSON here"
+)
+@click.option(
+    "--baseline",
+    type=click.File("r"),
+    default=None,
+    help="Results JSON from a previous run to check for regressions",
+)
+@click.option(
+    "--threshold",
+    default=0.25,
+    type=float,
+    help="Allowed slowdown or memory growth over the baseline, 0.25 = 25%",
+)
+def cli(
+    sizes, formats, charts, repeat, no_memory, data_dir, output, baseline, threshold
+):
+    """Benchmark chartroom loaders and renderers."""
+    try:
+        size_list = _parse_list(sizes, cast=lambda s: int(float(s)))
+    except ValueError:
+        raise click.BadParameter("sizes must be numbers", param_hint="--sizes")
+    format_list = _parse_list(formats, FORMATS)
+    chart_list = _parse_list(charts, list(CHART_COLUMNS))
+
+    def log(message):
+        click.echo(message, err=True)
+
+    results = run_benchmarks(
+        size_list,
+        format_list,
+        chart_list,
+        data_dir,
+        repeat=repeat,
+        memory=not no_memory,
+        log=log,
+    )
+    document = {
+        "meta": {
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "chartroom": _version("chartroom"),
+            "matplotlib": _version("matplotlib"),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+    output.write(json.dumps(document, indent=2) + "\n")
+
+    if baseline is not None:
+        regressions = compare(results, json.load(baseline), threshold)
+        for regression in regressions:
+            log(
+                "REGRESSION {benchmark} ({rows:,} rows) {metric}: "
+                "{baseline:.6g} -> {value:.6g} (+{percent:.1f}%)".format(
+                    percent=regression["change"] * 100, **regression
+                )
+            )
+        if regressions:
+            sys.exit(1)
+        log(f"No regressions over {threshold:.0%} against the baseline")
+
+
+if __name__ == "__main__":
+    cli()
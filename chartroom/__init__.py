@@ -0,0 +1,3 @@
+from chartroom.api import render
+
+__all__ = ["render"]
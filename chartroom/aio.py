@@ -0,0 +1,125 @@
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+
+from chartroom.pool import RenderTimeout, make_pool, resolve_jobs, time_limit
+
+
+def _close_figures():
+    import matplotlib.pyplot as plt
+
+    plt.close("all")
+
+
+def _render_data(kind, data, options, timeout):
+    """Render in-memory data with chartroom.render() in a worker process."""
+    from chartroom.api import render
+
+    try:
+        with time_limit(timeout):
+            return render(kind, data, **options)
+    except RenderTimeout:
+        _close_figures()
+        raise
+
+
+def _render_spec(spec, timeout):
+    """Load and render a chart spec in a worker process, returning (path, alt)."""
+    from chartroom.cli import _render_spec
+
+    try:
+        with time_limit(timeout):
+            result = _render_spec(spec)
+    except RenderTimeout:
+        _close_figures()
+        raise
+    return result["path"], result["alt"]
+
+
+class AsyncRenderer:
+    """Render charts from asyncio code without blocking the event loop.
+
+    Loading and rendering run in a pool of warm worker processes, as
+    matplotlib's pyplot interface is not thread-safe. At most max_pending
+    renders (default twice the number of workers) are queued or running at
+    once; further calls wait for a slot, so a burst of requests cannot pile
+    up copies of their data in the pool. A render that takes longer than
+    timeout seconds (0 for no limit) raises asyncio.TimeoutError, and
+    cancelling the awaiting task cancels the render if it has not started.
+    """
+
+    def __init__(
+        self,
+        jobs: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        timeout: float = 30.0,
+    ):
+        self.jobs = resolve_jobs(jobs)
+        self.max_pending = max_pending or self.jobs * 2
+        self.timeout = timeout
+        self._pool = None
+        self._start_lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(self.max_pending)
+
+    async def start(self):
+        """Start the worker pool, if it is not already running."""
+        async with self._start_lock:
+            if self._pool is None:
+                loop = asyncio.get_running_loop()
+                self._pool = await loop.run_in_executor(None, make_pool, self.jobs)
+
+    async def close(self):
+        """Shut down the worker pool, cancelling renders that have not started."""
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _run(self, fn, args, timeout):
+        await self.start()
+        if timeout is None:
+            timeout = self.timeout
+        loop = asyncio.get_running_loop()
+        await self._slots.acquire()
+        try:
+            future = self._pool.submit(fn, *args, timeout)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        # The slot is only freed once the worker is done with the render, so
+        # renders whose callers timed out or were cancelled still count
+        def release(_):
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._slots.release)
+
+        future.add_done_callback(release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or None)
+        except RenderTimeout as e:
+            raise asyncio.TimeoutError(str(e)) from e
+
+    async def render(
+        self, kind: str, data, timeout: Optional[float] = None, **options: Any
+    ) -> Tuple[bytes, str]:
+        """Render in-memory data, returning (image_bytes, alt_text).
+
+        Takes the same arguments as chartroom.render(). data is pickled to
+        the worker process.
+        """
+        return await self._run(_render_data, (kind, data, options), timeout)
+
+    async def render_spec(
+        self, spec: Dict[str, Any], timeout: Optional[float] = None
+    ) -> Tuple[str, str]:
+        """Load and render a chart spec, returning (path, alt_text).
+
+        spec uses the same fields as a line of "chartroom batch" input,
+        including "file" or "sql" for the data and "output" for the image.
+        """
+        return await self._run(_render_spec, (spec,), timeout)
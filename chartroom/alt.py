@@ -0,0 +1,149 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from chartroom.stats import Summary, summarize
+
+TYPE_LABELS = {
+    "bar": "Bar chart",
+    "line": "Line chart",
+    "scatter": "Scatter plot",
+    "pie": "Pie chart",
+    "histogram": "Histogram",
+}
+
+
+def fmt_num(val):
+    """Format a number: drop trailing .0 for clean display."""
+    if isinstance(val, float) and val == int(val):
+        return str(int(val))
+    return str(val)
+
+
+def generate_alt_text(
+    chart_type: str,
+    count: int,
+    x_col: Optional[str],
+    y_cols: List[str],
+    summary: Optional[Summary] = None,
+    label: Optional[Callable[[int], Any]] = None,
+    title: Optional[str] = None,
+) -> str:
+    """Generate descriptive alt text for a chart of count data points.
+
+    summary is the stats.Summary of the column being described, y_cols[0],
+    and label(i) returns the x label for index i of its values. If title is
+    set, it is prepended: "Title. Generated description".
+    """
+    description = _describe_chart(chart_type, count, x_col, y_cols, summary, label)
+    if title:
+        return f"{title}. {description}"
+    return description
+
+
+def rows_alt_text(
+    chart_type: str,
+    rows: Sequence[Dict[str, Any]],
+    x_col: Optional[str],
+    y_cols: List[str],
+    title: Optional[str] = None,
+    summaries: Optional[Dict[str, Summary]] = None,
+) -> str:
+    """Generate alt text for a chart rendered from rows.
+
+    summaries maps column names to the stats.Summary the renderer computed
+    for them, which saves converting and scanning those columns again.
+    """
+    summary = None
+    kept_rows = rows
+    if y_cols:
+        label_col = x_col if chart_type == "pie" else None
+        summary, kept_rows = _column_summary(rows, y_cols[0], summaries, label_col)
+
+    def label(i):
+        return kept_rows[i].get(x_col, "")
+
+    return generate_alt_text(
+        chart_type, len(rows), x_col, y_cols, summary, label, title=title
+    )
+
+
+def _column_summary(rows, col, summaries, label_col=None):
+    """Return (summary, summarized_rows) for a numeric column.
+
+    summarized_rows are the rows the summary's indexes refer to. Without a
+    summary from the renderer, rows whose value (or label_col) is missing
+    or not a number are skipped.
+    """
+    if summaries and col in summaries:
+        return summaries[col], rows
+    kept_rows = []
+    values = []
+    for r in rows:
+        if label_col is not None and label_col not in r:
+            continue
+        try:
+            value = float(r[col])
+        except (ValueError, TypeError, KeyError):
+            continue
+        kept_rows.append(r)
+        values.append(value)
+    return summarize(values), kept_rows
+
+
+def _describe_chart(chart_type, n, x_col, y_cols, summary, label):
+    """Build a data-driven description of the chart."""
+    chart_label = TYPE_LABELS.get(chart_type, "Chart")
+
+    if chart_type == "histogram":
+        col = y_cols[0] if y_cols else "values"
+        if summary is not None and summary.count:
+            if n <= 6:
+                formatted = ", ".join(fmt_num(v) for v in summary.values)
+                return f"{chart_label} of {col} values: {formatted}"
+            return (
+                f"{chart_label} of {summary.count} {col} values "
+                f"ranging from {fmt_num(summary.min)} to {fmt_num(summary.max)}"
+            )
+        return f"{chart_label} of {col}"
+
+    if chart_type == "pie":
+        if x_col and summary is not None:
+            total = summary.total
+            if summary.count and total > 0:
+                if n <= 6:
+                    indexes = range(summary.count)
+                else:
+                    indexes = summary.top
+                parts = []
+                for i in indexes:
+                    pct = summary.values[i] / total * 100
+                    parts.append(f"{label(i)} ({pct:.0f}%)")
+                if n <= 6:
+                    return f"{chart_label} showing {', '.join(parts)}"
+                return f"{chart_label} of {n} categories. Largest: {', '.join(parts)}"
+        return f"{chart_label} of {x_col or 'categories'}"
+
+    # bar, line, scatter — numeric y columns
+    if x_col and summary is not None and summary.count:
+        y_col = y_cols[0]
+        if n <= 6:
+            parts = [
+                f"{label(i)}: {fmt_num(val)}" for i, val in enumerate(summary.values)
+            ]
+            series_note = ""
+            if len(y_cols) > 1:
+                series_note = f" and {len(y_cols) - 1} more series"
+            return (
+                f"{chart_label} of {y_col} by {x_col} \u2014 "
+                f"{', '.join(parts)}{series_note}"
+            )
+        series_note = ""
+        if len(y_cols) > 1:
+            series_note = f" ({len(y_cols)} series)"
+        return (
+            f"{chart_label} of {y_col} by {x_col}{series_note}. "
+            f"{n} points, ranging from {fmt_num(summary.min)} "
+            f"({label(summary.argmin)}) "
+            f"to {fmt_num(summary.max)} ({label(summary.argmax)})"
+        )
+
+    return chart_label
@@ -0,0 +1,127 @@
+import io
+from typing import Any, Callable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from chartroom.alt import fmt_num, generate_alt_text
+from chartroom.io import resolve_column_names
+from chartroom.stats import to_float
+
+CHART_KINDS = ("bar", "line", "scatter", "pie", "histogram")
+
+
+def _columns(data) -> Tuple[List[str], Callable[[str], Any]]:
+    """Return (column names, getter returning one column by name) for data.
+
+    DataFrames (pandas, polars or anything else with .columns), NumPy
+    structured arrays and mappings of names to arrays return their columns
+    as they are. A list of row dictionaries is read column by column.
+    """
+    if isinstance(data, list):
+        if not data:
+            raise ValueError("No data rows found")
+        return list(data[0].keys()), lambda name: [row[name] for row in data]
+    names = getattr(data, "columns", None)
+    if names is None:
+        names = getattr(getattr(data, "dtype", None), "names", None)
+    if names is None and isinstance(data, Mapping):
+        names = data.keys()
+    if names is None:
+        raise TypeError(
+            "data must be a DataFrame, a NumPy structured array, a mapping of "
+            "column names to arrays or a list of row dictionaries"
+        )
+    return list(names), data.__getitem__
+
+
+def _numeric(column, name: str):
+    """Return column as a float64 array, without copying if it already is one.
+
+    np.asarray uses the column's __array__ or buffer protocol, so float64
+    NumPy arrays and DataFrame columns are passed to matplotlib as views.
+    """
+    import numpy as np
+
+    try:
+        return np.asarray(column, dtype=float)
+    except (ValueError, TypeError):
+        # Raises the same error the CLI gives for the first bad value
+        return np.asarray(to_float(column, name))
+
+
+def _labels(column) -> List[str]:
+    return [str(value) for value in column]
+
+
+def render(
+    kind: str,
+    data,
+    x: Optional[str] = None,
+    y: Union[str, Sequence[str], None] = None,
+    title: Optional[str] = None,
+    xlabel: Optional[str] = None,
+    ylabel: Optional[str] = None,
+    width: float = 10,
+    height: float = 6,
+    style: Optional[str] = None,
+    dpi: int = 100,
+    bins: int = 10,
+    image_format: str = "png",
+    alt: Optional[str] = None,
+) -> Tuple[bytes, str]:
+    """Render a chart from in-memory data, returning (image_bytes, alt_text).
+
+    data can be a pandas or polars DataFrame, a NumPy structured array, a
+    dictionary of column names to arrays or lists, or a list of row
+    dictionaries. x and y name columns and are detected as they are for the
+    CLI when omitted; y can be one column name or several. Numeric columns
+    are read through NumPy without converting them to rows.
+    """
+    if kind not in CHART_KINDS:
+        raise ValueError(
+            f"Unknown chart type {kind!r}, choose from {', '.join(CHART_KINDS)}"
+        )
+    names, column = _columns(data)
+    if isinstance(y, str):
+        y = (y,)
+    x_col, y_cols = resolve_column_names(names, x, y, kind)
+    # Pie charts and histograms only plot the first y column
+    plotted = y_cols[:1] if kind in ("pie", "histogram") else y_cols
+    series = {yc: _numeric(column(yc), yc) for yc in plotted}
+    count = len(series[y_cols[0]])
+    if not count:
+        raise ValueError("No data rows found")
+    if kind == "histogram":
+        x_values = None
+    elif kind == "scatter":
+        x_values = _numeric(column(x_col), x_col)
+    else:
+        x_values = _labels(column(x_col))
+
+    from chartroom import charts
+
+    buffer = io.BytesIO()
+    summaries = charts.plot(
+        kind,
+        x_values,
+        series,
+        buffer,
+        bins=bins,
+        title=title,
+        xlabel=xlabel,
+        ylabel=ylabel,
+        width=width,
+        height=height,
+        style=style,
+        dpi=dpi,
+        image_format=image_format,
+    )
+    if alt is None:
+
+        def label(i):
+            if kind == "scatter":
+                return fmt_num(float(x_values[i]))
+            return x_values[i]
+
+        alt = generate_alt_text(
+            kind, count, x_col, y_cols, summaries[y_cols[0]], label, title=title
+        )
+    return buffer.getvalue(), alt
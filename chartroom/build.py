@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+from chartroom.cache import hash_file
+from chartroom.output import atomic_write
+
+
+def _resolve(base: str, path: Any) -> Any:
+    return os.path.join(base, path) if isinstance(path, str) else path
+
+
+def _resolve_paths(spec: Dict[str, Any], base: str) -> Dict[str, Any]:
+    """Resolve the relative paths in a chart spec against base."""
+    spec = dict(spec)
+    for name in ("file", "output", "cache"):
+        if name in spec:
+            spec[name] = _resolve(base, spec[name])
+    sql = spec.get("sql")
+    if isinstance(sql, list) and len(sql) == 2:
+        spec["sql"] = [_resolve(base, sql[0]), sql[1]]
+    variants = spec.get("variants")
+    if isinstance(variants, str):
+        variants = [variants]
+    if isinstance(variants, list):
+        # A :2x or :w200 suffix stays at the end of the joined path
+        spec["variants"] = [_resolve(base, variant) for variant in variants]
+    return spec
+
+
+def load_build_file(path: str) -> List[Dict[str, Any]]:
+    """Read the [[chart]] entries of a TOML build file as chart specs.
+
+    Keys in a [defaults] table apply to every chart that does not set them.
+    Relative input, database, output and variant paths are resolved against
+    the directory of the build file, wherever chartroom is run from.
+    """
+    with open(path, "rb") as fp:
+        try:
+            document = tomllib.load(fp)
+        except tomllib.TOMLDecodeError as e:
+            raise ValueError(f"Invalid build file {path}: {e}")
+    unknown = sorted(set(document) - {"defaults", "chart"})
+    if unknown:
+        raise ValueError(f"Unknown build file table(s): {', '.join(unknown)}")
+    defaults = document.get("defaults", {})
+    charts = document.get("chart", [])
+    if not isinstance(defaults, dict) or not isinstance(charts, list):
+        raise ValueError("Build files need a [defaults] table and [[chart]] entries")
+    if not charts:
+        raise ValueError(f"No [[chart]] entries in {path}")
+    base = os.path.dirname(os.path.abspath(path))
+    return [_resolve_paths({**defaults, **chart}, base) for chart in charts]
+
+
+def default_state_path(build_file: str) -> str:
+    """State for charts.toml is kept in .charts.build-state.json beside it."""
+    directory, name = os.path.split(os.path.abspath(build_file))
+    return os.path.join(directory, f".{os.path.splitext(name)[0]}.build-state.json")
+
+
+class BuildState:
+    """What each chart of a build file was last built from, kept as JSON.
+
+    files records the modification time, size and SHA-256 digest of every
+    input, so inputs that have not been touched are not read again to hash
+    them. charts maps each output path to the fingerprint of the input,
+    options and chartroom version it was built from, plus its alt text.
+    Only the files and charts used by the latest build are saved.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path, encoding="utf-8") as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            data = {}
+        self.files: Dict[str, Dict[str, Any]] = data.get("files", {})
+        self.charts: Dict[str, Dict[str, str]] = data.get("charts", {})
+        self._used_files = set()
+        self._used_charts = set()
+
+    def file_digest(self, path: str) -> str:
+        """SHA-256 of the file at path, only read if its mtime or size changed."""
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            raise ValueError(f"File not found: {path}")
+        self._used_files.add(path)
+        entry = self.files.get(path)
+        if (
+            entry is not None
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+        ):
+            return entry["sha256"]
+        digest = hash_file(path).hexdigest()
+        self.files[path] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+        }
+        return digest
+
+    def input_digest(self, file: Optional[str], sql: Optional[Tuple[str, str]]) -> str:
+        """Digest of a chart's input file, or its database, WAL and query."""
+        if not sql:
+            return self.file_digest(file)
+        db_path, query = sql
+        parts = [self.file_digest(db_path)]
+        if os.path.exists(db_path + "-wal"):
+            parts.append(self.file_digest(db_path + "-wal"))
+        parts.append(query)
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def up_to_date(
+        self, output: str, fingerprint: str, variant_paths: Sequence[str] = ()
+    ) -> Optional[str]:
+        """Return the alt text of output if it was built from fingerprint.
+
+        Returns None if the chart needs building, including when the output
+        or one of its variants has been deleted.
+        """
+        self._used_charts.add(output)
+        entry = self.charts.get(output)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return None
+        if not all(os.path.exists(path) for path in (output, *variant_paths)):
+            return None
+        return entry["alt"]
+
+    def record(self, output: str, fingerprint: str, alt: str):
+        self._used_charts.add(output)
+        self.charts[output] = {"fingerprint": fingerprint, "alt": alt}
+
+    def forget(self, output: str):
+        self.charts.pop(output, None)
+
+    def save(self):
+        data = {
+            "files": {path: self.files[path] for path in sorted(self._used_files)},
+            "charts": {
+                output: self.charts[output]
+                for output in sorted(self._used_charts)
+                if output in self.charts
+            },
+        }
+        with atomic_write(self.path) as fp:
+            fp.write(json.dumps(data, indent=2).encode("utf-8"))
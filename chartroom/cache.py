@@ -0,0 +1,135 @@
+import filecmp
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+from chartroom.output import atomic_write, copy_atomic
+
+# Bump this to invalidate every existing cache entry
+CACHE_FORMAT = 1
+
+
+def _version(package: str) -> str:
+    # Imported here as importlib.metadata is slow to import and only needed
+    # once a cached chart is looked up
+    from importlib import metadata
+
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def hash_file(path: str, hasher=None) -> "hashlib._Hash":
+    """Feed the contents of the file at path into hasher (default sha256)."""
+    hasher = hasher or hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher
+
+
+def hash_sqlite(db_path: str, query: str) -> str:
+    """Digest of a SQLite database file, its write-ahead log and a query."""
+    hasher = hash_file(db_path)
+    wal_path = db_path + "-wal"
+    if os.path.exists(wal_path):
+        hash_file(wal_path, hasher)
+    hasher.update(b"\0" + query.encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def chart_key(input_digest: str, chart_type: str, options: Dict[str, Any]) -> str:
+    """Digest identifying a chart of input_digest rendered with these options.
+
+    It changes whenever the input, the options or the installed chartroom
+    or matplotlib version does.
+    """
+    material = json.dumps(
+        {
+            "format": CACHE_FORMAT,
+            "chartroom": _version("chartroom"),
+            "matplotlib": _version("matplotlib"),
+            "input": input_digest,
+            "type": chart_type,
+            "options": options,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ChartCache:
+    """Content-addressed store of rendered charts and their alt text.
+
+    Each entry is a KEY.img file plus a KEY.json file holding the alt text.
+    Entries are evicted least recently used first once the total size of
+    the stored images goes over max_size bytes.
+    """
+
+    def __init__(self, directory: str, max_size: int = 100 * 1024 * 1024):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, input_digest: str, chart_type: str, options: Dict[str, Any]) -> str:
+        """Cache key for a chart of input_digest rendered with these options."""
+        return chart_key(input_digest, chart_type, options)
+
+    def _paths(self, key: str):
+        base = os.path.join(self.directory, key)
+        return base + ".img", base + ".json"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached alt text for key, or None on a miss."""
+        image_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as fp:
+                meta = json.load(fp)
+            # Touch the image so it counts as recently used
+            os.utime(image_path)
+        except (OSError, ValueError):
+            return None
+        return meta["alt"]
+
+    def restore(self, key: str, output_path: str):
+        """Copy the cached image for key to output_path.
+
+        The output is left alone if it already has the same content.
+        """
+        image_path, _ = self._paths(key)
+        if os.path.exists(output_path) and filecmp.cmp(
+            image_path, output_path, shallow=False
+        ):
+            return
+        copy_atomic(image_path, output_path)
+
+    def put(self, key: str, image_path: str, alt: str):
+        """Store a rendered image and its alt text, then evict old entries."""
+        cached_image, meta_path = self._paths(key)
+        copy_atomic(image_path, cached_image)
+        with atomic_write(meta_path) as fp:
+            fp.write(json.dumps({"alt": alt}).encode("utf-8"))
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until under max_size."""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".img") and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        entries.sort()
+        for _, size, image_path in entries:
+            if total <= self.max_size:
+                break
+            for path in (image_path, image_path[: -len(".img")] + ".json"):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
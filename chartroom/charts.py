@@ -1,10 +1,22 @@
+import contextlib
+
 import matplotlib
 
 matplotlib.use("Agg")
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
-from typing import List, Dict, Any, Optional
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Union
 import numpy as np
 
+from chartroom.dates import parse_dates
+from chartroom.encode import Encoding
+from chartroom.output import Variant, save_figure
+from chartroom.profiling import stage
+from chartroom.stats import Summary, summarize, to_float
+
+# A path, written atomically, or a binary file object such as io.BytesIO
+Output = Union[str, BinaryIO]
+
 
 def _apply_style(style: Optional[str]):
     """Apply a matplotlib style if specified."""
@@ -20,17 +32,66 @@ def _make_figure(width: float, height: float) -> tuple:
     return fig, ax
 
 
+@contextlib.contextmanager
+def _figure(width: float, height: float):
+    """Create a figure and axes that are closed when the block exits.
+
+    The figure is closed even if drawing or saving fails, so long-lived
+    workers do not accumulate open figures.
+    """
+    fig, ax = _make_figure(width, height)
+    try:
+        yield fig, ax
+    finally:
+        plt.close(fig)
+
+
+# Lines and scatter plots with more points than this are rasterized, so SVG
+# and PDF output embeds one image for the data while the axes and text stay
+# as vectors. Raster output looks the same either way.
+RASTERIZE_POINTS = 10_000
+
+# Above this many points Agg draws paths in chunks, which keeps huge lines
+# under its cell limit, and path simplification gets more aggressive
+LARGE_PATH_POINTS = 100_000
+
+
+def _prepare_for_size(ax) -> Dict[str, Any]:
+    """Rasterize heavy data artists, returning rcParams for drawing them."""
+    largest = 0
+    for artist in [*ax.lines, *ax.collections]:
+        if hasattr(artist, "get_xydata"):
+            points = len(artist.get_xydata())
+        else:
+            points = len(artist.get_offsets())
+        if points > RASTERIZE_POINTS:
+            artist.set_rasterized(True)
+        largest = max(largest, points)
+    if largest <= LARGE_PATH_POINTS:
+        return {}
+    # Merge segments that stray less than this fraction of a pixel, from the
+    # default of 1/9 up to a whole pixel at nine times as many points
+    return {
+        "path.simplify": True,
+        "path.simplify_threshold": min(1.0, largest / (9 * LARGE_PATH_POINTS)),
+        "agg.path.chunksize": 10_000,
+    }
+
+
 def _finalize(
     fig,
     ax,
-    output_path: str,
+    output_path: Output,
     title: Optional[str] = None,
     xlabel: Optional[str] = None,
     ylabel: Optional[str] = None,
     dpi: int = 100,
     show_legend: bool = False,
+    image_format: Optional[str] = None,
+    variants: Sequence[Variant] = (),
+    encoding: Optional[Encoding] = None,
 ):
-    """Apply labels, save, and close the figure."""
+    """Apply labels and save the figure."""
     if title:
         ax.set_title(title)
     if xlabel:
@@ -39,29 +100,40 @@ def _finalize(
         ax.set_ylabel(ylabel)
     if show_legend:
         ax.legend()
-    fig.tight_layout()
-    fig.savefig(output_path, dpi=dpi)
-    plt.close(fig)
+    with stage("tight_layout"):
+        fig.tight_layout()
+    with stage("savefig"), plt.rc_context(_prepare_for_size(ax)):
+        save_figure(fig, output_path, image_format, variants, encoding, dpi=dpi)
 
 
-def _to_float(values: list, col_name: str) -> list:
-    """Convert values to float, raising a clear error on failure."""
-    result = []
-    for v in values:
-        try:
-            result.append(float(v))
-        except (ValueError, TypeError):
-            raise ValueError(
-                f"Cannot convert value {v!r} in column '{col_name}' to a number"
-            )
-    return result
+# Lines on a time axis with more points than this are drawn without markers
+DATE_MARKER_POINTS = 1_000
 
 
-def render_bar(
-    rows: List[Dict[str, Any]],
-    x_col: str,
-    y_cols: List[str],
-    output_path: str,
+def _date_axis(ax):
+    """Place and label x ticks for dates, however many points are plotted."""
+    locator = mdates.AutoDateLocator()
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+
+
+def _date_step(x_pos) -> float:
+    """The smallest gap between distinct dates, in days, for bar widths."""
+    distinct = np.unique(x_pos[np.isfinite(x_pos)])
+    if len(distinct) < 2:
+        return 1.0
+    return float(np.diff(distinct).min())
+
+
+# The plot_* functions take columns: x labels or values plus arrays of floats
+# per y column, which NumPy arrays and DataFrame columns are passed as
+# without conversion. The render_* functions extract those columns from rows.
+
+
+def plot_bar(
+    labels: Sequence[str],
+    series: Dict[str, Sequence[float]],
+    output: Output,
     title: Optional[str] = None,
     xlabel: Optional[str] = None,
     ylabel: Optional[str] = None,
@@ -69,38 +141,59 @@ def render_bar(
     height: float = 6,
     style: Optional[str] = None,
     dpi: int = 100,
-):
+    image_format: Optional[str] = None,
+    variants: Sequence[Variant] = (),
+    encoding: Optional[Encoding] = None,
+) -> Dict[str, Summary]:
     _apply_style(style)
-    fig, ax = _make_figure(width, height)
-
-    x_labels = [str(row[x_col]) for row in rows]
-    x_pos = np.arange(len(x_labels))
-
-    if len(y_cols) == 1:
-        values = _to_float([row[y_cols[0]] for row in rows], y_cols[0])
-        ax.bar(x_pos, values)
-        ax.set_xticks(x_pos)
-        ax.set_xticklabels(x_labels)
-    else:
-        n_series = len(y_cols)
-        bar_width = 0.8 / n_series
-        for i, yc in enumerate(y_cols):
-            values = _to_float([row[yc] for row in rows], yc)
-            offset = (i - n_series / 2 + 0.5) * bar_width
-            ax.bar(x_pos + offset, values, bar_width, label=yc)
-        ax.set_xticks(x_pos)
-        ax.set_xticklabels(x_labels)
-
-    _finalize(
-        fig, ax, output_path, title, xlabel, ylabel, dpi, show_legend=len(y_cols) > 1
-    )
-
-
-def render_line(
-    rows: List[Dict[str, Any]],
-    x_col: str,
-    y_cols: List[str],
-    output_path: str,
+    with _figure(width, height) as (fig, ax):
+        dates = parse_dates(labels)
+        if dates is None:
+            x_pos = np.arange(len(labels))
+            step = 1.0
+        else:
+            x_pos = mdates.date2num(dates)
+            step = _date_step(x_pos)
+
+        summaries = {}
+        if len(series) == 1:
+            [(name, values)] = series.items()
+            summaries[name] = summarize(values)
+            ax.bar(x_pos, values, 0.8 * step)
+        else:
+            n_series = len(series)
+            bar_width = 0.8 * step / n_series
+            for i, (name, values) in enumerate(series.items()):
+                summaries[name] = summarize(values)
+                offset = (i - n_series / 2 + 0.5) * bar_width
+                ax.bar(x_pos + offset, values, bar_width, label=name)
+        if dates is None:
+            ax.set_xticks(x_pos)
+            ax.set_xticklabels(labels)
+        else:
+            ax.xaxis_date()
+            _date_axis(ax)
+
+        _finalize(
+            fig,
+            ax,
+            output,
+            title,
+            xlabel,
+            ylabel,
+            dpi,
+            show_legend=len(series) > 1,
+            image_format=image_format,
+            variants=variants,
+            encoding=encoding,
+        )
+    return summaries
+
+
+def plot_line(
+    labels: Sequence[str],
+    series: Dict[str, Sequence[float]],
+    output: Output,
     title: Optional[str] = None,
     xlabel: Optional[str] = None,
     ylabel: Optional[str] = None,
@@ -108,30 +201,51 @@ def render_line(
     height: float = 6,
     style: Optional[str] = None,
     dpi: int = 100,
-):
+    image_format: Optional[str] = None,
+    variants: Sequence[Variant] = (),
+    encoding: Optional[Encoding] = None,
+) -> Dict[str, Summary]:
     _apply_style(style)
-    fig, ax = _make_figure(width, height)
-
-    x_labels = [str(row[x_col]) for row in rows]
-    x_pos = range(len(x_labels))
-
-    for yc in y_cols:
-        values = _to_float([row[yc] for row in rows], yc)
-        ax.plot(x_pos, values, label=yc, marker="o")
-
-    ax.set_xticks(list(x_pos))
-    ax.set_xticklabels(x_labels)
-
-    _finalize(
-        fig, ax, output_path, title, xlabel, ylabel, dpi, show_legend=len(y_cols) > 1
-    )
-
-
-def render_scatter(
-    rows: List[Dict[str, Any]],
-    x_col: str,
-    y_cols: List[str],
-    output_path: str,
+    with _figure(width, height) as (fig, ax):
+        dates = parse_dates(labels)
+        if dates is None:
+            x_pos = range(len(labels))
+            marker = "o"
+        else:
+            x_pos = dates
+            marker = "o" if len(dates) <= DATE_MARKER_POINTS else None
+
+        summaries = {}
+        for name, values in series.items():
+            summaries[name] = summarize(values)
+            ax.plot(x_pos, values, label=name, marker=marker)
+
+        if dates is None:
+            ax.set_xticks(list(x_pos))
+            ax.set_xticklabels(labels)
+        else:
+            _date_axis(ax)
+
+        _finalize(
+            fig,
+            ax,
+            output,
+            title,
+            xlabel,
+            ylabel,
+            dpi,
+            show_legend=len(series) > 1,
+            image_format=image_format,
+            variants=variants,
+            encoding=encoding,
+        )
+    return summaries
+
+
+def plot_scatter(
+    x_values: Sequence[float],
+    series: Dict[str, Sequence[float]],
+    output: Output,
     title: Optional[str] = None,
     xlabel: Optional[str] = None,
     ylabel: Optional[str] = None,
@@ -139,64 +253,218 @@ def render_scatter(
     height: float = 6,
     style: Optional[str] = None,
     dpi: int = 100,
-):
+    image_format: Optional[str] = None,
+    variants: Sequence[Variant] = (),
+    encoding: Optional[Encoding] = None,
+) -> Dict[str, Summary]:
     _apply_style(style)
-    fig, ax = _make_figure(width, height)
+    with _figure(width, height) as (fig, ax):
+        summaries = {}
+        for name, y_values in series.items():
+            summaries[name] = summarize(y_values)
+            ax.scatter(x_values, y_values, label=name)
+
+        _finalize(
+            fig,
+            ax,
+            output,
+            title,
+            xlabel,
+            ylabel,
+            dpi,
+            show_legend=len(series) > 1,
+            image_format=image_format,
+            variants=variants,
+            encoding=encoding,
+        )
+    return summaries
+
+
+def plot_pie(
+    labels: Sequence[str],
+    values: Sequence[float],
+    output: Output,
+    title: Optional[str] = None,
+    width: float = 10,
+    height: float = 6,
+    style: Optional[str] = None,
+    dpi: int = 100,
+    image_format: Optional[str] = None,
+    variants: Sequence[Variant] = (),
+    encoding: Optional[Encoding] = None,
+) -> Summary:
+    _apply_style(style)
+    with _figure(width, height) as (fig, ax):
+        summary = summarize(values)
+        ax.pie(values, labels=labels, autopct="%1.1f%%")
+
+        if title:
+            ax.set_title(title)
+        with stage("tight_layout"):
+            fig.tight_layout()
+        with stage("savefig"):
+            save_figure(fig, output, image_format, variants, encoding, dpi=dpi)
+    return summary
+
+
+def plot_histogram(
+    values: Sequence[float],
+    output: Output,
+    bins: int = 10,
+    title: Optional[str] = None,
+    xlabel: Optional[str] = None,
+    ylabel: Optional[str] = None,
+    width: float = 10,
+    height: float = 6,
+    style: Optional[str] = None,
+    dpi: int = 100,
+    image_format: Optional[str] = None,
+    variants: Sequence[Variant] = (),
+    encoding: Optional[Encoding] = None,
+) -> Summary:
+    _apply_style(style)
+    with _figure(width, height) as (fig, ax):
+        summary = summarize(values)
+        ax.hist(values, bins=bins)
+
+        _finalize(
+            fig,
+            ax,
+            output,
+            title,
+            xlabel,
+            ylabel,
+            dpi,
+            image_format=image_format,
+            variants=variants,
+            encoding=encoding,
+        )
+    return summary
+
+
+def plot(
+    chart_type: str,
+    x: Optional[Sequence],
+    series: Dict[str, Sequence[float]],
+    output: Output,
+    bins: int = 10,
+    xlabel: Optional[str] = None,
+    ylabel: Optional[str] = None,
+    **options,
+) -> Dict[str, Summary]:
+    """Render chart_type from columns, returning summaries of the y columns.
+
+    x holds the labels for bar, line and pie charts (bar and line charts put
+    labels that parse as dates on a time axis), the numbers for scatter
+    plots and is ignored for histograms. Pie charts and histograms only plot
+    the first y column.
+    """
+    if chart_type in ("pie", "histogram"):
+        name, values = next(iter(series.items()))
+        if chart_type == "pie":
+            return {name: plot_pie(x, values, output, **options)}
+        summary = plot_histogram(
+            values, output, bins=bins, xlabel=xlabel, ylabel=ylabel, **options
+        )
+        return {name: summary}
+    plot_fn = {"bar": plot_bar, "line": plot_line, "scatter": plot_scatter}
+    return plot_fn[chart_type](
+        x, series, output, xlabel=xlabel, ylabel=ylabel, **options
+    )
 
-    x_values = _to_float([row[x_col] for row in rows], x_col)
 
-    for yc in y_cols:
-        y_values = _to_float([row[yc] for row in rows], yc)
-        ax.scatter(x_values, y_values, label=yc)
+class RowColumns:
+    """Columns of a list of rows, each extracted and converted at most once.
 
-    _finalize(
-        fig, ax, output_path, title, xlabel, ylabel, dpi, show_legend=len(y_cols) > 1
-    )
+    Lets several charts of the same rows share their x labels and numbers.
+    """
 
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self._labels: Dict[str, List[str]] = {}
+        self._numbers: Dict[str, List[float]] = {}
 
-def render_pie(
+    def labels(self, col: str) -> List[str]:
+        if col not in self._labels:
+            self._labels[col] = [str(row[col]) for row in self.rows]
+        return self._labels[col]
+
+    def numbers(self, col: str) -> List[float]:
+        if col not in self._numbers:
+            self._numbers[col] = to_float([row[col] for row in self.rows], col)
+        return self._numbers[col]
+
+    def x_values(self, chart_type: str, x_col: Optional[str]) -> Optional[Sequence]:
+        """The x argument plot() expects for chart_type."""
+        if chart_type == "histogram":
+            return None
+        if chart_type == "scatter":
+            return self.numbers(x_col)
+        return self.labels(x_col)
+
+    @property
+    def count(self) -> int:
+        return len(self.rows)
+
+    def label(self, col: Optional[str], i: int) -> Any:
+        """The value of col in row i, as it is described in alt text."""
+        return self.rows[i].get(col, "")
+
+
+def _series(rows: List[Dict[str, Any]], y_cols: List[str]) -> Dict[str, list]:
+    return {yc: to_float([row[yc] for row in rows], yc) for yc in y_cols}
+
+
+def render_bar(
     rows: List[Dict[str, Any]],
     x_col: str,
-    y_col: str,
+    y_cols: List[str],
     output_path: str,
-    title: Optional[str] = None,
-    width: float = 10,
-    height: float = 6,
-    style: Optional[str] = None,
-    dpi: int = 100,
-):
-    _apply_style(style)
-    fig, ax = _make_figure(width, height)
+    **kwargs,
+) -> Dict[str, Summary]:
+    labels = [str(row[x_col]) for row in rows]
+    return plot_bar(labels, _series(rows, y_cols), output_path, **kwargs)
+
 
+def render_line(
+    rows: List[Dict[str, Any]],
+    x_col: str,
+    y_cols: List[str],
+    output_path: str,
+    **kwargs,
+) -> Dict[str, Summary]:
     labels = [str(row[x_col]) for row in rows]
-    values = _to_float([row[y_col] for row in rows], y_col)
+    return plot_line(labels, _series(rows, y_cols), output_path, **kwargs)
 
-    ax.pie(values, labels=labels, autopct="%1.1f%%")
 
-    if title:
-        ax.set_title(title)
-    fig.tight_layout()
-    fig.savefig(output_path, dpi=dpi)
-    plt.close(fig)
+def render_scatter(
+    rows: List[Dict[str, Any]],
+    x_col: str,
+    y_cols: List[str],
+    output_path: str,
+    **kwargs,
+) -> Dict[str, Summary]:
+    x_values = to_float([row[x_col] for row in rows], x_col)
+    return plot_scatter(x_values, _series(rows, y_cols), output_path, **kwargs)
 
 
-def render_histogram(
+def render_pie(
     rows: List[Dict[str, Any]],
+    x_col: str,
     y_col: str,
     output_path: str,
-    bins: int = 10,
-    title: Optional[str] = None,
-    xlabel: Optional[str] = None,
-    ylabel: Optional[str] = None,
-    width: float = 10,
-    height: float = 6,
-    style: Optional[str] = None,
-    dpi: int = 100,
-):
-    _apply_style(style)
-    fig, ax = _make_figure(width, height)
+    **kwargs,
+) -> Dict[str, Summary]:
+    labels = [str(row[x_col]) for row in rows]
+    values = to_float([row[y_col] for row in rows], y_col)
+    return {y_col: plot_pie(labels, values, output_path, **kwargs)}
 
-    values = _to_float([row[y_col] for row in rows], y_col)
-    ax.hist(values, bins=bins)
 
-    _finalize(fig, ax, output_path, title, xlabel, ylabel, dpi)
+def render_histogram(
+    rows: List[Dict[str, Any]],
+    y_col: str,
+    output_path: str,
+    **kwargs,
+) -> Dict[str, Summary]:
+    values = to_float([row[y_col] for row in rows], y_col)
+    return {y_col: plot_histogram(values, output_path, **kwargs)}
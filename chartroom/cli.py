@@ -1,137 +1,26 @@
+import contextlib
+import hashlib
 import html as html_mod
+import io as io_mod
+import itertools
 import json as json_mod
 import os
+import shutil
 import sqlite3
 import sys
 
 import click
 
+from chartroom import client, profiling
+from chartroom.alt import generate_alt_text, rows_alt_text
+from chartroom.cache import ChartCache, chart_key, hash_file, hash_sqlite
+from chartroom.encode import Encoding
 from chartroom.io import load_rows, resolve_columns
-from chartroom.charts import (
-    render_bar,
-    render_line,
-    render_scatter,
-    render_pie,
-    render_histogram,
-)
-
-
-def _fmt_num(val):
-    """Format a number: drop trailing .0 for clean display."""
-    if isinstance(val, float) and val == int(val):
-        return str(int(val))
-    return str(val)
-
-
-def _generate_alt_text(chart_type, rows, x_col, y_cols, title=None):
-    """Generate descriptive alt text based on chart data.
-
-    If title is set, it is prepended: "Title. Generated description".
-    """
-    description = _describe_chart(chart_type, rows, x_col, y_cols)
-    if title:
-        return f"{title}. {description}"
-    return description
-
-
-def _describe_chart(chart_type, rows, x_col, y_cols):
-    """Build a data-driven description of the chart."""
-    type_labels = {
-        "bar": "Bar chart",
-        "line": "Line chart",
-        "scatter": "Scatter plot",
-        "pie": "Pie chart",
-        "histogram": "Histogram",
-    }
-    label = type_labels.get(chart_type, "Chart")
-    n = len(rows)
-
-    if chart_type == "histogram":
-        col = y_cols[0] if y_cols else "values"
-        vals = []
-        for r in rows:
-            try:
-                vals.append(float(r[col]))
-            except (ValueError, TypeError, KeyError):
-                continue
-        if vals:
-            lo, hi = min(vals), max(vals)
-            if n <= 6:
-                formatted = ", ".join(_fmt_num(v) for v in vals)
-                return f"{label} of {col} values: {formatted}"
-            return (
-                f"{label} of {len(vals)} {col} values "
-                f"ranging from {_fmt_num(lo)} to {_fmt_num(hi)}"
-            )
-        return f"{label} of {col}"
-
-    if chart_type == "pie":
-        y_col = y_cols[0] if y_cols else None
-        if x_col and y_col:
-            pairs = []
-            for r in rows:
-                try:
-                    pairs.append((r[x_col], float(r[y_col])))
-                except (ValueError, TypeError, KeyError):
-                    continue
-            if pairs:
-                total = sum(v for _, v in pairs)
-                if n <= 6 and total > 0:
-                    parts = []
-                    for name, val in pairs:
-                        pct = val / total * 100
-                        parts.append(f"{name} ({pct:.0f}%)")
-                    return f"{label} showing {', '.join(parts)}"
-                elif total > 0:
-                    sorted_pairs = sorted(pairs, key=lambda p: p[1], reverse=True)
-                    top = sorted_pairs[:3]
-                    parts = []
-                    for name, val in top:
-                        pct = val / total * 100
-                        parts.append(f"{name} ({pct:.0f}%)")
-                    return f"{label} of {n} categories. " f"Largest: {', '.join(parts)}"
-        return f"{label} of {x_col or 'categories'}"
-
-    # bar, line, scatter — numeric y columns
-    if x_col and y_cols:
-        for y_col in y_cols[:1]:
-            vals = []
-            for r in rows:
-                try:
-                    vals.append((r.get(x_col, ""), float(r[y_col])))
-                except (ValueError, TypeError, KeyError):
-                    continue
-            if not vals:
-                continue
-
-            y_values = [v for _, v in vals]
-            lo, hi = min(y_values), max(y_values)
-
-            if n <= 6:
-                parts = [f"{name}: {_fmt_num(val)}" for name, val in vals]
-                series_note = ""
-                if len(y_cols) > 1:
-                    series_note = f" and {len(y_cols) - 1} more series"
-                return (
-                    f"{label} of {y_col} by {x_col} \u2014 "
-                    f"{', '.join(parts)}{series_note}"
-                )
-            else:
-                max_pair = max(vals, key=lambda p: p[1])
-                min_pair = min(vals, key=lambda p: p[1])
-                series_note = ""
-                if len(y_cols) > 1:
-                    series_note = f" ({len(y_cols)} series)"
-                return (
-                    f"{label} of {y_col} by {x_col}{series_note}. "
-                    f"{n} points, ranging from {_fmt_num(lo)} ({min_pair[0]}) "
-                    f"to {_fmt_num(hi)} ({max_pair[0]})"
-                )
-
-    return label
+from chartroom.output import Variant, release_output, reserve_output
+from chartroom.pool import map_ordered, resolve_jobs
 
 
-def _format_output(output_path, fmt, alt_text):
+def _format_output(output_path, fmt, alt_text, profile=None):
     """Format the output according to the chosen output format."""
     if fmt == "markdown":
         return f"![{alt_text}]({output_path})"
@@ -139,80 +28,95 @@ def _format_output(output_path, fmt, alt_text):
         escaped_alt = html_mod.escape(alt_text, quote=True)
         return f'<img src="{output_path}" alt="{escaped_alt}">'
     elif fmt == "json":
-        return json_mod.dumps({"path": output_path, "alt": alt_text})
+        result = {
+            "path": output_path,
+            "alt": alt_text,
+            "bytes": os.path.getsize(output_path),
+        }
+        if profile is not None:
+            result["profile"] = profile.as_list()
+        return json_mod.dumps(result)
     elif fmt == "alt":
         return alt_text
     return output_path
 
 
-def _resolve_output(output: str | None) -> str:
-    """Resolve the output file path, auto-generating if needed."""
-    if output:
-        return os.path.abspath(output)
-
-    # Auto-generate: chart.png, chart-2.png, chart-3.png, ...
-    candidate = "chart.png"
-    counter = 2
-    while os.path.exists(candidate):
-        candidate = f"chart-{counter}.png"
-        counter += 1
-    return os.path.abspath(candidate)
+@contextlib.contextmanager
+def _output_file(output: str | None, extension: str = ".png"):
+    """Resolve the output file path, auto-generating if needed.
 
+    Auto-generated names (chart.png, chart-2.png, ...) are reserved up front
+    so parallel invocations never share one, and released again if the
+    chart could not be written.
+    """
+    if output:
+        yield os.path.abspath(output)
+        return
+    output_path = os.path.abspath(reserve_output(extension=extension))
+    try:
+        yield output_path
+    except BaseException:
+        release_output(output_path)
+        raise
 
-def _load_data(file, csv, tsv, json, jsonl, sql):
-    """Load data from the various input sources."""
-    sql_db = None
-    sql_query = None
-    fmt = None
-    fp = None
 
+def _input_format(file, csv, tsv, json, jsonl, sql):
+    """Validate the input options, returning the explicit format or None."""
     if sql:
         if len(sql) != 2:
             raise click.UsageError(
                 "--sql requires exactly two arguments: DATABASE QUERY"
             )
-        sql_db, sql_query = sql
         if csv or tsv or json or jsonl:
             raise click.UsageError(
                 "--sql cannot be combined with --csv/--tsv/--json/--jsonl"
             )
         if file is not None:
             raise click.UsageError("--sql cannot be combined with a FILE argument")
-    else:
-        if sum([csv, tsv, json, jsonl]) > 1:
-            raise click.UsageError(
-                "Specify at most one of --csv, --tsv, --json, --jsonl"
-            )
-        if csv:
-            fmt = "csv"
-        elif tsv:
-            fmt = "tsv"
-        elif json:
-            fmt = "json"
-        elif jsonl:
-            fmt = "jsonl"
-        # else: auto-detect
+        return None
+    if sum([csv, tsv, json, jsonl]) > 1:
+        raise click.UsageError("Specify at most one of --csv, --tsv, --json, --jsonl")
+    if csv:
+        return "csv"
+    elif tsv:
+        return "tsv"
+    elif json:
+        return "json"
+    elif jsonl:
+        return "jsonl"
+    # else: auto-detect
+    return None
 
-        if file is not None:
-            fp = click.open_file(file, "rb")
-        else:
-            # Try reading from stdin
-            stdin = click.get_binary_stream("stdin")
-            if hasattr(stdin, "isatty") and stdin.isatty():
-                raise click.UsageError(
-                    "Provide a FILE argument, pipe data to stdin, or use --sql"
-                )
-            fp = stdin
 
-    return load_rows(fp=fp, format=fmt, sql_db=sql_db, sql_query=sql_query)
+def _open_input(file, fp=None):
+    """Open FILE, or fall back to fp and then stdin, as a binary stream."""
+    if file is not None:
+        return click.open_file(file, "rb")
+    if fp is not None:
+        return fp
+    # Try reading from stdin
+    stdin = click.get_binary_stream("stdin")
+    if hasattr(stdin, "isatty") and stdin.isatty():
+        raise click.UsageError(
+            "Provide a FILE argument, pipe data to stdin, or use --sql"
+        )
+    return stdin
 
 
-# Shared options applied to all chart subcommands
-_common_options = [
-    click.argument("file", required=False, default=None),
-    click.option(
-        "-o", "--output", default=None, help="Output file path (default: chart.png)"
-    ),
+def _load_data(file, csv, tsv, json, jsonl, sql, fp=None):
+    """Load data from the various input sources.
+
+    If fp is provided it is read in place of stdin when there is no FILE.
+    """
+    fmt = _input_format(file, csv, tsv, json, jsonl, sql)
+    if sql:
+        sql_db, sql_query = sql
+        return load_rows(sql_db=sql_db, sql_query=sql_query)
+    return load_rows(fp=_open_input(file, fp), format=fmt)
+
+
+# Options selecting the input data and its columns
+_data_options = [
     click.option("-x", default=None, help="Column for x-axis / categories"),
     click.option(
         "-y", multiple=True, help="Column(s) for y-axis / values (repeatable)"
@@ -232,6 +136,10 @@ _common_options = [
             "Example: --sql mydb.sqlite 'SELECT name, count FROM items'"
         ),
     ),
+]
+
+# Options controlling how a chart looks
+_style_options = [
     click.option(
         "--title", default=None, help="Chart title, also prepended to generated alt text"
     ),
@@ -243,22 +151,145 @@ _common_options = [
         "--style", default=None, help="Matplotlib style (e.g. ggplot, dark_background)"
     ),
     click.option("--dpi", default=100, type=int, help="Output DPI"),
+]
+
+_output_format_option = click.option(
+    "-f",
+    "--output-format",
+    "output_format",
+    default="path",
+    type=click.Choice(["path", "markdown", "html", "json", "alt"]),
+    help=(
+        "How to format stdout. "
+        "path (default): absolute file path. "
+        "markdown: ![alt](path). "
+        "html: <img src=path alt=...>. "
+        "json: {\"path\": ..., \"alt\": ..., \"bytes\": ...}. "
+        "alt: just the alt text, no path. "
+        "Alt text is auto-generated from chart type and data unless --alt is given."
+    ),
+)
+
+# Options for how raster images are encoded
+_encoding_options = [
+    click.option(
+        "--quality",
+        type=click.IntRange(1, 100),
+        default=None,
+        help="JPEG and WebP quality, from 1 to 100",
+    ),
+    click.option(
+        "--png-compression",
+        type=click.IntRange(0, 9),
+        default=None,
+        help="PNG compression level, from 0 (fastest) to 9 (smallest)",
+    ),
     click.option(
-        "-f",
-        "--output-format",
-        "output_format",
-        default="path",
-        type=click.Choice(["path", "markdown", "html", "json", "alt"]),
+        "--colors",
+        type=click.IntRange(2, 256),
+        default=None,
+        help="Quantize PNG output to a palette of this many colors",
+    ),
+]
+
+# Options for timing and tracing a run
+_profile_options = [
+    click.option(
+        "--profile",
+        is_flag=True,
+        help=(
+            "Time each stage of loading and rendering the chart, printing the "
+            "breakdown to stderr (or adding it to -f json output)"
+        ),
+    ),
+    click.option(
+        "--memory-profile",
+        is_flag=True,
+        help=(
+            "Trace memory allocations, adding the peak memory and top "
+            "allocation sites of each stage to the --profile breakdown"
+        ),
+    ),
+    click.option(
+        "--profile-out",
+        type=click.Path(dir_okay=False, writable=True),
+        default=None,
+        help="Run under cProfile and write the stats to this .pstats file",
+    ),
+]
+
+# Shared options applied to all chart subcommands
+_common_options = [
+    click.argument("file", required=False, default=None),
+    click.option(
+        "-o", "--output", default=None, help="Output file path (default: chart.png)"
+    ),
+    click.option(
+        "--variant",
+        "variants",
+        multiple=True,
+        metavar="PATH[:2x|:wN]",
         help=(
-            "How to format stdout. "
-            "path (default): absolute file path. "
-            "markdown: ![alt](path). "
-            "html: <img src=path alt=...>. "
-            "json: {\"path\": ..., \"alt\": ...}. "
-            "alt: just the alt text, no path. "
-            "Alt text is auto-generated from chart type and data unless --alt is given."
+            "Also save the chart to PATH from the same figure, in the format "
+            "of its extension. PATH:2x doubles the DPI, PATH:w200 makes a "
+            "200 pixel wide thumbnail by resampling the raster (repeatable)"
         ),
     ),
+    *_data_options,
+    *_style_options,
+    *_encoding_options,
+    _output_format_option,
+    click.option(
+        "--cache",
+        default=None,
+        envvar="CHARTROOM_CACHE",
+        metavar="DIR",
+        help=(
+            "Reuse charts previously rendered from the same input and options, "
+            "storing them in this directory. Defaults to $CHARTROOM_CACHE."
+        ),
+    ),
+    click.option(
+        "--cache-max-size",
+        default=100,
+        type=click.IntRange(min=1),
+        help=(
+            "Maximum cache size in MB, above which the least recently used "
+            "charts are evicted"
+        ),
+    ),
+    click.option(
+        "--watch",
+        is_flag=True,
+        help=(
+            "Keep running and re-render whenever FILE (or the --sql database) "
+            "changes, reading only rows appended since the last render"
+        ),
+    ),
+    click.option(
+        "--live",
+        is_flag=True,
+        help=(
+            "Chart a never-ending stream of CSV, TSV or JSONL rows from FILE or "
+            "stdin, re-rendering the most recent --window rows as they arrive"
+        ),
+    ),
+    click.option(
+        "--window",
+        default=1000,
+        type=click.IntRange(min=1),
+        help="Number of most recent rows to chart with --live",
+    ),
+    click.option(
+        "--interval",
+        default=1.0,
+        type=click.FloatRange(min=0, min_open=True),
+        help=(
+            "Seconds between checks for changes with --watch, or between "
+            "frames with --live"
+        ),
+    ),
+    *_profile_options,
     click.option(
         "--alt",
         default=None,
@@ -272,18 +303,256 @@ _common_options = [
 ]
 
 
-def common_options(fn):
-    for decorator in reversed(_common_options):
-        fn = decorator(fn)
-    return fn
+def _apply_options(options):
+    def decorate(fn):
+        for decorator in reversed(options):
+            fn = decorator(fn)
+        return fn
+
+    return decorate
+
+
+common_options = _apply_options(_common_options)
+
 
+class _ChartroomGroup(click.Group):
+    def main(self, args=None, **extra):
+        # Only real command-line invocations are forwarded, not programmatic
+        # calls that pass their own args
+        if args is None:
+            exit_code = _forward_to_daemon(sys.argv[1:])
+            if exit_code is not None:
+                sys.exit(exit_code)
+        return super().main(args, **extra)
 
-@click.group()
+
+def _forward_to_daemon(args):
+    """Run a chart subcommand on a chartroom daemon, if one is listening.
+
+    Returns the exit code, or None if the command should run in this process
+    because there is no daemon or the command is not a chart subcommand.
+    """
+    if not args or args[0] not in (*CHART_TYPES, "multi") or "--help" in args:
+        return None
+    if "--watch" in args or "--live" in args or "--terminal" in args:
+        # Long-running modes stay in this process, as do previews sized to
+        # this process's terminal
+        return None
+    conn = client.connect(client.default_socket_path())
+    if conn is None:
+        return None
+    try:
+        command = cli.commands[args[0]]
+        ctx = command.make_context(args[0], list(args[1:]), resilient_parsing=True)
+        stdin = None
+        if ctx.params.get("file") in (None, "-") and not ctx.params.get("sql"):
+            stream = click.get_binary_stream("stdin")
+            if not stream.isatty():
+                stdin = stream.read()
+        try:
+            exit_code, stdout, stderr = client.run_cli(
+                conn, list(args), os.getcwd(), stdin, client.chartroom_environ()
+            )
+        except OSError:
+            if stdin is not None:
+                # Stdin has already been consumed, so replay it locally
+                sys.stdin = io_mod.TextIOWrapper(io_mod.BytesIO(stdin))
+            return None
+    finally:
+        conn.close()
+    click.echo(stdout, nl=False)
+    click.echo(stderr, nl=False, err=True)
+    return exit_code
+
+
+@click.group(cls=_ChartroomGroup)
 @click.version_option()
 def cli():
     "CLI tool for creating charts"
 
 
+def _render_rows(
+    chart_type,
+    render_fn,
+    rows,
+    x,
+    y,
+    output_path,
+    title=None,
+    want_alt=True,
+    backend="matplotlib",
+    **options,
+):
+    """Resolve columns, render rows to output_path and return the alt text.
+
+    Returns None instead of the generated alt text when want_alt is False.
+    With backend "svg-lite", render_fn is replaced by the SVG_LITE_TYPES
+    renderer for chart_type and matplotlib is never imported.
+    """
+    with profiling.stage("resolve_columns"):
+        x_col, y_cols = resolve_columns(rows, x, y, chart_type=chart_type)
+    if backend == "svg-lite":
+        render_fn = SVG_LITE_TYPES[chart_type]
+    else:
+        with profiling.stage("import_matplotlib"):
+            import chartroom.charts  # noqa: F401
+    with profiling.stage("render", rows=len(rows)):
+        summaries = render_fn(
+            rows=rows,
+            x_col=x_col,
+            y_cols=y_cols,
+            output_path=output_path,
+            title=title,
+            **options,
+        )
+    if not want_alt:
+        return None
+    with profiling.stage("alt_text"):
+        return rows_alt_text(
+            chart_type, rows, x_col, y_cols, title=title, summaries=summaries
+        )
+
+
+def _digest_input(file, sql, fp=None):
+    """Hash the input for the chart cache, returning (fp, digest).
+
+    Stdin can only be read once, so it is read into memory and returned as
+    a new fp for the loader to parse.
+    """
+    if sql:
+        if not os.path.exists(sql[0]):
+            raise ValueError(f"Database file not found: {sql[0]}")
+        return fp, hash_sqlite(*sql)
+    if file is not None and file != "-":
+        return fp, hash_file(file).hexdigest()
+    data = _open_input(file, fp).read()
+    return io_mod.BytesIO(data), hashlib.sha256(data).hexdigest()
+
+
+def _encoding(options):
+    """Pop the encoder options out of options, returning an encode.Encoding."""
+    return Encoding(
+        quality=options.pop("quality", None),
+        compress_level=options.pop("png_compression", None),
+        colors=options.pop("colors", None),
+    )
+
+
+def _check_svg_lite(output, variants, options):
+    """Raise ValueError for options that --backend svg-lite cannot honour."""
+    if output and os.path.splitext(output)[1].lower() != ".svg":
+        raise ValueError("--backend svg-lite can only write .svg files")
+    if variants:
+        raise ValueError("--variant cannot be used with --backend svg-lite")
+    if options.get("style"):
+        raise ValueError("--style cannot be used with --backend svg-lite")
+
+
+def _render_chart(
+    chart_type,
+    render_fn,
+    file,
+    output,
+    x,
+    y,
+    csv,
+    tsv,
+    json,
+    jsonl,
+    sql,
+    alt=None,
+    want_alt=True,
+    cache=None,
+    cache_max_size=100,
+    fp=None,
+    **options,
+):
+    """Load the data and render a chart, returning (output_path, alt_text).
+
+    alt_text is None if want_alt is False and no alt override was given.
+    With a cache directory, a chart previously rendered from the same input
+    and options is copied to the output without loading or rendering.
+    variants holds --variant values, parsed with output.Variant.parse().
+    """
+    variants = [Variant.parse(value) for value in options.pop("variants", ())]
+    encoding = _encoding(options)
+    backend = options.pop("backend", "matplotlib")
+    extension = ".png"
+    if backend == "svg-lite":
+        _check_svg_lite(output, variants, options)
+        extension = ".svg"
+    chart_cache = None
+    if cache:
+        chart_cache = ChartCache(cache, cache_max_size * 1024 * 1024)
+        _input_format(file, csv, tsv, json, jsonl, sql)
+        with profiling.stage("hash_input"):
+            fp, digest = _digest_input(file, sql, fp)
+        key = chart_cache.key(
+            digest,
+            chart_type,
+            dict(
+                options,
+                x=x,
+                y=y,
+                csv=csv,
+                tsv=tsv,
+                json=json,
+                jsonl=jsonl,
+                encoding=encoding.as_dict(),
+                backend=backend,
+                # savefig picks the image format from the extension
+                extension=os.path.splitext(output or extension)[1].lower(),
+            ),
+        )
+        # Each variant is cached as an entry of its own, keyed on the chart
+        variant_keys = [
+            chart_cache.key(
+                key,
+                "variant",
+                dict(
+                    extension=os.path.splitext(variant.path)[1].lower(),
+                    scale=variant.scale,
+                    width=variant.width,
+                ),
+            )
+            for variant in variants
+        ]
+        cached_alt = chart_cache.get(key)
+        if cached_alt is not None and all(
+            chart_cache.get(variant_key) is not None for variant_key in variant_keys
+        ):
+            with _output_file(output, extension) as output_path:
+                with profiling.stage("cache_restore"):
+                    chart_cache.restore(key, output_path)
+                    for variant, variant_key in zip(variants, variant_keys):
+                        chart_cache.restore(variant_key, variant.path)
+            return output_path, alt or cached_alt
+
+    with profiling.stage("load") as load_stage:
+        rows = _load_data(file, csv, tsv, json, jsonl, sql, fp=fp)
+        load_stage.rows = len(rows)
+    with _output_file(output, extension) as output_path:
+        alt_text = _render_rows(
+            chart_type,
+            render_fn,
+            rows,
+            x,
+            y,
+            output_path,
+            want_alt=(want_alt and not alt) or chart_cache is not None,
+            backend=backend,
+            variants=variants,
+            encoding=encoding,
+            **options,
+        )
+    if chart_cache is not None:
+        with profiling.stage("cache_store"):
+            chart_cache.put(key, output_path, alt_text)
+            for variant, variant_key in zip(variants, variant_keys):
+                chart_cache.put(variant_key, variant.path, alt_text)
+    return output_path, alt or alt_text
+
+
 def _run_chart(
     chart_type,
     render_fn,
@@ -307,16 +576,41 @@ def _run_chart(
 ):
     """Common logic for all chart subcommands."""
     output_format = extra.pop("output_format", "path")
-    alt = extra.pop("alt", None)
-    try:
-        rows = _load_data(file, csv, tsv, json, jsonl, sql)
-        x_col, y_cols = resolve_columns(rows, x, y, chart_type=chart_type)
-        output_path = _resolve_output(output)
-        render_fn(
-            rows=rows,
-            x_col=x_col,
-            y_cols=y_cols,
-            output_path=output_path,
+    interval = extra.pop("interval", 1.0)
+    watch = extra.pop("watch", False)
+    live = extra.pop("live", False)
+    window = extra.pop("window", 1000)
+    if watch and live:
+        raise click.UsageError("--watch and --live cannot be used together")
+    if (watch or live) and extra.get("variants"):
+        raise click.UsageError("--variant cannot be used with --watch or --live")
+    terminal = extra.pop("terminal", False)
+    if terminal and (
+        output or output_format != "path" or extra.get("variants") or watch or live
+    ):
+        raise click.UsageError(
+            "--terminal prints the chart and cannot be used with -o, -f, "
+            "--variant, --watch or --live"
+        )
+    if (watch or live) and extra.get("backend", "matplotlib") != "matplotlib":
+        raise click.UsageError(
+            "--backend svg-lite cannot be used with --watch or --live"
+        )
+    if watch or live:
+        _follow_chart(
+            chart_type,
+            file,
+            output,
+            x,
+            y,
+            csv,
+            tsv,
+            json,
+            jsonl,
+            sql,
+            output_format,
+            interval,
+            window=window if live else None,
             title=title,
             xlabel=xlabel,
             ylabel=ylabel,
@@ -326,44 +620,271 @@ def _run_chart(
             dpi=dpi,
             **extra,
         )
-        if output_format == "path":
-            click.echo(output_path)
+        return
+    profile_context = profiling.profiled(
+        timings=extra.pop("profile", False),
+        memory=extra.pop("memory_profile", False),
+        cprofile_path=extra.pop("profile_out", None),
+    )
+    try:
+        with profile_context as prof:
+            if terminal:
+                preview = _preview_chart(
+                    chart_type,
+                    file,
+                    x,
+                    y,
+                    csv,
+                    tsv,
+                    json,
+                    jsonl,
+                    sql,
+                    title=title,
+                    xlabel=xlabel,
+                    ylabel=ylabel,
+                    bins=extra.get("bins", 10),
+                )
+            else:
+                output_path, alt_text = _render_chart(
+                    chart_type,
+                    render_fn,
+                    file,
+                    output,
+                    x,
+                    y,
+                    csv,
+                    tsv,
+                    json,
+                    jsonl,
+                    sql,
+                    title=title,
+                    xlabel=xlabel,
+                    ylabel=ylabel,
+                    width=width,
+                    height=height,
+                    style=style,
+                    dpi=dpi,
+                    want_alt=output_format != "path",
+                    **extra,
+                )
+        if terminal:
+            click.echo(preview)
         else:
-            alt_text = alt or _generate_alt_text(
-                chart_type, rows, x_col, y_cols, title=title
-            )
-            click.echo(_format_output(output_path, output_format, alt_text))
+            click.echo(_format_output(output_path, output_format, alt_text, prof))
+        if prof is not None and output_format != "json":
+            click.echo(prof.format(), err=True)
     except click.UsageError:
         raise
     except (ValueError, sqlite3.OperationalError) as e:
         raise click.ClickException(str(e))
 
 
+def _preview_chart(
+    chart_type, file, x, y, csv, tsv, json, jsonl, sql, bins=10, **options
+):
+    """Load the data and return a text preview of the chart for --terminal.
+
+    The preview is drawn by chartroom.terminal to fit the terminal, without
+    importing matplotlib. options are the title and axis labels.
+    """
+    from chartroom import terminal
+
+    with profiling.stage("load") as load_stage:
+        rows = _load_data(file, csv, tsv, json, jsonl, sql)
+        load_stage.rows = len(rows)
+    with profiling.stage("resolve_columns"):
+        x_col, y_cols = resolve_columns(rows, x, y, chart_type=chart_type)
+    columns, lines = shutil.get_terminal_size()
+    with profiling.stage("render", rows=len(rows)):
+        # One line is left for the shell prompt
+        return terminal.render_rows(
+            chart_type,
+            rows,
+            x_col,
+            y_cols,
+            bins=bins,
+            columns=columns,
+            lines=lines - 1,
+            **options,
+        )
+
+
+def _follow_chart(
+    chart_type,
+    file,
+    output,
+    x,
+    y,
+    csv,
+    tsv,
+    json,
+    jsonl,
+    sql,
+    output_format,
+    interval,
+    window=None,
+    alt=None,
+    title=None,
+    **options,
+):
+    """Render a chart, then re-render it each time more data arrives.
+
+    Without a window this watches FILE or the --sql database for changes.
+    With a window it streams rows from FILE or stdin, charting the most
+    recent window of them, until the stream ends. Prints the formatted
+    output after every render.
+    """
+    fmt = _input_format(file, csv, tsv, json, jsonl, sql)
+    if window is None and not sql and file in (None, "-"):
+        raise click.UsageError("--watch requires a FILE or --sql to watch")
+    if window is not None and sql:
+        raise click.UsageError("--live streams FILE or stdin and cannot use --sql")
+    if window is not None and fmt == "json":
+        raise click.UsageError("--live needs CSV, TSV or newline-delimited JSON")
+    # Imported here as it loads matplotlib
+    from chartroom import live
+
+    if window is not None:
+        source = live.StreamSource(_open_input(file), fmt, window)
+    elif sql:
+        source = live.SQLiteSource(*sql)
+    else:
+        source = live.FileSource(file, fmt)
+    for name in (
+        "cache",
+        "cache_max_size",
+        "profile",
+        "memory_profile",
+        "profile_out",
+        "variants",
+        "backend",
+    ):
+        options.pop(name, None)
+    encoding = _encoding(options)
+    try:
+        rows = source.load()
+        x_col, y_cols = resolve_columns(rows, x, y, chart_type=chart_type)
+        chart = live.LiveChart(
+            chart_type,
+            x_col,
+            y_cols,
+            title=title,
+            window=window,
+            encoding=encoding,
+            **options,
+        )
+    except (ValueError, sqlite3.OperationalError) as e:
+        raise click.ClickException(str(e))
+
+    def on_frame(summaries, rows):
+        alt_text = alt
+        if output_format != "path" and not alt:
+            alt_text = rows_alt_text(
+                chart_type, rows, x_col, y_cols, title=title, summaries=summaries
+            )
+        click.echo(_format_output(output_path, output_format, alt_text))
+
+    try:
+        with _output_file(output) as output_path:
+            live.watch(
+                source, chart, rows, output_path, interval, on_frame, window=window
+            )
+    except KeyboardInterrupt:
+        pass
+    except (ValueError, sqlite3.OperationalError) as e:
+        raise click.ClickException(str(e))
+    finally:
+        chart.close()
+
+
+# chartroom.charts imports matplotlib and numpy, which take hundreds of
+# milliseconds to load, so it is only imported once a chart is rendered
+
+
 def _render_bar_wrapper(rows, x_col, y_cols, output_path, **kwargs):
-    render_bar(rows, x_col, y_cols, output_path, **kwargs)
+    from chartroom.charts import render_bar
+
+    return render_bar(rows, x_col, y_cols, output_path, **kwargs)
 
 
 def _render_line_wrapper(rows, x_col, y_cols, output_path, **kwargs):
-    render_line(rows, x_col, y_cols, output_path, **kwargs)
+    from chartroom.charts import render_line
+
+    return render_line(rows, x_col, y_cols, output_path, **kwargs)
 
 
 def _render_scatter_wrapper(rows, x_col, y_cols, output_path, **kwargs):
-    render_scatter(rows, x_col, y_cols, output_path, **kwargs)
+    from chartroom.charts import render_scatter
+
+    return render_scatter(rows, x_col, y_cols, output_path, **kwargs)
 
 
 def _render_pie_wrapper(
     rows, x_col, y_cols, output_path, xlabel=None, ylabel=None, **kwargs
 ):
+    from chartroom.charts import render_pie
+
     # Pie charts ignore xlabel/ylabel
-    render_pie(rows, x_col, y_cols[0], output_path, **kwargs)
+    return render_pie(rows, x_col, y_cols[0], output_path, **kwargs)
 
 
 def _render_histogram_wrapper(rows, x_col, y_cols, output_path, bins=10, **kwargs):
-    render_histogram(rows, y_cols[0], output_path, bins=bins, **kwargs)
+    from chartroom.charts import render_histogram
+
+    return render_histogram(rows, y_cols[0], output_path, bins=bins, **kwargs)
+
+
+def _render_svg_lite_bar_wrapper(rows, x_col, y_cols, output_path, **kwargs):
+    from chartroom.svglite import render_bar
+
+    return render_bar(rows, x_col, y_cols, output_path, **kwargs)
+
+
+def _render_svg_lite_line_wrapper(rows, x_col, y_cols, output_path, **kwargs):
+    from chartroom.svglite import render_line
+
+    return render_line(rows, x_col, y_cols, output_path, **kwargs)
+
+
+CHART_TYPES = {
+    "bar": _render_bar_wrapper,
+    "line": _render_line_wrapper,
+    "scatter": _render_scatter_wrapper,
+    "pie": _render_pie_wrapper,
+    "histogram": _render_histogram_wrapper,
+}
+
+# Renderers for --backend svg-lite, which writes SVG without matplotlib
+SVG_LITE_TYPES = {
+    "bar": _render_svg_lite_bar_wrapper,
+    "line": _render_svg_lite_line_wrapper,
+}
+
+_terminal_option = click.option(
+    "--terminal",
+    is_flag=True,
+    help=(
+        "Print a preview of the chart to the terminal, drawn with Unicode "
+        "braille and block characters, instead of saving an image"
+    ),
+)
+
+_backend_option = click.option(
+    "--backend",
+    default="matplotlib",
+    type=click.Choice(["matplotlib", "svg-lite"]),
+    help=(
+        "Renderer to use. svg-lite writes SVG directly without loading "
+        "matplotlib, which is much faster for small charts but does not "
+        "support --style or --variant"
+    ),
+)
 
 
 @cli.command()
 @common_options
+@_backend_option
+@_terminal_option
 def bar(
     file,
     output,
@@ -383,6 +904,21 @@ def bar(
     dpi,
     output_format,
     alt,
+    cache,
+    cache_max_size,
+    profile,
+    memory_profile,
+    profile_out,
+    watch,
+    live,
+    window,
+    interval,
+    variants,
+    quality,
+    png_compression,
+    colors,
+    terminal,
+    backend,
 ):
     """Create a bar chart from columnar data.
 
@@ -415,11 +951,28 @@ def bar(
         dpi,
         output_format=output_format,
         alt=alt,
+        cache=cache,
+        cache_max_size=cache_max_size,
+        profile=profile,
+        memory_profile=memory_profile,
+        profile_out=profile_out,
+        watch=watch,
+        live=live,
+        window=window,
+        interval=interval,
+        variants=variants,
+        quality=quality,
+        png_compression=png_compression,
+        colors=colors,
+        terminal=terminal,
+        backend=backend,
     )
 
 
 @cli.command()
 @common_options
+@_backend_option
+@_terminal_option
 def line(
     file,
     output,
@@ -439,6 +992,21 @@ def line(
     dpi,
     output_format,
     alt,
+    cache,
+    cache_max_size,
+    profile,
+    memory_profile,
+    profile_out,
+    watch,
+    live,
+    window,
+    interval,
+    variants,
+    quality,
+    png_compression,
+    colors,
+    terminal,
+    backend,
 ):
     """Create a line chart from columnar data.
 
@@ -470,11 +1038,27 @@ def line(
         dpi,
         output_format=output_format,
         alt=alt,
+        cache=cache,
+        cache_max_size=cache_max_size,
+        profile=profile,
+        memory_profile=memory_profile,
+        profile_out=profile_out,
+        watch=watch,
+        live=live,
+        window=window,
+        interval=interval,
+        variants=variants,
+        quality=quality,
+        png_compression=png_compression,
+        colors=colors,
+        terminal=terminal,
+        backend=backend,
     )
 
 
 @cli.command()
 @common_options
+@_terminal_option
 def scatter(
     file,
     output,
@@ -494,6 +1078,20 @@ def scatter(
     dpi,
     output_format,
     alt,
+    cache,
+    cache_max_size,
+    profile,
+    memory_profile,
+    profile_out,
+    watch,
+    live,
+    window,
+    interval,
+    variants,
+    quality,
+    png_compression,
+    colors,
+    terminal,
 ):
     """Create a scatter plot from columnar data.
 
@@ -524,6 +1122,20 @@ def scatter(
         dpi,
         output_format=output_format,
         alt=alt,
+        cache=cache,
+        cache_max_size=cache_max_size,
+        profile=profile,
+        memory_profile=memory_profile,
+        profile_out=profile_out,
+        watch=watch,
+        live=live,
+        window=window,
+        interval=interval,
+        variants=variants,
+        quality=quality,
+        png_compression=png_compression,
+        colors=colors,
+        terminal=terminal,
     )
 
 
@@ -548,6 +1160,19 @@ def pie(
     dpi,
     output_format,
     alt,
+    cache,
+    cache_max_size,
+    profile,
+    memory_profile,
+    profile_out,
+    watch,
+    live,
+    window,
+    interval,
+    variants,
+    quality,
+    png_compression,
+    colors,
 ):
     """Create a pie chart from columnar data.
 
@@ -580,12 +1205,26 @@ def pie(
         dpi,
         output_format=output_format,
         alt=alt,
+        cache=cache,
+        cache_max_size=cache_max_size,
+        profile=profile,
+        memory_profile=memory_profile,
+        profile_out=profile_out,
+        watch=watch,
+        live=live,
+        window=window,
+        interval=interval,
+        variants=variants,
+        quality=quality,
+        png_compression=png_compression,
+        colors=colors,
     )
 
 
 @cli.command()
 @common_options
 @click.option("--bins", default=10, type=int, help="Number of histogram bins")
+@_terminal_option
 def histogram(
     file,
     output,
@@ -606,6 +1245,20 @@ def histogram(
     bins,
     output_format,
     alt,
+    cache,
+    cache_max_size,
+    profile,
+    memory_profile,
+    profile_out,
+    watch,
+    live,
+    window,
+    interval,
+    variants,
+    quality,
+    png_compression,
+    colors,
+    terminal,
 ):
     """Create a histogram showing the distribution of a numeric column.
 
@@ -639,14 +1292,675 @@ def histogram(
         bins=bins,
         output_format=output_format,
         alt=alt,
+        cache=cache,
+        cache_max_size=cache_max_size,
+        profile=profile,
+        memory_profile=memory_profile,
+        profile_out=profile_out,
+        watch=watch,
+        live=live,
+        window=window,
+        interval=interval,
+        variants=variants,
+        quality=quality,
+        png_compression=png_compression,
+        colors=colors,
+        terminal=terminal,
+    )
+
+
+def _parse_charts(ctx, param, values):
+    """Parse --chart TYPE[:OUTPUT] values into (chart_type, output) pairs."""
+    charts = []
+    for value in values:
+        chart_type, _, output = value.partition(":")
+        if chart_type not in CHART_TYPES:
+            raise click.BadParameter(
+                f"unknown chart type {chart_type!r}, "
+                f"choose from {', '.join(CHART_TYPES)}"
+            )
+        charts.append((chart_type, output or None))
+    return charts
+
+
+def _render_columns(
+    chart_type,
+    columns,
+    x_col,
+    y_cols,
+    output_path,
+    title=None,
+    want_alt=True,
+    **options,
+):
+    """Render a chart from already resolved columns, returning the alt text.
+
+    Like _render_rows, but columns is a charts.RowColumns or
+    shm.AttachedColumns, so columns extracted and converted for an earlier
+    chart of the same rows are reused.
+    """
+    from chartroom.charts import plot
+
+    with profiling.stage(f"render_{chart_type}", rows=columns.count):
+        # Pie charts and histograms only plot the first y column
+        plotted = y_cols[:1] if chart_type in ("pie", "histogram") else y_cols
+        summaries = plot(
+            chart_type,
+            columns.x_values(chart_type, x_col),
+            {yc: columns.numbers(yc) for yc in plotted},
+            output_path,
+            title=title,
+            **options,
+        )
+    if not want_alt:
+        return None
+    with profiling.stage("alt_text"):
+        return generate_alt_text(
+            chart_type,
+            columns.count,
+            x_col,
+            y_cols,
+            summaries[y_cols[0]],
+            lambda i: columns.label(x_col, i),
+            title=title,
+        )
+
+
+def _chart_profile(record_memory):
+    """Profile one chart of multi on its own, unless record_memory is None."""
+    if record_memory is None:
+        return contextlib.nullcontext()
+    return profiling.record(record_memory)
+
+
+def _render_shared(item):
+    """Render one chart of multi --jobs from columns in shared memory.
+
+    Returns (alt_text, profile), where profile is None unless requested.
+    """
+    handle, chart_type, x_col, y_cols, output_path, options, record_memory = item
+    from chartroom.shm import attach
+
+    with _chart_profile(record_memory) as chart_prof, attach(handle) as columns:
+        alt_text = _render_columns(
+            chart_type, columns, x_col, y_cols, output_path, **options
+        )
+    return alt_text, chart_prof
+
+
+def _jobs_option(default=1):
+    return click.option(
+        "-j",
+        "--jobs",
+        default=default,
+        type=click.IntRange(min=0),
+        help="Render charts in this many worker processes (0 for one per CPU)",
+    )
+
+
+@cli.command()
+@click.argument("file", required=False, default=None)
+@click.option(
+    "--chart",
+    "charts",
+    multiple=True,
+    required=True,
+    metavar="TYPE[:OUTPUT]",
+    callback=_parse_charts,
+    help=(
+        "Chart type to render and where to save it, e.g. bar:bar.png "
+        "(repeatable). OUTPUT defaults to chart.png, chart-2.png, ..."
+    ),
+)
+@_apply_options(_data_options)
+@_apply_options(_style_options)
+@click.option("--bins", default=10, type=int, help="Number of histogram bins")
+@_apply_options(_encoding_options)
+@_jobs_option()
+@_output_format_option
+@_apply_options(_profile_options)
+def multi(
+    file,
+    charts,
+    x,
+    y,
+    csv,
+    tsv,
+    json,
+    jsonl,
+    sql,
+    title,
+    xlabel,
+    ylabel,
+    width,
+    height,
+    style,
+    dpi,
+    bins,
+    quality,
+    png_compression,
+    colors,
+    jobs,
+    output_format,
+    profile,
+    memory_profile,
+    profile_out,
+):
+    """Render several charts from a single load of the data.
+
+    The data is loaded and each column converted once, then shared by every
+    --chart. Prints one line per chart in the -f format.
+
+    With -j the charts render in parallel worker processes. The columns
+    they need are copied into shared memory once, and every worker reads
+    them from there rather than being sent its own copy of the data.
+
+    \b
+    Examples:
+      chartroom multi data.csv --chart bar:bar.png --chart pie:pie.png
+      chartroom multi --sql my.db 'select * from t' --chart line --chart histogram
+      chartroom multi big.csv -j 4 --chart line:a.png --chart histogram:b.png
+    """
+    from chartroom.charts import RowColumns
+
+    encoding = Encoding(quality=quality, compress_level=png_compression, colors=colors)
+    options = dict(
+        title=title,
+        want_alt=output_format != "path",
+        xlabel=xlabel,
+        ylabel=ylabel,
+        width=width,
+        height=height,
+        style=style,
+        dpi=dpi,
+        bins=bins,
+        encoding=encoding,
+    )
+    profile_context = profiling.profiled(
+        timings=profile, memory=memory_profile, cprofile_path=profile_out
+    )
+    try:
+        with profile_context as prof:
+            with profiling.stage("load") as load_stage:
+                rows = _load_data(file, csv, tsv, json, jsonl, sql)
+                load_stage.rows = len(rows)
+            columns = RowColumns(rows)
+            with profiling.stage("resolve_columns"):
+                resolved = [
+                    (chart_type, *resolve_columns(rows, x, y, chart_type=chart_type))
+                    for chart_type, _ in charts
+                ]
+            # JSON output reports a profile per chart, so each chart's
+            # stages are recorded separately from the shared ones
+            record_memory = None
+            if prof is not None and output_format == "json":
+                record_memory = memory_profile
+            jobs = min(resolve_jobs(jobs), len(charts))
+            if jobs > 1:
+                results = _multi_shared(
+                    columns, charts, resolved, jobs, options, record_memory
+                )
+            else:
+                results = _multi_serial(
+                    columns, charts, resolved, options, record_memory
+                )
+            for output_path, alt_text, chart_prof in results:
+                if chart_prof is not None:
+                    chart_prof = profiling.combine(_load_stages(prof), chart_prof)
+                click.echo(
+                    _format_output(output_path, output_format, alt_text, chart_prof)
+                )
+        if prof is not None and output_format != "json":
+            click.echo(prof.format(), err=True)
+    except click.UsageError:
+        raise
+    except (ValueError, sqlite3.OperationalError) as e:
+        raise click.ClickException(str(e))
+
+
+def _load_stages(prof):
+    """The stages of a multi profile that every chart shares.
+
+    These are the ones before the chart renders, which are either recorded
+    in profiles of their own or run inside the "render" stage of --jobs.
+    """
+    return list(
+        itertools.takewhile(
+            lambda record: not (record.depth == 0 and record.name == "render"),
+            prof.stages,
+        )
+    )
+
+
+def _multi_serial(columns, charts, resolved, options, record_memory=None):
+    """Render each multi chart in turn, yielding (output_path, alt_text, profile).
+
+    profile is that chart's own Profile when record_memory is not None.
+    """
+    for (_, output), (chart_type, x_col, y_cols) in zip(charts, resolved):
+        with _output_file(output) as output_path:
+            with _chart_profile(record_memory) as chart_prof:
+                alt_text = _render_columns(
+                    chart_type, columns, x_col, y_cols, output_path, **options
+                )
+        yield output_path, alt_text, chart_prof
+
+
+def _multi_shared(columns, charts, resolved, jobs, options, record_memory=None):
+    """Render the multi charts in jobs worker processes, yielding as above.
+
+    The shared memory blocks are unlinked when rendering finishes or fails,
+    and the reserved chart paths are released if any chart fails.
+    """
+    from chartroom.shm import SharedColumns
+
+    with contextlib.ExitStack() as stack:
+        output_paths = [
+            stack.enter_context(_output_file(output)) for _, output in charts
+        ]
+        with profiling.stage("share_columns", rows=columns.count):
+            shared = stack.enter_context(SharedColumns(columns, resolved))
+        items = [
+            (
+                shared.handle,
+                chart_type,
+                x_col,
+                y_cols,
+                output_path,
+                options,
+                record_memory,
+            )
+            for (chart_type, x_col, y_cols), output_path in zip(resolved, output_paths)
+        ]
+        with profiling.stage("render"):
+            results = list(map_ordered(_render_shared, items, jobs))
+    for output_path, (alt_text, chart_prof) in zip(output_paths, results):
+        yield output_path, alt_text, chart_prof
+
+
+# Spec fields that only make sense on the command line
+_SPEC_EXCLUDED_FIELDS = {
+    "output_format",
+    "profile",
+    "memory_profile",
+    "profile_out",
+    "watch",
+    "live",
+    "window",
+    "interval",
+    "terminal",
+}
+
+
+def _spec_to_kwargs(spec):
+    """Validate a chart spec dict and convert it to chart keyword arguments.
+
+    A spec uses the same field names as the chart subcommand options, plus a
+    "type" key naming the chart type. Returns (chart_type, kwargs).
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("Spec must be a JSON object")
+    chart_type = spec.get("type")
+    if chart_type not in CHART_TYPES:
+        raise ValueError(
+            f"Unknown chart type: {chart_type!r}. "
+            f"Expected one of: {', '.join(CHART_TYPES)}"
+        )
+    command = cli.commands[chart_type]
+    params = {
+        param.name: param
+        for param in command.params
+        if param.name not in _SPEC_EXCLUDED_FIELDS
+    }
+    unknown = sorted(set(spec) - set(params) - {"type"})
+    if unknown:
+        raise ValueError(f"Unknown spec field(s): {', '.join(unknown)}")
+    ctx = click.Context(command)
+    kwargs = {}
+    for name, param in params.items():
+        value = spec.get(name)
+        if value is None:
+            kwargs[name] = () if param.multiple else param.get_default(ctx)
+            continue
+        if param.multiple and isinstance(value, str):
+            value = [value]
+        try:
+            kwargs[name] = param.type_cast_value(ctx, value)
+        except click.BadParameter as e:
+            raise ValueError(f"Invalid value for '{name}': {e.message}")
+    return chart_type, kwargs
+
+
+def _render_spec(spec, fp=None):
+    """Render a single chart spec, returning its -f json output as a dict.
+
+    If fp is provided, data is read from that binary file-like object
+    instead of the spec's "file" or "sql".
+    """
+    chart_type, kwargs = _spec_to_kwargs(spec)
+    if kwargs["file"] is None and not kwargs["sql"] and fp is None:
+        raise ValueError("Spec must include either 'file' or 'sql'")
+    output_path, alt_text = _render_chart(
+        chart_type, CHART_TYPES[chart_type], fp=fp, **kwargs
+    )
+    return {
+        "path": output_path,
+        "alt": alt_text,
+        "bytes": os.path.getsize(output_path),
+    }
+
+
+def _capture_errors(render, key, number):
+    """Return render(), or {key: number, "error": ...} if it raised."""
+    try:
+        return render()
+    except click.ClickException as e:
+        message = e.format_message()
+    except Exception as e:
+        message = str(e)
+    return {key: number, "error": message}
+
+
+def _batch_item(item):
+    """Render one (line_number, line) batch item, capturing any error."""
+    line_number, line = item
+    return _capture_errors(
+        lambda: _render_spec(json_mod.loads(line)), "line", line_number
+    )
+
+
+def _build_item(item):
+    """Render one (chart_number, spec) build file chart, capturing any error."""
+    number, spec = item
+    return _capture_errors(lambda: _render_spec(spec), "chart", number)
+
+
+def _build_fingerprint(spec, state):
+    """Return (fingerprint, output_path, variant_paths) for a build file chart.
+
+    The fingerprint covers the input digest from the build.BuildState, every
+    option and the chartroom and matplotlib versions.
+    """
+    chart_type, kwargs = _spec_to_kwargs(spec)
+    if not kwargs["output"]:
+        raise ValueError("Chart must include 'output'")
+    if kwargs["file"] is None and not kwargs["sql"]:
+        raise ValueError("Chart must include either 'file' or 'sql'")
+    digest = state.input_digest(kwargs["file"], kwargs["sql"])
+    variant_paths = [Variant.parse(value).path for value in kwargs["variants"]]
+    return (
+        chart_key(digest, chart_type, kwargs),
+        os.path.abspath(kwargs["output"]),
+        variant_paths,
+    )
+
+
+@cli.command()
+@click.argument("spec_file", type=click.File("r"))
+@_jobs_option()
+def batch(spec_file, jobs):
+    """Render many charts in one process from a JSONL file of chart specs.
+
+    Each line is a JSON object with a "type" key (bar, line, scatter, pie or
+    histogram) plus any of that subcommand's options, using the option names
+    as keys. Each spec must provide either "file" or "sql". One JSON object
+    is written to stdout per chart, in the same shape as -f json.
+
+    A spec that fails produces {"line": N, "error": "..."} instead and the
+    remaining specs are still rendered. The exit code is 1 if any failed.
+
+    \b
+    Examples:
+      chartroom batch specs.jsonl
+      chartroom batch specs.jsonl --jobs 8
+      echo '{"type": "bar", "file": "data.csv", "output": "bar.png"}' | \\
+        chartroom batch -
+
+    \b
+    Example spec line:
+      {"type": "line", "file": "data.csv", "x": "month", "y": ["a", "b"]}
+    """
+    items = (
+        (line_number, line)
+        for line_number, line in enumerate(spec_file, 1)
+        if line.strip()
+    )
+    failed = False
+    for result in map_ordered(_batch_item, items, resolve_jobs(jobs)):
+        if "error" in result:
+            failed = True
+            click.echo(f"Error: Line {result['line']}: {result['error']}", err=True)
+        click.echo(json_mod.dumps(result))
+    if failed:
+        sys.exit(1)
+
+
+@cli.command()
+@click.argument("build_file", type=click.Path(exists=True, dir_okay=False))
+@_jobs_option(default=0)
+@click.option(
+    "--force", is_flag=True, help="Rebuild every chart, even if it is up to date"
+)
+@click.option(
+    "--state",
+    "state_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help=(
+        "JSON file recording what each chart was built from "
+        "(default: .NAME.build-state.json beside BUILD_FILE)"
+    ),
+)
+def build(build_file, jobs, force, state_path):
+    """Build the charts described in a TOML file, skipping unchanged ones.
+
+    Each [[chart]] entry is a chart spec, with the same keys as a line of
+    "chartroom batch" input plus a required "output". Keys in a [defaults]
+    table apply to every chart. Relative paths are resolved against the
+    directory of BUILD_FILE.
+
+    A chart is only rebuilt if its input file or database, its options or
+    the chartroom or matplotlib version changed since it was last built, or
+    its output is missing. Charts that need building are rendered in
+    parallel. One JSON object is written to stdout per chart, in the same
+    shape as -f json plus "built": true or false. The exit code is 1 if any
+    chart failed.
+
+    \b
+    Example charts.toml:
+      [defaults]
+      width = 8
+
+    \b
+      [[chart]]
+      type = "bar"
+      file = "sales.csv"
+      x = "region"
+      output = "charts/sales.png"
+
+    \b
+      [[chart]]
+      type = "line"
+      sql = ["metrics.db", "select day, total from daily"]
+      output = "charts/daily.png"
+    """
+    from chartroom.build import BuildState, default_state_path, load_build_file
+
+    try:
+        specs = load_build_file(build_file)
+    except (OSError, ValueError) as e:
+        raise click.ClickException(str(e))
+    state = BuildState(state_path or default_state_path(build_file))
+    failed = False
+
+    def report(result):
+        nonlocal failed
+        if "error" in result:
+            failed = True
+            click.echo(f"Error: Chart {result['chart']}: {result['error']}", err=True)
+        click.echo(json_mod.dumps(result))
+
+    pending = []
+    outputs = set()
+    for number, spec in enumerate(specs, 1):
+        try:
+            fingerprint, output, variant_paths = _build_fingerprint(spec, state)
+            if output in outputs:
+                raise ValueError(f"Another chart also writes to {output}")
+        except (ValueError, sqlite3.OperationalError) as e:
+            report({"chart": number, "error": str(e)})
+            continue
+        outputs.add(output)
+        alt = None if force else state.up_to_date(output, fingerprint, variant_paths)
+        if alt is None:
+            for path in (output, *variant_paths):
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            pending.append((number, spec, fingerprint))
+            continue
+        report(
+            {
+                "path": output,
+                "alt": alt,
+                "bytes": os.path.getsize(output),
+                "built": False,
+            }
+        )
+    items = [(number, spec) for number, spec, _ in pending]
+    jobs = min(resolve_jobs(jobs), len(items))
+    try:
+        for (number, spec, fingerprint), result in zip(
+            pending, map_ordered(_build_item, items, jobs)
+        ):
+            if "error" in result:
+                state.forget(os.path.abspath(spec["output"]))
+            else:
+                state.record(result["path"], fingerprint, result["alt"])
+                result["built"] = True
+            report(result)
+    finally:
+        # Charts built before an interruption stay built
+        state.save()
+    if failed:
+        sys.exit(1)
+
+
+@cli.command()
+@click.option("--host", default="127.0.0.1", help="Host to listen on")
+@click.option(
+    "--socket",
+    "socket_path",
+    is_flag=False,
+    flag_value="",
+    default=None,
+    metavar="PATH",
+    help=(
+        "Listen on a Unix socket instead of TCP. Without PATH, uses the socket "
+        "that chart commands are automatically forwarded to."
+    ),
+)
+@click.option("-p", "--port", default=8000, type=int, help="Port to listen on")
+@_jobs_option(default=0)
+@click.option(
+    "--max-body",
+    default=50 * 1024 * 1024,
+    type=click.IntRange(min=1),
+    help="Maximum request body size in bytes",
+)
+@click.option(
+    "--timeout",
+    default=30.0,
+    type=click.FloatRange(min=0),
+    help="Seconds allowed per render (0 for no limit)",
+)
+@click.option(
+    "--max-pending",
+    default=None,
+    type=click.IntRange(min=1),
+    help="Renders allowed to queue or run at once (default: twice --jobs)",
+)
+def serve(host, port, socket_path, jobs, max_body, timeout, max_pending):
+    """Run a local HTTP server that renders charts in warm worker processes.
+
+    POST data to /render/TYPE with chart options as query string parameters,
+    using the same names as the subcommand options. The response is the PNG
+    with the URL-encoded alt text in the X-Chartroom-Alt header.
+
+    With --socket the server listens on a Unix socket instead. While it is
+    running on the default socket, chart commands such as "chartroom bar" send
+    their arguments and input to it rather than rendering in a new process.
+    Set CHARTROOM_SOCKET to change the default socket path, or to an empty
+    string to stop commands from being forwarded.
+
+    \b
+    Examples:
+      chartroom serve --port 8000 --jobs 4
+      curl --data-binary @data.csv \\
+        'http://127.0.0.1:8000/render/bar?csv=1&title=Sales' -o chart.png
+      chartroom serve --socket
+    """
+    from chartroom.server import serve as run_server
+
+    if socket_path == "":
+        socket_path = client.default_socket_path()
+        if socket_path is None:
+            raise click.UsageError("No default socket path is available")
+    run_server(
+        host,
+        port,
+        resolve_jobs(jobs),
+        max_body,
+        timeout,
+        max_pending,
+        socket_path=socket_path,
     )
 
 
 @cli.command()
 def styles():
     """List available matplotlib styles."""
-    import matplotlib.pyplot as plt
+    from chartroom.warmup import available_styles
+
+    for style in available_styles():
+        click.echo(style)
+
+
+@cli.command()
+@click.option(
+    "--render",
+    "render_chart",
+    is_flag=True,
+    help="Also render a small chart, to check that drawing and saving work",
+)
+@click.option(
+    "--rebuild-fonts",
+    is_flag=True,
+    help=(
+        "Rebuild matplotlib's font cache even if one exists, for example "
+        "after installing fonts"
+    ),
+)
+def warmup(render_chart, rebuild_fonts):
+    """Build matplotlib's font cache and check every style ahead of time.
+
+    On a fresh machine the first chart is slow, because matplotlib scans the
+    installed fonts to build its font cache. Run this when building a
+    container image so that cost is paid once, at build time. Every style
+    listed by "chartroom styles" is then loaded and its font resolved. The
+    time taken by each step is printed. The exit code is 1 if any style
+    failed to load or gave warnings.
+
+    \b
+    Examples:
+      chartroom warmup
+      chartroom warmup --render --rebuild-fonts
+    """
+    from chartroom.warmup import warm
 
-    for style in sorted(plt.style.available):
-        if not style.startswith("_"):
-            click.echo(style)
+    with profiling.record() as prof:
+        font_cache, problems = warm(render=render_chart, rebuild_fonts=rebuild_fonts)
+    click.echo(f"Font cache: {font_cache}")
+    click.echo(prof.format())
+    for problem in problems:
+        click.echo(f"Error: Style {problem}", err=True)
+    if problems:
+        sys.exit(1)
@@ -0,0 +1,112 @@
+import base64
+import json
+import os
+import socket
+from typing import Dict, List, Optional, Tuple
+
+# How long to wait when checking whether a daemon is listening
+CONNECT_TIMEOUT = 0.5
+
+# Environment variables that configure chartroom, such as CHARTROOM_CACHE
+ENV_PREFIX = "CHARTROOM_"
+
+# This module is imported on every CLI invocation, so it speaks just enough
+# HTTP/1.0 over a raw socket to avoid the import cost of http.client
+
+
+def default_socket_path() -> Optional[str]:
+    """Path of the Unix socket the chartroom daemon listens on.
+
+    Set CHARTROOM_SOCKET to override it, or to an empty string to disable
+    forwarding. Returns None on platforms without Unix sockets.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    path = os.environ.get("CHARTROOM_SOCKET")
+    if path is not None:
+        return path or None
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "chartroom.sock")
+    import tempfile
+
+    return os.path.join(tempfile.gettempdir(), f"chartroom-{os.getuid()}.sock")
+
+
+def chartroom_environ() -> Dict[str, str]:
+    """The CHARTROOM_* variables of this process, to apply on the daemon."""
+    return {k: v for k, v in os.environ.items() if k.startswith(ENV_PREFIX)}
+
+
+def connect(socket_path: Optional[str]) -> Optional[socket.socket]:
+    """Connect to a daemon on socket_path, returning None if none is listening."""
+    if not socket_path or not os.path.exists(socket_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def _request(sock: socket.socket, path: str, body: bytes) -> Tuple[int, bytes]:
+    """Send a POST request and return (status, body) of the response."""
+    sock.sendall(
+        (
+            f"POST {path} HTTP/1.0\r\n"
+            "Host: localhost\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode("ascii")
+        + body
+    )
+    chunks = []
+    # An HTTP/1.0 server closes the connection after the response
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    head, separator, response_body = b"".join(chunks).partition(b"\r\n\r\n")
+    status_line = head.split(b"\r\n", 1)[0].split()
+    if not separator or len(status_line) < 2 or not status_line[1].isdigit():
+        raise OSError("Invalid response from daemon")
+    return int(status_line[1]), response_body
+
+
+def run_cli(
+    sock: socket.socket,
+    args: List[str],
+    cwd: str,
+    stdin: Optional[bytes] = None,
+    env: Optional[Dict[str, str]] = None,
+) -> Tuple[int, str, str]:
+    """Ask the daemon to run the CLI with args, returning (exit_code, stdout, stderr).
+
+    stdin is the data to present on standard input, or None to behave as if
+    standard input were an interactive terminal. Raises OSError if the daemon
+    could not handle the request.
+
+    env holds CHARTROOM_* variables that replace the daemon's own while the
+    command runs, so options such as --cache pick up the caller's settings.
+    """
+    body = json.dumps(
+        {
+            "args": args,
+            "cwd": cwd,
+            "stdin": None if stdin is None else base64.b64encode(stdin).decode("ascii"),
+            "env": env,
+        }
+    )
+    status, response_body = _request(sock, "/cli", body.encode("utf-8"))
+    try:
+        data = json.loads(response_body)
+    except ValueError as e:
+        raise OSError(f"Invalid response from daemon: {e}") from e
+    if status != 200:
+        raise OSError(data.get("error") or f"Daemon returned {status}")
+    return data["exit_code"], data["stdout"], data["stderr"]
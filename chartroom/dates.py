@@ -0,0 +1,44 @@
+import re
+import warnings
+from typing import Optional, Sequence
+
+# What the first x value has to look like before the whole column is parsed:
+# an ISO-8601 date with at least a year and month, or ten digits of epoch
+# seconds (2001 to 2286). Plain years such as "2024" stay category labels.
+ISO_DATE = re.compile(r"\s*\d{4}-\d{2}(?:-\d{2})?(?:[T ]\d{2}.*)?\s*$")
+EPOCH_SECONDS = re.compile(r"\s*\d{10}(?:\.\d*)?\s*$")
+
+
+def parse_dates(values: Sequence) -> Optional["numpy.ndarray"]:
+    """Parse x values into a datetime64 array, or None if they are not dates.
+
+    The first value decides whether to try ISO-8601 strings or epoch seconds,
+    then the whole column is converted by NumPy in one call. If any value
+    fails to parse the column is treated as labels. Times with a UTC offset
+    are converted to UTC.
+    """
+    import numpy as np
+
+    if isinstance(values, np.ndarray) and values.dtype.kind == "M":
+        return values
+    if not len(values):
+        return None
+    first = str(values[0])
+    try:
+        if ISO_DATE.match(first):
+            with warnings.catch_warnings():
+                # Offsets are applied, but NumPy warns that it drops them
+                warnings.filterwarnings(
+                    "ignore", "no explicit representation of timezones"
+                )
+                dates = np.asarray(values, dtype="datetime64[us]")
+            # Blank and missing values parse as NaT rather than failing
+            return None if np.isnat(dates).any() else dates
+        if EPOCH_SECONDS.match(first):
+            seconds = np.asarray(values, dtype=float)
+            if not ((seconds >= 1e9) & (seconds < 1e10)).all():
+                return None
+            return (seconds * 1e6).astype("int64").astype("datetime64[us]")
+    except (ValueError, TypeError):
+        return None
+    return None
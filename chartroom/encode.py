@@ -0,0 +1,114 @@
+import io
+from typing import Any, Dict, Optional
+
+# Formats savefig encodes with Pillow, which accept pil_kwargs
+PIL_FORMATS = {"png", "jpg", "jpeg", "webp", "tif", "tiff"}
+
+# Pillow's names for the formats, for images saved with Image.save()
+_PIL_NAMES = {
+    "png": "PNG",
+    "jpg": "JPEG",
+    "jpeg": "JPEG",
+    "webp": "WEBP",
+    "tif": "TIFF",
+    "tiff": "TIFF",
+}
+
+
+class Encoding:
+    """Encoder settings for raster output, passed through to Pillow.
+
+    quality (1-100) applies to JPEG and WebP, compress_level (0-9) to PNG,
+    and colors quantizes PNG output to a palette of that many colors, which
+    shrinks charts with few distinct colors a long way. Settings that do
+    not apply to a format, and every setting for vector formats, are
+    ignored.
+    """
+
+    __slots__ = ("quality", "compress_level", "colors")
+
+    def __init__(
+        self,
+        quality: Optional[int] = None,
+        compress_level: Optional[int] = None,
+        colors: Optional[int] = None,
+    ):
+        self.quality = quality
+        self.compress_level = compress_level
+        self.colors = colors
+
+    def __bool__(self):
+        return any(value is not None for value in self.as_dict().values())
+
+    def as_dict(self) -> Dict[str, Optional[int]]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def pil_kwargs(self, image_format: str) -> Dict[str, Any]:
+        """Keyword arguments for Pillow's encoder for image_format."""
+        kwargs: Dict[str, Any] = {}
+        if self.quality is not None and image_format in ("jpg", "jpeg", "webp"):
+            kwargs["quality"] = self.quality
+        if self.compress_level is not None and image_format == "png":
+            kwargs["compress_level"] = self.compress_level
+        return kwargs
+
+    def save_image(self, image, fp, image_format: str):
+        """Encode a Pillow image as image_format to the binary file object fp."""
+        if image_format == "png" and self.colors is not None:
+            from PIL import Image
+
+            # Fast octree is the only quantizer that keeps the alpha channel
+            image = image.quantize(self.colors, method=Image.Quantize.FASTOCTREE)
+        elif _PIL_NAMES[image_format] == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+        image.save(fp, format=_PIL_NAMES[image_format], **self.pil_kwargs(image_format))
+
+
+# Metadata that would make vector output differ between two renders of the
+# same chart, left out so the same chart always gives the same bytes.
+# PostScript ignores metadata dates and only honors $SOURCE_DATE_EPOCH.
+_VECTOR_METADATA = {
+    "svg": {"Date": None},
+    "pdf": {"CreationDate": None},
+}
+
+
+def _write_vector(fig, fp, image_format: Optional[str], **kwargs):
+    """savefig for vector formats, with reproducible dates and SVG ids."""
+    import matplotlib
+
+    metadata = _VECTOR_METADATA.get(image_format)
+    if metadata is not None:
+        kwargs.setdefault("metadata", metadata)
+    # SVG ids are random unless derived from a fixed salt
+    with matplotlib.rc_context({"svg.hashsalt": "chartroom"}):
+        fig.savefig(fp, format=image_format, **kwargs)
+
+
+def write_figure(
+    fig, fp, image_format: Optional[str], encoding: Optional[Encoding] = None, **kwargs
+):
+    """Encode a matplotlib figure as image_format to the binary file object fp."""
+    if image_format not in PIL_FORMATS:
+        _write_vector(fig, fp, image_format, **kwargs)
+        return
+    if not encoding:
+        fig.savefig(fp, format=image_format, **kwargs)
+        return
+    if image_format != "png" or encoding.colors is None:
+        fig.savefig(
+            fp,
+            format=image_format,
+            pil_kwargs=encoding.pil_kwargs(image_format),
+            **kwargs,
+        )
+        return
+    # Quantizing needs the pixels, so draw to an uncompressed PNG and
+    # re-encode it with Pillow
+    from PIL import Image
+
+    pixels = io.BytesIO()
+    fig.savefig(pixels, format="png", pil_kwargs={"compress_level": 0}, **kwargs)
+    pixels.seek(0)
+    with Image.open(pixels) as image:
+        encoding.save_image(image, fp, image_format)
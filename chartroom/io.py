@@ -4,6 +4,8 @@ import json
 import sqlite3
 from typing import List, Dict, Any, Optional, BinaryIO, Tuple
 
+from chartroom.profiling import stage
+
 
 def load_rows_from_sql(db_path: str, query: str) -> List[Dict[str, Any]]:
     """Execute a SQL query against a SQLite database in read-only mode."""
@@ -97,7 +99,8 @@ def load_rows(
         raise ValueError("No input provided")
 
     if format is None:
-        format, fp = detect_format(fp)
+        with stage("detect_format"):
+            format, fp = detect_format(fp)
 
     loaders = {
         "csv": load_rows_from_csv,
@@ -124,9 +127,16 @@ def resolve_columns(
     """
     if not rows:
         raise ValueError("No data rows found")
+    return resolve_column_names(list(rows[0].keys()), x, y, chart_type)
 
-    columns = list(rows[0].keys())
 
+def resolve_column_names(
+    columns: List[str],
+    x: Optional[str],
+    y: Optional[Tuple[str, ...]],
+    chart_type: str = "bar",
+) -> Tuple[str, List[str]]:
+    """Resolve x and y column names against a list of available columns."""
     x_col = x
     y_cols = list(y) if y else []
 
@@ -0,0 +1,555 @@
+import collections
+import csv
+import io
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from chartroom.charts import (
+    _apply_style,
+    _make_figure,
+    _prepare_for_size,
+    plt,
+)
+from chartroom.encode import Encoding
+from chartroom.io import detect_format, load_rows, load_rows_from_sql
+from chartroom.output import save_figure
+from chartroom.stats import Summary, summarize, to_float
+
+# Long category axes get at most this many tick labels, as labelling every
+# point of a growing series would soon dominate the time to draw a frame
+MAX_CATEGORY_TICKS = 20
+
+
+class _Series:
+    """A column of values that only ever grows."""
+
+    def __init__(self):
+        self._items: List[Any] = []
+
+    def extend(self, values):
+        self._items.extend(values)
+
+    def clear(self):
+        self._items = []
+
+    def values(self):
+        return self._items
+
+    def __len__(self):
+        return len(self._items)
+
+
+class RingBuffer:
+    """A fixed-capacity column keeping only its most recent values.
+
+    Values live in a preallocated NumPy array, so memory use never grows
+    however many values are added.
+    """
+
+    def __init__(self, capacity: int, dtype=float):
+        self._data = np.empty(capacity, dtype=dtype)
+        self._start = 0
+        self._len = 0
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        capacity = len(self._data)
+        if len(values) >= capacity:
+            self._data[:] = values[-capacity:]
+            self._start = 0
+            self._len = capacity
+            return
+        end = (self._start + self._len) % capacity
+        first = min(len(values), capacity - end)
+        self._data[end : end + first] = values[:first]
+        self._data[: len(values) - first] = values[first:]
+        overflow = max(0, self._len + len(values) - capacity)
+        self._start = (self._start + overflow) % capacity
+        self._len = min(capacity, self._len + len(values))
+
+    def clear(self):
+        self._start = 0
+        self._len = 0
+
+    def values(self) -> np.ndarray:
+        """The values oldest first, as a new array."""
+        end = self._start + self._len
+        if end <= len(self._data):
+            return self._data[self._start : end].copy()
+        return np.concatenate(
+            (self._data[self._start :], self._data[: end - len(self._data)])
+        )
+
+    def __len__(self):
+        return self._len
+
+
+class LiveChart:
+    """A chart whose figure and artists stay alive between renders.
+
+    Call reset() with the initial rows, extend() with rows as they arrive
+    and save() to draw the latest data and write the image. Line and scatter
+    charts update their existing artists in place, and bar charts only add
+    patches for new bars, so each frame costs far less than a fresh render.
+
+    With a window only the most recent window rows are kept, in ring
+    buffers.
+    """
+
+    def __init__(
+        self,
+        chart_type: str,
+        x_col: Optional[str],
+        y_cols: List[str],
+        title: Optional[str] = None,
+        xlabel: Optional[str] = None,
+        ylabel: Optional[str] = None,
+        width: float = 10,
+        height: float = 6,
+        style: Optional[str] = None,
+        dpi: int = 100,
+        bins: int = 10,
+        window: Optional[int] = None,
+        encoding: Optional[Encoding] = None,
+    ):
+        self.chart_type = chart_type
+        self.x_col = x_col
+        self.y_cols = y_cols
+        self.title = title
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.dpi = dpi
+        self.bins = bins
+        self.window = window
+        self.encoding = encoding
+        _apply_style(style)
+        self.fig, self.ax = _make_figure(width, height)
+        self._x = self._new_series(float if chart_type == "scatter" else object)
+        self._y = {col: self._new_series(float) for col in y_cols}
+        # Artists for each y column, created on the first save()
+        self._artists: Dict[str, Any] = {}
+        self._decorate()
+
+    def _new_series(self, dtype):
+        if self.window:
+            return RingBuffer(self.window, dtype)
+        return _Series()
+
+    def reset(self, rows: List[Dict[str, Any]]):
+        """Replace all of the chart's data with rows."""
+        self._x.clear()
+        for series in self._y.values():
+            series.clear()
+        self.extend(rows)
+
+    def extend(self, rows: List[Dict[str, Any]]):
+        """Append rows to the chart's data."""
+        if not rows:
+            return
+        if self.chart_type == "scatter":
+            self._x.extend(to_float([row[self.x_col] for row in rows], self.x_col))
+        elif self.x_col is not None:
+            self._x.extend([str(row[self.x_col]) for row in rows])
+        for col, series in self._y.items():
+            series.extend(to_float([row[col] for row in rows], col))
+
+    def save(self, output_path: str) -> Dict[str, Summary]:
+        """Draw the current data, save it to output_path and return summaries."""
+        summaries = {col: summarize(series.values()) for col, series in self._y.items()}
+        getattr(self, f"_draw_{self.chart_type}")()
+        self.fig.tight_layout()
+        with plt.rc_context(_prepare_for_size(self.ax)):
+            save_figure(self.fig, output_path, encoding=self.encoding, dpi=self.dpi)
+        return summaries
+
+    def close(self):
+        plt.close(self.fig)
+
+    def _decorate(self):
+        if self.title:
+            self.ax.set_title(self.title)
+        if self.chart_type != "pie":
+            if self.xlabel:
+                self.ax.set_xlabel(self.xlabel)
+            if self.ylabel:
+                self.ax.set_ylabel(self.ylabel)
+
+    def _add_legend(self, handles):
+        if len(self.y_cols) > 1:
+            self.ax.legend(handles, self.y_cols)
+
+    def _set_category_ticks(self):
+        labels = list(self._x.values())
+        step = max(1, -(-len(labels) // MAX_CATEGORY_TICKS))
+        positions = list(range(0, len(labels), step))
+        self.ax.set_xticks(positions)
+        self.ax.set_xticklabels([labels[i] for i in positions])
+
+    def _rescale(self):
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+    def _draw_line(self):
+        if not self._artists:
+            for col in self.y_cols:
+                (self._artists[col],) = self.ax.plot([], [], label=col, marker="o")
+            self._add_legend([self._artists[col] for col in self.y_cols])
+        positions = np.arange(len(self._x))
+        for col in self.y_cols:
+            self._artists[col].set_data(positions, np.asarray(self._y[col].values()))
+        self._set_category_ticks()
+        self._rescale()
+
+    def _draw_scatter(self):
+        if not self._artists:
+            for col in self.y_cols:
+                self._artists[col] = self.ax.scatter([], [], label=col)
+            self._add_legend([self._artists[col] for col in self.y_cols])
+        x_values = np.asarray(self._x.values(), dtype=float)
+        # relim() ignores collections, so the data limits are rebuilt by hand
+        self.ax.ignore_existing_data_limits = True
+        for col in self.y_cols:
+            offsets = np.column_stack(
+                [x_values, np.asarray(self._y[col].values(), dtype=float)]
+            )
+            self._artists[col].set_offsets(offsets)
+            if len(offsets):
+                self.ax.update_datalim(offsets)
+        self.ax.autoscale_view()
+
+    def _draw_bar(self):
+        count = len(self._x)
+        n_series = len(self.y_cols)
+        bar_width = 0.8 if n_series == 1 else 0.8 / n_series
+        new_patches = False
+        for i, col in enumerate(self.y_cols):
+            patches = self._artists.setdefault(col, [])
+            values = self._y[col].values()
+            if len(patches) > count:
+                # Fewer bars than before means the data was reset
+                for patch in patches:
+                    patch.remove()
+                del patches[:]
+            for patch, value in zip(patches, values):
+                patch.set_height(value)
+            if count > len(patches):
+                offset = 0 if n_series == 1 else (i - n_series / 2 + 0.5) * bar_width
+                start = len(patches)
+                container = self.ax.bar(
+                    np.arange(start, count) + offset,
+                    values[start:count],
+                    bar_width,
+                    label=col,
+                    color=f"C{i}",
+                )
+                patches.extend(container.patches)
+                new_patches = True
+        if new_patches and n_series > 1 and self.ax.get_legend() is None:
+            self._add_legend([self._artists[col][0] for col in self.y_cols])
+        self._set_category_ticks()
+        self._rescale()
+
+    def _draw_histogram(self):
+        # Bin edges depend on the full range of the data, so every bar may
+        # change and the histogram is drawn again from scratch
+        for patch in self._artists.pop("patches", []):
+            patch.remove()
+        values = self._y[self.y_cols[0]].values()
+        _, _, patches = self.ax.hist(values, bins=self.bins, color="C0")
+        self._artists["patches"] = list(patches)
+        self._rescale()
+
+    def _draw_pie(self):
+        # Every wedge moves when any value changes, so pies are redrawn
+        self.ax.clear()
+        self.ax.pie(
+            self._y[self.y_cols[0]].values(),
+            labels=self._x.values(),
+            autopct="%1.1f%%",
+        )
+        self._decorate()
+
+
+class FileTailer:
+    """Follow a file, reading only the bytes appended since the last read."""
+
+    # Bytes compared on each change to detect a file rewritten in place
+    PREFIX_SIZE = 1024
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        self._inode = None
+        self._mtime_ns = None
+        self._prefix = b""
+
+    def read_all(self) -> bytes:
+        """Read the whole file, following it from its current end."""
+        with open(self.path, "rb") as fp:
+            stat = os.fstat(fp.fileno())
+            data = fp.read()
+        self.offset = len(data)
+        self._inode = stat.st_ino
+        self._mtime_ns = stat.st_mtime_ns
+        self._prefix = data[: self.PREFIX_SIZE]
+        return data
+
+    def poll(self) -> Optional[bytes]:
+        """Return newly appended bytes, or None if the file has not grown.
+
+        Raises FileRewritten if the file was truncated, replaced or modified
+        somewhere other than its end.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            # Probably being replaced, check again next time
+            return None
+        if stat.st_ino != self._inode or stat.st_size < self.offset:
+            raise FileRewritten(self.path)
+        if stat.st_size == self.offset:
+            if stat.st_mtime_ns != self._mtime_ns:
+                raise FileRewritten(self.path)
+            return None
+        with open(self.path, "rb") as fp:
+            if fp.read(len(self._prefix)) != self._prefix:
+                raise FileRewritten(self.path)
+            fp.seek(self.offset)
+            data = fp.read()
+        self.offset += len(data)
+        self._mtime_ns = stat.st_mtime_ns
+        return data
+
+
+class FileRewritten(Exception):
+    pass
+
+
+class _LineParser:
+    """Parse rows from chunks of CSV, TSV or JSONL that may end mid-line."""
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self.fieldnames: Optional[List[str]] = None
+        self._pending = b""
+
+    def feed(self, data: bytes) -> List[Dict[str, Any]]:
+        """Parse the complete lines of data, holding back any partial line."""
+        complete, newline, self._pending = (self._pending + data).rpartition(b"\n")
+        text = (complete + newline).decode("utf-8")
+        if not text:
+            return []
+        if self.fmt == "jsonl":
+            return [json.loads(line) for line in text.splitlines() if line.strip()]
+        dialect = csv.excel_tab if self.fmt == "tsv" else csv.excel
+        reader = csv.DictReader(
+            io.StringIO(text), fieldnames=self.fieldnames, dialect=dialect
+        )
+        return [dict(row) for row in reader]
+
+
+def _parse_header(line: bytes, fmt: str) -> List[str]:
+    dialect = csv.excel_tab if fmt == "tsv" else csv.excel
+    return next(csv.reader([line.decode("utf-8-sig").rstrip("\r\n")], dialect=dialect))
+
+
+class FileSource:
+    """Rows from a file that another process may append to or rewrite.
+
+    CSV, TSV and JSONL files are followed incrementally. A JSON array has
+    to be parsed as a whole, so any change to one triggers a full reload.
+    """
+
+    finished = False
+
+    def __init__(self, path: str, fmt: Optional[str] = None):
+        self.path = path
+        self.fmt = fmt
+        self._tailer = FileTailer(path)
+        self._parser: Optional[_LineParser] = None
+
+    def load(self) -> List[Dict[str, Any]]:
+        data = self._tailer.read_all()
+        fmt = self.fmt
+        if fmt is None:
+            fmt, _ = detect_format(io.BytesIO(data))
+        if fmt == "json":
+            self._parser = None
+            return load_rows(fp=io.BytesIO(data), format=fmt)
+        self._parser = _LineParser(fmt)
+        rows = load_rows(fp=io.BytesIO(data), format=fmt)
+        if fmt != "jsonl":
+            self._parser.fieldnames = _parse_header(data.split(b"\n", 1)[0], fmt)
+        return rows
+
+    def poll(self) -> Optional[Tuple[bool, List[Dict[str, Any]]]]:
+        """Check for changes, returning None or (reset, rows).
+
+        reset is True when rows replace everything loaded so far, and False
+        when rows were appended to the file.
+        """
+        try:
+            data = self._tailer.poll()
+        except FileRewritten:
+            return True, self.load()
+        if data is None:
+            return None
+        if self._parser is None:
+            return True, self.load()
+        return False, self._parser.feed(data)
+
+
+class SQLiteSource:
+    """Rows from a SQL query, re-run whenever the database file changes."""
+
+    finished = False
+
+    def __init__(self, db_path: str, query: str):
+        self.db_path = db_path
+        self.query = query
+        self._signature = None
+
+    def _stat(self):
+        signature = []
+        for path in (self.db_path, self.db_path + "-wal"):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                signature.append(None)
+            else:
+                signature.append((stat.st_mtime_ns, stat.st_size))
+        return signature
+
+    def load(self) -> List[Dict[str, Any]]:
+        self._signature = self._stat()
+        return load_rows_from_sql(self.db_path, self.query)
+
+    def poll(self) -> Optional[Tuple[bool, List[Dict[str, Any]]]]:
+        if self._stat() == self._signature:
+            return None
+        return True, self.load()
+
+
+def _detect_line_format(line: bytes) -> str:
+    stripped = line.strip()
+    if stripped.startswith(b"{"):
+        return "jsonl"
+    if stripped.startswith(b"["):
+        raise ValueError("Streams must be CSV, TSV or newline-delimited JSON")
+    if b"\t" in line and b"," not in line:
+        return "tsv"
+    return "csv"
+
+
+class StreamSource:
+    """Rows from a stream that may never end, such as stdin.
+
+    A background thread reads lines as they arrive. Only the most recent
+    window lines are held between polls, so a producer that outpaces the
+    frame rate cannot make memory grow.
+    """
+
+    def __init__(self, stream, fmt: Optional[str] = None, window: Optional[int] = None):
+        self.fmt = fmt
+        self.finished = False
+        self._parser: Optional[_LineParser] = None
+        self._lines: Deque[bytes] = collections.deque(maxlen=window)
+        self._eof = False
+        self._error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._read, args=(stream,), daemon=True)
+        self._thread.start()
+
+    def _read(self, stream):
+        try:
+            for line in iter(stream.readline, b""):
+                if not line.strip():
+                    continue
+                if self._parser is None:
+                    if self.fmt is None:
+                        self.fmt = _detect_line_format(line)
+                    self._parser = _LineParser(self.fmt)
+                    if self.fmt != "jsonl":
+                        self._parser.fieldnames = _parse_header(line, self.fmt)
+                        continue
+                with self._lock:
+                    self._lines.append(line)
+                self._ready.set()
+        except Exception as e:
+            self._error = e
+        finally:
+            with self._lock:
+                self._eof = True
+            self._ready.set()
+
+    def _take(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            lines = list(self._lines)
+            self._lines.clear()
+            self._ready.clear()
+            self.finished = self._eof
+        if self._error is not None:
+            raise self._error
+        if not lines:
+            return []
+        if not lines[-1].endswith(b"\n"):
+            # A final line without a newline is still a complete row at EOF
+            lines[-1] += b"\n"
+        return self._parser.feed(b"".join(lines))
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Wait for the first rows to arrive, returning [] if the stream ends."""
+        while True:
+            self._ready.wait()
+            rows = self._take()
+            if rows or self.finished:
+                return rows
+
+    def poll(self) -> Optional[Tuple[bool, List[Dict[str, Any]]]]:
+        rows = self._take()
+        if not rows:
+            return None
+        return False, rows
+
+
+def watch(
+    source,
+    chart: LiveChart,
+    rows: List[Dict[str, Any]],
+    output_path: str,
+    interval: float,
+    on_frame: Callable[[Dict[str, Summary], List[Dict[str, Any]]], None],
+    stop: Optional[Callable[[], bool]] = None,
+    window: Optional[int] = None,
+):
+    """Render rows, then re-render each time source reports new data.
+
+    on_frame(summaries, rows) is called after every save, with all of the
+    rows charted so far, or the most recent window of them. Runs until the
+    source is finished, stop() returns True, or forever.
+    """
+    if window:
+        rows = collections.deque(rows, maxlen=window)
+    chart.reset(rows)
+    on_frame(chart.save(output_path), rows)
+    while not source.finished and not (stop and stop()):
+        time.sleep(interval)
+        change = source.poll()
+        if change is None:
+            continue
+        reset, new_rows = change
+        if reset:
+            rows = collections.deque(new_rows, maxlen=window) if window else new_rows
+            chart.reset(rows)
+        elif new_rows:
+            rows.extend(new_rows)
+            chart.extend(new_rows)
+        else:
+            continue
+        on_frame(chart.save(output_path), rows)
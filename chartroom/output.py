@@ -0,0 +1,193 @@
+import contextlib
+import io
+import os
+import re
+import secrets
+import shutil
+from typing import List, Optional, Sequence, Set
+
+from chartroom.encode import PIL_FORMATS, Encoding, write_figure
+
+_VARIANT_MODIFIER = re.compile(r"(\d+(?:\.\d+)?)x|w(\d+)")
+
+
+def _taken_indexes(directory: str, stem: str, extension: str) -> Set[int]:
+    """Indexes already used by stem.ext (1), stem-2.ext (2), ... in directory.
+
+    A single directory scan is much cheaper than probing each candidate name
+    in turn once a directory holds thousands of charts.
+    """
+    taken = set()
+    prefix = stem + "-"
+    with os.scandir(directory) as it:
+        for entry in it:
+            name = entry.name
+            if not name.endswith(extension):
+                continue
+            base = name[: -len(extension)]
+            if base == stem:
+                taken.add(1)
+            elif base.startswith(prefix):
+                digits = base[len(prefix) :]
+                if digits.isdigit() and str(int(digits)) == digits:
+                    taken.add(int(digits))
+    return taken
+
+
+def reserve_output(
+    directory: str = ".", stem: str = "chart", extension: str = ".png"
+) -> str:
+    """Create an empty file with the first free name of chart.png, chart-2.png, ...
+
+    The file is created with O_EXCL, so concurrent invocations can never be
+    handed the same name. Returns the path of the reserved file.
+    """
+    taken = _taken_indexes(directory, stem, extension)
+    index = 1
+    while True:
+        while index in taken:
+            index += 1
+        name = stem + extension if index == 1 else f"{stem}-{index}{extension}"
+        path = os.path.join(directory, name)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            # Another process claimed it since the scan
+            taken.add(index)
+            continue
+        os.close(fd)
+        return path
+
+
+def release_output(path: str):
+    """Remove a file created by reserve_output if nothing was written to it."""
+    with contextlib.suppress(FileNotFoundError):
+        if os.path.getsize(path) == 0:
+            os.unlink(path)
+
+
+@contextlib.contextmanager
+def atomic_write(path: str):
+    """Open a temporary file next to path that replaces path on success.
+
+    Readers never see a partially written file. Unlike tempfile.mkstemp the
+    file gets the usual umask-based permissions.
+    """
+    tmp_path = os.path.join(
+        os.path.dirname(path),
+        f".{os.path.basename(path)}.{secrets.token_hex(4)}.tmp",
+    )
+    try:
+        with open(tmp_path, "xb") as fp:
+            yield fp
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+
+
+def copy_atomic(src: str, dest: str):
+    """Copy src to dest, replacing dest in a single step."""
+    with open(src, "rb") as src_fp, atomic_write(dest) as dest_fp:
+        shutil.copyfileobj(src_fp, dest_fp)
+
+
+class Variant:
+    """An extra image saved from the same figure as the main output.
+
+    The figure is written again at scale times the DPI, in the format given
+    by the path's extension. A thumbnail, with width set, is instead made by
+    resampling the largest raster already written to that many pixels wide.
+    """
+
+    __slots__ = ("path", "scale", "width")
+
+    def __init__(self, path: str, scale: float = 1.0, width: Optional[int] = None):
+        self.path = path
+        self.scale = scale
+        self.width = width
+
+    @classmethod
+    def parse(cls, value: str) -> "Variant":
+        """Parse PATH, PATH:2x (twice the DPI) or PATH:w200 (200px thumbnail)."""
+        path, sep, modifier = value.rpartition(":")
+        match = _VARIANT_MODIFIER.fullmatch(modifier) if sep else None
+        if match is None:
+            return cls(value)
+        if match.group(1):
+            return cls(path, scale=float(match.group(1)))
+        return cls(path, width=int(match.group(2)))
+
+
+def _extension(path: str) -> Optional[str]:
+    return os.path.splitext(path)[1][1:].lower() or None
+
+
+def save_figure(
+    fig,
+    output,
+    image_format: Optional[str] = None,
+    variants: Sequence[Variant] = (),
+    encoding: Optional[Encoding] = None,
+    **kwargs,
+):
+    """Save a matplotlib figure to a binary file object, or to a path by way
+    of a temporary file, followed by any variants.
+
+    image_format defaults to the path's extension, or PNG for file objects.
+    encoding applies to the output and every variant.
+    """
+    if hasattr(output, "write"):
+        write_figure(fig, output, image_format or "png", encoding, **kwargs)
+    else:
+        # The temporary file's name says nothing about the image format, so
+        # pass the one savefig would otherwise have taken from the extension
+        if image_format is None:
+            image_format = _extension(output)
+        with atomic_write(output) as fp:
+            write_figure(fig, fp, image_format, encoding, **kwargs)
+    if variants:
+        rasters = []
+        if not hasattr(output, "write") and image_format in PIL_FORMATS:
+            rasters.append((1.0, output))
+        _save_variants(fig, variants, rasters, encoding, **kwargs)
+
+
+def _save_variants(fig, variants, rasters, encoding=None, dpi=None, **kwargs):
+    """Write variants of a figure whose layout has already been done.
+
+    rasters lists (scale, path) for the raster images already written.
+    """
+    dpi = dpi or fig.dpi
+    thumbnails: List[Variant] = []
+    for variant in variants:
+        if variant.width is not None:
+            thumbnails.append(variant)
+            continue
+        save_figure(
+            fig, variant.path, encoding=encoding, dpi=dpi * variant.scale, **kwargs
+        )
+        if _extension(variant.path) in PIL_FORMATS:
+            rasters.append((variant.scale, variant.path))
+    if not thumbnails:
+        return
+    from PIL import Image
+
+    if rasters:
+        source = max(rasters, key=lambda raster: raster[0])[1]
+    else:
+        # Only vector output so far, so draw the figure once more as a PNG
+        source = io.BytesIO()
+        fig.savefig(source, format="png", dpi=dpi, **kwargs)
+        source.seek(0)
+    encoding = encoding or Encoding()
+    with Image.open(source) as image:
+        for thumbnail in thumbnails:
+            thumbnail_format = _extension(thumbnail.path)
+            if thumbnail_format not in PIL_FORMATS:
+                raise ValueError(f"Unsupported thumbnail format: {thumbnail.path}")
+            height = max(1, round(image.height * thumbnail.width / image.width))
+            resized = image.resize((thumbnail.width, height), Image.LANCZOS)
+            with atomic_write(thumbnail.path) as fp:
+                encoding.save_image(resized, fp, thumbnail_format)
@@ -0,0 +1,79 @@
+import contextlib
+import os
+import signal
+from typing import Callable, Iterable, Iterator, Optional
+
+
+class RenderTimeout(Exception):
+    pass
+
+
+@contextlib.contextmanager
+def time_limit(seconds):
+    """Raise RenderTimeout if the block runs for longer than seconds.
+
+    Uses SIGALRM, so it only applies in the main thread of a worker process
+    on platforms that support setitimer().
+    """
+    if not seconds or not hasattr(signal, "setitimer"):
+        yield
+        return
+
+    def handler(signum, frame):
+        raise RenderTimeout(f"Render took longer than {seconds:g} seconds")
+
+    previous = signal.signal(signal.SIGALRM, handler)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _warm_worker():
+    """Import matplotlib and load the font cache before any work arrives."""
+    import chartroom.charts  # noqa: F401
+    from chartroom.warmup import load_fonts
+
+    load_fonts()
+
+
+def _noop():
+    return None
+
+
+def resolve_jobs(jobs: Optional[int]) -> int:
+    """Turn a --jobs value into a worker count. 0 or None means one per CPU."""
+    if not jobs:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def make_pool(jobs: int) -> "concurrent.futures.ProcessPoolExecutor":
+    """Start a process pool of warm workers, blocking until all are ready."""
+    # Imported here as multiprocessing is slow to import and most CLI
+    # invocations never start a pool
+    import concurrent.futures
+
+    pool = concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs, initializer=_warm_worker
+    )
+    # Submitting one task per worker forces every process to start (and run
+    # the initializer) now, rather than lazily on the first real chart
+    concurrent.futures.wait([pool.submit(_noop) for _ in range(jobs)])
+    return pool
+
+
+def map_ordered(fn: Callable, items: Iterable, jobs: int = 1) -> Iterator:
+    """Apply fn to each item, yielding results in input order.
+
+    With jobs > 1 the work is spread across a pool of warm worker processes,
+    so fn and the items must be picklable.
+    """
+    if jobs <= 1:
+        for item in items:
+            yield fn(item)
+        return
+    with make_pool(jobs) as pool:
+        yield from pool.map(fn, items)
@@ -0,0 +1,257 @@
+import contextlib
+import contextvars
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+# How many allocation sites to report for each stage with --memory-profile
+TOP_ALLOCATIONS = 5
+
+
+class Stage:
+    __slots__ = ("name", "depth", "rows", "seconds", "peak_bytes", "allocations")
+
+    def __init__(self, name: str, depth: int = 0, rows: Optional[int] = None):
+        self.name = name
+        self.depth = depth
+        # Callers may fill this in once the stage knows how many rows it saw
+        self.rows = rows
+        self.seconds = 0.0
+        # Only filled in when memory is being traced
+        self.peak_bytes: Optional[int] = None
+        self.allocations: List[Dict[str, Any]] = []
+
+
+class Profile:
+    """Wall clock timings for each stage of rendering a chart.
+
+    With memory=True tracemalloc is also used to record the peak memory
+    allocated by each stage and the source lines that allocated the most.
+    """
+
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+        self.stages: List[Stage] = []
+        self.seconds = 0.0
+        self.peak_bytes: Optional[int] = None
+        self._depth = 0
+        # Highest traced memory seen so far by the whole profile and then by
+        # each open stage. Every stage resets the tracemalloc peak, so the
+        # enclosing ones have to remember what they saw before it ran.
+        self._peaks: List[int] = []
+
+    @contextlib.contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[Stage]:
+        record = Stage(name, self._depth, rows)
+        self.stages.append(record)
+        self._depth += 1
+        if self.memory:
+            start_bytes, snapshot = self._start_memory(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            self._depth -= 1
+            if self.memory:
+                self._stop_memory(record, start_bytes, snapshot)
+
+    def _start_memory(self, record: Stage):
+        import tracemalloc
+
+        # Snapshots are large, so they are only taken for top level stages
+        # where they cannot inflate the peak of an enclosing stage
+        snapshot = _snapshot() if record.depth == 0 else None
+        current, peak = tracemalloc.get_traced_memory()
+        self._peaks[-1] = max(self._peaks[-1], peak)
+        tracemalloc.reset_peak()
+        self._peaks.append(current)
+        return current, snapshot
+
+    def _stop_memory(self, record: Stage, start_bytes: int, snapshot):
+        import tracemalloc
+
+        peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+        record.peak_bytes = peak - start_bytes
+        self._peaks[-1] = max(self._peaks[-1], peak)
+        if snapshot is not None:
+            record.allocations = _top_allocations(snapshot, _snapshot())
+        tracemalloc.reset_peak()
+
+    def as_list(self) -> List[Dict[str, Any]]:
+        """The stages as JSON-serializable dictionaries, in the order they ran."""
+        stages = []
+        for record in self.stages:
+            item = {
+                "stage": record.name,
+                "depth": record.depth,
+                "ms": round(record.seconds * 1000, 3),
+            }
+            if record.rows is not None:
+                item["rows"] = record.rows
+            if record.peak_bytes is not None:
+                item["peak_bytes"] = record.peak_bytes
+                item["top_allocations"] = record.allocations
+            stages.append(item)
+        total = {"stage": "total", "depth": 0, "ms": round(self.seconds * 1000, 3)}
+        if self.peak_bytes is not None:
+            total["peak_bytes"] = self.peak_bytes
+        stages.append(total)
+        return stages
+
+    def format(self) -> str:
+        """The stages as an indented table for printing to stderr."""
+        lines = ["Profile:"]
+        for item in self.as_list():
+            indent = "  " * (item["depth"] + 1)
+            line = f"{indent + item['stage']:<24} {item['ms']:>10.3f} ms"
+            if "peak_bytes" in item:
+                line += f" {_format_bytes(item['peak_bytes']):>10} peak"
+            if "rows" in item:
+                line += f"  ({item['rows']:,} rows)"
+            lines.append(line)
+            for allocation in item.get("top_allocations", ()):
+                lines.append(
+                    "{}    {:>10} {:>7,} blocks  {}".format(
+                        indent,
+                        _format_bytes(allocation["bytes"]),
+                        allocation["count"],
+                        allocation["location"],
+                    )
+                )
+        return "\n".join(lines)
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def _snapshot():
+    import tracemalloc
+
+    return tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*"),
+        )
+    )
+
+
+def _top_allocations(before, after) -> List[Dict[str, Any]]:
+    """The source lines that allocated the most memory between two snapshots."""
+    allocations = []
+    for diff in after.compare_to(before, "lineno")[:TOP_ALLOCATIONS]:
+        if diff.size_diff <= 0:
+            break
+        frame = diff.traceback[0]
+        allocations.append(
+            {
+                "location": f"{frame.filename}:{frame.lineno}",
+                "bytes": diff.size_diff,
+                "count": diff.count_diff,
+            }
+        )
+    return allocations
+
+
+_active: contextvars.ContextVar[Optional[Profile]] = contextvars.ContextVar(
+    "chartroom_profile", default=None
+)
+
+# Returned by stage() when nothing is being profiled, so instrumented code
+# pays for a single context variable lookup
+_DISABLED = contextlib.nullcontext(Stage("disabled"))
+
+
+def stage(name: str, rows: Optional[int] = None):
+    """Context manager timing a stage of the active profile, if there is one."""
+    profile = _active.get()
+    if profile is None:
+        return _DISABLED
+    return profile.stage(name, rows)
+
+
+@contextlib.contextmanager
+def record(memory: bool = False) -> Iterator[Profile]:
+    """Profile every stage() run inside this block."""
+    profile = Profile(memory=memory)
+    started_tracing = False
+    if memory:
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        profile._peaks.append(start_bytes)
+        tracemalloc.reset_peak()
+    token = _active.set(profile)
+    start = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.seconds = time.perf_counter() - start
+        _active.reset(token)
+        if memory:
+            peak = max(profile._peaks.pop(), tracemalloc.get_traced_memory()[1])
+            profile.peak_bytes = peak - start_bytes
+            if started_tracing:
+                tracemalloc.stop()
+
+
+def combine(first: List[Stage], profile: Profile) -> Profile:
+    """A profile of the stages in first followed by those of profile.
+
+    Lets each of several charts rendered from one load report the shared
+    loading stages along with its own.
+    """
+    combined = Profile(memory=profile.memory)
+    combined.stages = [*first, *profile.stages]
+    top = [record for record in first if record.depth == 0]
+    combined.seconds = sum(record.seconds for record in top) + profile.seconds
+    if profile.peak_bytes is not None:
+        combined.peak_bytes = max(
+            [profile.peak_bytes]
+            + [record.peak_bytes for record in top if record.peak_bytes is not None]
+        )
+    return combined
+
+
+@contextlib.contextmanager
+def cprofile(path: str) -> Iterator[None]:
+    """Run the block under cProfile, writing pstats data to path."""
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(os.fspath(path))
+
+
+def profiled(
+    timings: bool = False, memory: bool = False, cprofile_path: Optional[str] = None
+):
+    """Context manager applying the CLI's profiling options to a block.
+
+    Yields the Profile for timings or memory, otherwise None.
+    """
+    if not (timings or memory or cprofile_path):
+        return contextlib.nullcontext()
+    return _profiled(timings or memory, memory, cprofile_path)
+
+
+@contextlib.contextmanager
+def _profiled(timings: bool, memory: bool, cprofile_path: Optional[str]):
+    with contextlib.ExitStack() as stack:
+        profile = stack.enter_context(record(memory)) if timings else None
+        # Entered last so the stage bookkeeping stays out of the pstats
+        if cprofile_path:
+            stack.enter_context(cprofile(cprofile_path))
+        yield profile
@@ -0,0 +1,376 @@
+import base64
+import concurrent.futures
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sqlite3
+import sys
+import tempfile
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import click
+
+from chartroom.cli import CHART_TYPES, _render_spec, cli
+from chartroom.client import ENV_PREFIX
+from chartroom.pool import RenderTimeout, make_pool, time_limit
+
+# Options that would let a client read or write arbitrary server-side paths
+_DISALLOWED_FIELDS = {"file", "sql", "output", "cache", "variants"}
+
+# Extra time the server waits beyond --timeout before giving up on a worker
+_TIMEOUT_GRACE = 5.0
+
+
+def _fields_from_query(chart_type, query):
+    """Turn a URL query string into chart spec fields."""
+    command = cli.commands[chart_type]
+    multiple = {param.name for param in command.params if param.multiple}
+    fields = {}
+    for name, values in urllib.parse.parse_qs(query, keep_blank_values=True).items():
+        if name in _DISALLOWED_FIELDS:
+            raise ValueError(f"Option '{name}' is not allowed over HTTP")
+        fields[name] = values if name in multiple else values[-1]
+    return fields
+
+
+def _render_posted(chart_type, fields, body, timeout):
+    """Render POSTed data in a worker process.
+
+    Returns ("ok", png_bytes, alt_text) or ("error", http_status, message).
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        spec = dict(fields, type=chart_type, output=os.path.join(tmp, "chart.png"))
+        try:
+            with time_limit(timeout):
+                result = _render_spec(spec, fp=io.BytesIO(body))
+        except RenderTimeout as e:
+            import matplotlib.pyplot as plt
+
+            plt.close("all")
+            return "error", 504, str(e)
+        except click.ClickException as e:
+            return "error", 400, e.format_message()
+        except (ValueError, sqlite3.OperationalError) as e:
+            return "error", 400, str(e)
+        with open(result["path"], "rb") as fp:
+            return "ok", fp.read(), result["alt"]
+
+
+class _TerminalStdin(io.BytesIO):
+    """Empty stdin that reports itself as an interactive terminal."""
+
+    def isatty(self):
+        return True
+
+
+@contextlib.contextmanager
+def _client_environ(env):
+    """Replace this process's CHARTROOM_* variables with env, if given."""
+    if env is None:
+        yield
+        return
+    previous = {k: v for k, v in os.environ.items() if k.startswith(ENV_PREFIX)}
+    for key in previous:
+        del os.environ[key]
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        for key in env:
+            os.environ.pop(key, None)
+        os.environ.update(previous)
+
+
+def _run_cli(args, cwd, stdin, env=None):
+    """Run the chartroom CLI in a worker process on behalf of a client.
+
+    env holds the client's CHARTROOM_* variables, which are used instead of
+    the daemon's for this command. The --timeout render limit does not
+    apply, as the command would have had no limit had it run in the client.
+    Returns ("ok", exit_code, stdout, stderr).
+    """
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    binary_stdin = _TerminalStdin() if stdin is None else io.BytesIO(stdin)
+    previous_stdin = sys.stdin
+    previous_cwd = os.getcwd()
+    sys.stdin = io.TextIOWrapper(binary_stdin)
+    try:
+        os.chdir(cwd)
+        with (
+            contextlib.redirect_stdout(stdout),
+            contextlib.redirect_stderr(stderr),
+            _client_environ(env),
+        ):
+            try:
+                cli.main(args=args, prog_name="chartroom", standalone_mode=False)
+                exit_code = 0
+            except click.ClickException as e:
+                e.show()
+                exit_code = e.exit_code
+            except click.exceptions.Exit as e:
+                exit_code = e.exit_code
+            except click.Abort:
+                click.echo("Aborted!", err=True)
+                exit_code = 1
+    except OSError as e:
+        return "ok", 1, "", f"Error: {e}\n"
+    finally:
+        sys.stdin = previous_stdin
+        os.chdir(previous_cwd)
+    return "ok", exit_code, stdout.getvalue(), stderr.getvalue()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "chartroom"
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, data):
+        self._send(status, json.dumps(data).encode("utf-8"), "application/json")
+
+    def _send_error(self, status, message):
+        self._send_json(status, {"error": message})
+
+    def _read_body(self):
+        """Read the request body, or send an error and return None."""
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self._send_error(411, "Content-Length header is required")
+            return None
+        try:
+            length = int(length)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_error(400, "Invalid Content-Length header")
+            return None
+        if length > self.server.max_body:
+            self.close_connection = True
+            self._send_error(413, f"Request body exceeds {self.server.max_body} bytes")
+            return None
+        return self.rfile.read(length)
+
+    def address_string(self):
+        # Clients of a Unix socket server have no address
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        return "unix"
+
+    def do_GET(self):
+        if urllib.parse.urlsplit(self.path).path == "/health":
+            self._send_json(200, {"ok": True})
+        else:
+            self._send_error(404, "Not found")
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == "/cli" and self.server.allow_cli:
+            self._handle_cli()
+            return
+        prefix, _, chart_type = url.path.strip("/").partition("/")
+        if prefix != "render" or chart_type not in CHART_TYPES:
+            self._send_error(
+                404,
+                f"POST to /render/TYPE where TYPE is one of {', '.join(CHART_TYPES)}",
+            )
+            return
+        try:
+            fields = _fields_from_query(chart_type, url.query)
+        except ValueError as e:
+            self._send_error(400, str(e))
+            return
+        body = self._read_body()
+        if body is None:
+            return
+        result = self.server.run_in_pool(
+            _render_posted, chart_type, fields, body, self.server.timeout_seconds
+        )
+        if result[0] == "ok":
+            _, png, alt = result
+            self._send(
+                200,
+                png,
+                "image/png",
+                {"X-Chartroom-Alt": urllib.parse.quote(alt)},
+            )
+        else:
+            _, status, message = result
+            self._send_error(status, message)
+
+    def _handle_cli(self):
+        body = self._read_body()
+        if body is None:
+            return
+        try:
+            request = json.loads(body)
+            args = [str(arg) for arg in request["args"]]
+            cwd = str(request["cwd"])
+            stdin = request.get("stdin")
+            if stdin is not None:
+                stdin = base64.b64decode(stdin)
+            env = request.get("env")
+            if env is not None:
+                env = {
+                    str(k): str(v)
+                    for k, v in env.items()
+                    if str(k).startswith(ENV_PREFIX)
+                }
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self._send_error(400, f"Invalid request: {e}")
+            return
+        result = self.server.run_in_pool(
+            _run_cli, args, cwd, stdin, env, time_limited=False
+        )
+        if result[0] == "ok":
+            _, exit_code, stdout, stderr = result
+            self._send_json(
+                200, {"exit_code": exit_code, "stdout": stdout, "stderr": stderr}
+            )
+        else:
+            _, status, message = result
+            self._send_error(status, message)
+
+
+class _PoolServerMixin:
+    """Shared worker pool and limits for the TCP and Unix socket servers."""
+
+    daemon_threads = True
+    allow_cli = False
+
+    def _setup_pool(self, jobs, max_body, timeout, max_pending):
+        self.max_body = max_body
+        self.timeout_seconds = timeout
+        self.slots = threading.BoundedSemaphore(max_pending or jobs * 2)
+        self.pool = make_pool(jobs)
+
+    def run_in_pool(self, fn, *args, time_limited=True):
+        """Run fn in the worker pool, enforcing the pending and time limits.
+
+        fn must return a tuple starting with "ok" or ("error", status, message).
+        With time_limited=False only the pending limit applies.
+        """
+        if not self.slots.acquire(blocking=False):
+            return "error", 503, "Too many renders in progress, try again later"
+        try:
+            future = self.pool.submit(fn, *args)
+            wait = None
+            if time_limited and self.timeout_seconds:
+                wait = self.timeout_seconds + _TIMEOUT_GRACE
+            try:
+                return future.result(timeout=wait)
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                return "error", 504, "Render timed out"
+        finally:
+            self.slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ChartServer(_PoolServerMixin, ThreadingHTTPServer):
+    """HTTP server that renders charts in a pool of warm worker processes.
+
+    POST data to /render/TYPE with chart options as query string parameters.
+    The response body is the PNG and the X-Chartroom-Alt header holds the
+    URL-encoded alt text.
+    """
+
+    def __init__(
+        self,
+        address,
+        jobs=1,
+        max_body=50 * 1024 * 1024,
+        timeout=30.0,
+        max_pending=None,
+        handler_class=_Handler,
+    ):
+        super().__init__(address, handler_class)
+        self._setup_pool(jobs, max_body, timeout, max_pending)
+
+
+class UnixChartServer(_PoolServerMixin, socketserver.ThreadingUnixStreamServer):
+    """The same server listening on a Unix socket, readable only by its owner.
+
+    It also accepts POST /cli requests, which the chartroom command uses to
+    run chart subcommands in the daemon instead of in a fresh process.
+    """
+
+    allow_cli = True
+
+    def __init__(
+        self,
+        path,
+        jobs=1,
+        max_body=50 * 1024 * 1024,
+        timeout=30.0,
+        max_pending=None,
+        handler_class=_Handler,
+    ):
+        _remove_stale_socket(path)
+        previous_umask = os.umask(0o177)
+        try:
+            super().__init__(path, handler_class)
+        finally:
+            os.umask(previous_umask)
+        self._setup_pool(jobs, max_body, timeout, max_pending)
+
+    def server_close(self):
+        super().server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.server_address)
+
+
+def _remove_stale_socket(path):
+    """Delete a socket file left behind by a daemon that is no longer running."""
+    if not os.path.exists(path):
+        return
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise click.ClickException(f"A chartroom daemon is already listening on {path}")
+    finally:
+        sock.close()
+
+
+def serve(host, port, jobs, max_body, timeout, max_pending=None, socket_path=None):
+    """Run a ChartServer, or a UnixChartServer if socket_path is set, until interrupted."""
+    options = dict(
+        jobs=jobs, max_body=max_body, timeout=timeout, max_pending=max_pending
+    )
+    if socket_path:
+        server = UnixChartServer(socket_path, **options)
+        click.echo(f"Serving on unix:{socket_path}", err=True)
+    else:
+        server = ChartServer((host, port), **options)
+        click.echo(f"Serving on http://{host}:{server.server_address[1]}/", err=True)
+    # Shut down cleanly, removing any socket file, when asked to terminate
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
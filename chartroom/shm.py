@@ -0,0 +1,163 @@
+import contextlib
+import gc
+import sys
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# key -> (shared memory block name, dtype string, length)
+Handle = Dict[str, Tuple[str, str, int]]
+
+
+class SharedColumns:
+    """Chart columns copied once into shared memory, one block per column.
+
+    Built in the process that loaded the data, from the same
+    charts.RowColumns the charts would otherwise read. handle is a small
+    picklable description of the blocks; worker processes pass it to
+    attach() to read the columns as zero-copy NumPy views instead of
+    receiving a pickled copy of the rows.
+
+    Use it as a context manager: leaving the block closes and unlinks every
+    block, whether or not the workers succeeded.
+    """
+
+    def __init__(self, columns, charts: Sequence[Tuple[str, Optional[str], List[str]]]):
+        """Share the columns needed by each (chart_type, x_col, y_cols)."""
+        self.handle: Handle = {}
+        self._blocks: List[shared_memory.SharedMemory] = []
+        try:
+            for chart_type, x_col, y_cols in charts:
+                if chart_type == "scatter":
+                    self._share(f"numbers:{x_col}", columns.numbers(x_col))
+                if x_col is not None:
+                    # Alt text describes points by their x values as written
+                    self._share(f"labels:{x_col}", columns.labels(x_col))
+                for y_col in y_cols:
+                    self._share(f"numbers:{y_col}", columns.numbers(y_col))
+        except BaseException:
+            self.close()
+            raise
+
+    def _share(self, key: str, values: Sequence):
+        if key in self.handle:
+            return
+        if not key.startswith("labels:"):
+            self._share_array(key, np.asarray(values, dtype=float))
+            return
+        # Labels are stored as one UTF-8 buffer plus the offset of each
+        # label in it, as a fixed-width string array would pad every label
+        # to the length of the longest
+        encoded = [value.encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(
+            np.fromiter(map(len, encoded), np.int64, len(encoded)), out=offsets[1:]
+        )
+        self._share_array(key, np.frombuffer(b"".join(encoded), dtype=np.uint8))
+        self._share_array(f"offsets:{key[len('labels:'):]}", offsets)
+
+    def _share_array(self, key: str, array: np.ndarray):
+        # Zero-size blocks are not allowed
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._blocks.append(block)
+        np.ndarray(array.shape, array.dtype, buffer=block.buf)[:] = array
+        self.handle[key] = (block.name, array.dtype.str, len(array))
+
+    def close(self):
+        """Close and unlink every block. Safe to call more than once."""
+        while self._blocks:
+            block = self._blocks.pop()
+            block.close()
+            with contextlib.suppress(FileNotFoundError):
+                block.unlink()
+
+    def __enter__(self) -> "SharedColumns":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AttachedColumns:
+    """Read-only views of SharedColumns, with the interface of RowColumns."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.arrays = arrays
+        self._labels: Dict[str, List[str]] = {}
+
+    @property
+    def count(self) -> int:
+        # Every chart has a y column, so there is always a numbers array
+        return next(
+            len(array)
+            for key, array in self.arrays.items()
+            if key.startswith("numbers:")
+        )
+
+    def labels(self, col: str) -> List[str]:
+        if col not in self._labels:
+            data = self.arrays[f"labels:{col}"].tobytes()
+            bounds = self.arrays[f"offsets:{col}"].tolist()
+            self._labels[col] = [
+                data[start:end].decode("utf-8")
+                for start, end in zip(bounds, bounds[1:])
+            ]
+        return self._labels[col]
+
+    def numbers(self, col: str) -> np.ndarray:
+        return self.arrays[f"numbers:{col}"]
+
+    def x_values(self, chart_type: str, x_col: Optional[str]) -> Optional[Sequence]:
+        if chart_type == "histogram":
+            return None
+        if chart_type == "scatter":
+            return self.numbers(x_col)
+        return self.labels(x_col)
+
+    def label(self, col: Optional[str], i: int) -> Any:
+        if f"labels:{col}" in self.arrays:
+            return self.labels(col)[i]
+        return ""
+
+
+def _attach_block(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        # Only the creating process should unlink the block
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def _close_block(block: shared_memory.SharedMemory):
+    try:
+        block.close()
+    except BufferError:
+        # A view is still held by a reference cycle, such as a closed
+        # matplotlib figure that has not been collected yet
+        gc.collect()
+        with contextlib.suppress(BufferError):
+            block.close()
+
+
+@contextlib.contextmanager
+def attach(handle: Handle) -> Iterator[AttachedColumns]:
+    """Attach to the blocks of a SharedColumns handle from another process.
+
+    Yields an AttachedColumns whose arrays are views of the shared blocks.
+    The views must not be used once the block exits, which closes this
+    process's mapping of each block. Unlinking is left to the creator.
+    """
+    blocks = []
+    arrays = {}
+    try:
+        for key, (name, dtype, length) in handle.items():
+            block = _attach_block(name)
+            blocks.append(block)
+            array = np.ndarray((length,), dtype, buffer=block.buf)
+            array.flags.writeable = False
+            arrays[key] = array
+        yield AttachedColumns(arrays)
+    finally:
+        arrays.clear()
+        for block in blocks:
+            _close_block(block)
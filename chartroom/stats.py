@@ -0,0 +1,108 @@
+import heapq
+from typing import List, Optional, Sequence
+
+
+class Summary:
+    """Summary statistics for one numeric column of a chart.
+
+    Computed once from the values a renderer has already converted, then
+    reused to describe the chart in alt text. argmin, argmax and top are
+    indexes into values; ties go to the earliest value.
+    """
+
+    __slots__ = ("values", "count", "total", "min", "max", "argmin", "argmax", "top")
+
+    def __init__(
+        self,
+        values: Sequence[float],
+        count: int,
+        total: float,
+        min: Optional[float],
+        max: Optional[float],
+        argmin: Optional[int],
+        argmax: Optional[int],
+        top: List[int],
+    ):
+        self.values = values
+        self.count = count
+        self.total = total
+        self.min = min
+        self.max = max
+        self.argmin = argmin
+        self.argmax = argmax
+        # Indexes of the largest values, largest first
+        self.top = top
+
+
+def summarize(values: Sequence[float], top_k: int = 3) -> Summary:
+    """Summarize a sequence of floats using vectorized NumPy reductions.
+
+    The top_k largest values are found by partial selection rather than
+    sorting every value.
+    """
+    import numpy as np
+
+    array = np.asarray(values, dtype=float)
+    count = len(array)
+    if count == 0:
+        return Summary(values, 0, 0.0, None, None, None, None, [])
+    argmin = int(array.argmin())
+    argmax = int(array.argmax())
+    if count <= top_k:
+        candidates = np.arange(count)
+    else:
+        # The k-th largest value, then every index above it plus as many
+        # indexes equal to it as are needed, earliest first
+        threshold = np.partition(array, count - top_k)[count - top_k]
+        above = np.flatnonzero(array > threshold)
+        ties = np.flatnonzero(array == threshold)[: top_k - len(above)]
+        candidates = np.concatenate([above, ties])
+    top = candidates[np.lexsort((candidates, -array[candidates]))][:top_k]
+    return Summary(
+        values,
+        count=count,
+        total=float(array.sum()),
+        min=float(array[argmin]),
+        max=float(array[argmax]),
+        argmin=argmin,
+        argmax=argmax,
+        top=[int(i) for i in top],
+    )
+
+
+def summarize_list(values: Sequence[float], top_k: int = 3) -> Summary:
+    """Summarize a short sequence of floats in pure Python.
+
+    Gives the same Summary as summarize() for renderers that never import
+    NumPy, where importing it would cost more than the whole chart.
+    """
+    count = len(values)
+    if count == 0:
+        return Summary(values, 0, 0.0, None, None, None, None, [])
+    indexes = range(count)
+    argmin = min(indexes, key=values.__getitem__)
+    argmax = max(indexes, key=lambda i: (values[i], -i))
+    top = heapq.nlargest(top_k, indexes, key=lambda i: (values[i], -i))
+    return Summary(
+        values,
+        count=count,
+        total=float(sum(values)),
+        min=float(values[argmin]),
+        max=float(values[argmax]),
+        argmin=argmin,
+        argmax=argmax,
+        top=top,
+    )
+
+
+def to_float(values: list, col_name: str) -> list:
+    """Convert values to float, raising a clear error on failure."""
+    result = []
+    for v in values:
+        try:
+            result.append(float(v))
+        except (ValueError, TypeError):
+            raise ValueError(
+                f"Cannot convert value {v!r} in column '{col_name}' to a number"
+            )
+    return result
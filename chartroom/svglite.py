@@ -0,0 +1,399 @@
+import html
+import math
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
+
+from chartroom.output import atomic_write
+from chartroom.stats import Summary, summarize_list, to_float
+
+# A lightweight renderer for bar and line charts, used by --backend svg-lite.
+# It writes SVG from text templates and never imports matplotlib or NumPy,
+# so a small chart renders in a few milliseconds instead of paying for the
+# matplotlib import. Sizes are in points, as in matplotlib's SVG output.
+
+Output = Union[str, BinaryIO]
+
+# matplotlib's default "tab10" color cycle
+COLORS = (
+    "#1f77b4",
+    "#ff7f0e",
+    "#2ca02c",
+    "#d62728",
+    "#9467bd",
+    "#8c564b",
+    "#e377c2",
+    "#7f7f7f",
+    "#bcbd22",
+    "#17becf",
+)
+
+# Most x tick labels drawn; longer axes label every n-th category
+MAX_X_TICKS = 20
+
+FONT_SIZE = 10
+TITLE_SIZE = 12
+TICK_LENGTH = 3.5
+PAD = 8.0
+
+SVG_HEADER = (
+    '<?xml version="1.0" encoding="utf-8" standalone="no"?>\n'
+    '<svg xmlns="http://www.w3.org/2000/svg" width="{width}pt" height="{height}pt" '
+    'viewBox="0 0 {width} {height}" version="1.1">\n'
+    "<style>text {{ font-family: 'DejaVu Sans', Arial, sans-serif; "
+    "font-size: {font_size}px; fill: #000 }}</style>\n"
+    '<rect width="{width}" height="{height}" fill="#fff"/>\n'
+)
+TEXT = '<text x="{x:.2f}" y="{y:.2f}" text-anchor="{anchor}"{extra}>{text}</text>\n'
+LINE = (
+    '<line x1="{x1:.2f}" y1="{y1:.2f}" x2="{x2:.2f}" y2="{y2:.2f}" '
+    'stroke="{color}" stroke-width="{stroke:.2f}"/>\n'
+)
+RECT = (
+    '<rect x="{x:.2f}" y="{y:.2f}" width="{width:.2f}" height="{height:.2f}" '
+    'fill="{fill}"{extra}/>\n'
+)
+MARKER = '<circle cx="{x}" cy="{y}" r="3"/>\n'
+POLYLINE = (
+    '<polyline points="{points}" fill="none" stroke="{color}" '
+    'stroke-width="1.5" stroke-linejoin="round" stroke-linecap="square"/>\n'
+)
+
+
+def _text_width(text: str, size: float = FONT_SIZE) -> float:
+    """Rough width of text in points; sans-serif glyphs average 0.6 em."""
+    return len(text) * size * 0.6
+
+
+def _nice_step(span: float, count: int) -> float:
+    """A step of 1, 2, 2.5 or 5 times a power of ten, giving about count ticks."""
+    raw = span / max(count - 1, 1)
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for multiple in (1, 2, 2.5, 5, 10):
+        if raw <= multiple * magnitude:
+            return multiple * magnitude
+    return 10 * magnitude
+
+
+def _ticks(low: float, high: float, count: int = 6) -> Tuple[List[float], float]:
+    """Return (tick values between low and high, step between them)."""
+    step = _nice_step(high - low, count)
+    first = math.ceil(low / step - 1e-9)
+    last = math.floor(high / step + 1e-9)
+    return [i * step for i in range(first, last + 1)], step
+
+
+def _format_tick(value: float, step: float) -> str:
+    """Format a tick value with as many decimals as the step needs."""
+    for decimals in range(10):
+        if abs(round(step, decimals) - step) < step * 1e-9:
+            break
+    # Adding 0.0 turns -0.0 into 0.0
+    return f"{round(value, decimals) + 0.0:.{decimals}f}"
+
+
+def _finite(values: Sequence[float]) -> List[float]:
+    return [v for v in values if math.isfinite(v)]
+
+
+def _y_limits(
+    series: Dict[str, List[float]], include_zero: bool
+) -> Tuple[float, float]:
+    """The y range of the data plus 5% margins, like matplotlib's autoscaling.
+
+    Bars always start at zero, which gets no margin.
+    """
+    values = [v for values in series.values() for v in _finite(values)]
+    low = min(values, default=0.0)
+    high = max(values, default=1.0)
+    if include_zero:
+        low, high = min(low, 0.0), max(high, 0.0)
+    if low == high:
+        low, high = low - 1, high + 1
+    margin = (high - low) * 0.05
+    return (
+        low if include_zero and low == 0 else low - margin,
+        high if include_zero and high == 0 else high + margin,
+    )
+
+
+class _Canvas:
+    """Axes geometry and SVG fragments for one chart."""
+
+    def __init__(
+        self,
+        labels: Sequence[str],
+        x_limits: Tuple[float, float],
+        y_limits: Tuple[float, float],
+        title: Optional[str],
+        xlabel: Optional[str],
+        ylabel: Optional[str],
+        width: float,
+        height: float,
+    ):
+        self.width = width * 72
+        self.height = height * 72
+        self.y_ticks, y_step = _ticks(*y_limits)
+        self.y_tick_labels = [_format_tick(v, y_step) for v in self.y_ticks]
+        left = PAD + TICK_LENGTH * 2
+        left += max((_text_width(t) for t in self.y_tick_labels), default=0)
+        if ylabel:
+            left += FONT_SIZE * 1.2 + PAD / 2
+        bottom = PAD + TICK_LENGTH * 2 + FONT_SIZE
+        if xlabel:
+            bottom += FONT_SIZE * 1.2 + PAD / 2
+        top = PAD + (TITLE_SIZE * 1.2 + PAD / 2 if title else FONT_SIZE / 2)
+        # Leave room for the first and last x tick labels to overhang
+        right = PAD + (_text_width(labels[-1]) / 2 if labels else 0)
+        self.left, self.top = left, top
+        self.right = max(self.width - right, left + 1)
+        self.bottom = max(self.height - bottom, top + 1)
+        self.x_limits = x_limits
+        self.y_limits = y_limits
+        self.parts: List[str] = []
+
+    def x(self, value: float) -> float:
+        low, high = self.x_limits
+        return self.left + (value - low) / (high - low) * (self.right - self.left)
+
+    def y(self, value: float) -> float:
+        low, high = self.y_limits
+        return self.bottom - (value - low) / (high - low) * (self.bottom - self.top)
+
+    def text(self, x, y, text, anchor="middle", **attrs):
+        extra = "".join(f' {name.replace("_", "-")}="{v}"' for name, v in attrs.items())
+        self.parts.append(
+            TEXT.format(x=x, y=y, anchor=anchor, extra=extra, text=html.escape(text))
+        )
+
+    def axes(
+        self,
+        labels: Sequence[str],
+        title: Optional[str],
+        xlabel: Optional[str],
+        ylabel: Optional[str],
+    ):
+        """Draw the frame, ticks, tick labels, axis labels and title."""
+        for value, label in zip(self.y_ticks, self.y_tick_labels):
+            y = self.y(value)
+            self.parts.append(
+                LINE.format(
+                    x1=self.left - TICK_LENGTH,
+                    y1=y,
+                    x2=self.left,
+                    y2=y,
+                    color="#000",
+                    stroke=0.8,
+                )
+            )
+            self.text(
+                self.left - TICK_LENGTH * 2,
+                y + FONT_SIZE * 0.35,
+                label,
+                anchor="end",
+            )
+        # Thin out the x labels so neither their count nor overlap gets out
+        # of hand on long axes
+        widest = max((_text_width(label) for label in labels), default=0)
+        fits = max(int((self.right - self.left) // (widest + FONT_SIZE)), 1)
+        stride = math.ceil(len(labels) / min(MAX_X_TICKS, fits)) if labels else 1
+        for i in range(0, len(labels), stride):
+            x = self.x(i)
+            self.parts.append(
+                LINE.format(
+                    x1=x,
+                    y1=self.bottom,
+                    x2=x,
+                    y2=self.bottom + TICK_LENGTH,
+                    color="#000",
+                    stroke=0.8,
+                )
+            )
+            self.text(x, self.bottom + TICK_LENGTH * 2 + FONT_SIZE, labels[i])
+        self.parts.append(
+            RECT.format(
+                x=self.left,
+                y=self.top,
+                width=self.right - self.left,
+                height=self.bottom - self.top,
+                fill="none",
+                extra=' stroke="#000" stroke-width="0.8"',
+            )
+        )
+        center_x = (self.left + self.right) / 2
+        if title:
+            self.text(center_x, self.top - PAD / 2, title, font_size=f"{TITLE_SIZE}px")
+        if xlabel:
+            self.text(center_x, self.height - PAD, xlabel)
+        if ylabel:
+            x = PAD + FONT_SIZE
+            y = (self.top + self.bottom) / 2
+            self.text(x, y, ylabel, transform=f"rotate(-90 {x:.2f} {y:.2f})")
+
+    def legend(self, names: Sequence[str]):
+        """Draw a legend for several series in the upper right corner."""
+        row = FONT_SIZE * 1.4
+        box_width = max(_text_width(name) for name in names) + 30
+        x = self.right - box_width - PAD / 2
+        y = self.top + PAD / 2
+        self.parts.append(
+            RECT.format(
+                x=x,
+                y=y,
+                width=box_width,
+                height=row * len(names) + PAD / 2,
+                fill="#fff",
+                extra=' fill-opacity="0.8" stroke="#ccc" stroke-width="0.8"',
+            )
+        )
+        for i, name in enumerate(names):
+            middle = y + PAD / 4 + row * (i + 0.5)
+            self.parts.append(
+                RECT.format(
+                    x=x + 6,
+                    y=middle - 3.5,
+                    width=14,
+                    height=7,
+                    fill=COLORS[i % len(COLORS)],
+                    extra="",
+                )
+            )
+            self.text(x + 26, middle + FONT_SIZE * 0.35, name, anchor="start")
+
+    def svg(self) -> bytes:
+        header = SVG_HEADER.format(
+            width=f"{self.width:g}", height=f"{self.height:g}", font_size=FONT_SIZE
+        )
+        return (header + "".join(self.parts) + "</svg>\n").encode("utf-8")
+
+
+def _write(data: bytes, output: Output):
+    if isinstance(output, str):
+        with atomic_write(output) as fp:
+            fp.write(data)
+    else:
+        output.write(data)
+
+
+def plot_bar(
+    labels: Sequence[str],
+    series: Dict[str, List[float]],
+    output: Output,
+    title: Optional[str] = None,
+    xlabel: Optional[str] = None,
+    ylabel: Optional[str] = None,
+    width: float = 10,
+    height: float = 6,
+    **kwargs: Any,
+) -> Dict[str, Summary]:
+    """Draw a bar chart as SVG; kwargs only used by raster output are ignored."""
+    canvas = _Canvas(
+        labels,
+        (-0.5, len(labels) - 0.5),
+        _y_limits(series, include_zero=True),
+        title,
+        xlabel,
+        ylabel,
+        width,
+        height,
+    )
+    # Same grouping as charts.plot_bar: 0.8 wide per category
+    bar_width = 0.8 / len(series)
+    zero = canvas.y(0)
+    for i, values in enumerate(series.values()):
+        offset = (i - len(series) / 2 + 0.5) * bar_width
+        color = COLORS[i % len(COLORS)]
+        for j, value in enumerate(values):
+            if not math.isfinite(value):
+                continue
+            left = canvas.x(j + offset - bar_width / 2)
+            top = canvas.y(value)
+            canvas.parts.append(
+                RECT.format(
+                    x=left,
+                    y=min(top, zero),
+                    width=canvas.x(j + offset + bar_width / 2) - left,
+                    height=abs(zero - top),
+                    fill=color,
+                    extra="",
+                )
+            )
+    canvas.axes(labels, title, xlabel, ylabel)
+    if len(series) > 1:
+        canvas.legend(list(series))
+    _write(canvas.svg(), output)
+    return {name: summarize_list(values) for name, values in series.items()}
+
+
+def plot_line(
+    labels: Sequence[str],
+    series: Dict[str, List[float]],
+    output: Output,
+    title: Optional[str] = None,
+    xlabel: Optional[str] = None,
+    ylabel: Optional[str] = None,
+    width: float = 10,
+    height: float = 6,
+    **kwargs: Any,
+) -> Dict[str, Summary]:
+    """Draw a line chart as SVG; kwargs only used by raster output are ignored."""
+    last = max(len(labels) - 1, 0)
+    margin = last * 0.05 or 0.5
+    canvas = _Canvas(
+        labels,
+        (-margin, last + margin),
+        _y_limits(series, include_zero=False),
+        title,
+        xlabel,
+        ylabel,
+        width,
+        height,
+    )
+    for i, values in enumerate(series.values()):
+        color = COLORS[i % len(COLORS)]
+        # Non-finite values break the line, as they do in matplotlib
+        runs: List[List[str]] = [[]]
+        for j, value in enumerate(values):
+            if math.isfinite(value):
+                runs[-1].append(f"{canvas.x(j):.2f},{canvas.y(value):.2f}")
+            elif runs[-1]:
+                runs.append([])
+        points = [point for run in runs for point in run]
+        for run in runs:
+            if len(run) > 1:
+                canvas.parts.append(POLYLINE.format(points=" ".join(run), color=color))
+        # Circle markers, matching marker="o" in charts.plot_line
+        canvas.parts.append(f'<g fill="{color}">\n')
+        for point in points:
+            x, y = point.split(",")
+            canvas.parts.append(MARKER.format(x=x, y=y))
+        canvas.parts.append("</g>\n")
+    canvas.axes(labels, title, xlabel, ylabel)
+    if len(series) > 1:
+        canvas.legend(list(series))
+    _write(canvas.svg(), output)
+    return {name: summarize_list(values) for name, values in series.items()}
+
+
+def _series(rows: List[Dict[str, Any]], y_cols: List[str]) -> Dict[str, List[float]]:
+    return {yc: to_float([row[yc] for row in rows], yc) for yc in y_cols}
+
+
+def render_bar(
+    rows: List[Dict[str, Any]],
+    x_col: str,
+    y_cols: List[str],
+    output_path: str,
+    **kwargs,
+) -> Dict[str, Summary]:
+    labels = [str(row[x_col]) for row in rows]
+    return plot_bar(labels, _series(rows, y_cols), output_path, **kwargs)
+
+
+def render_line(
+    rows: List[Dict[str, Any]],
+    x_col: str,
+    y_cols: List[str],
+    output_path: str,
+    **kwargs,
+) -> Dict[str, Summary]:
+    labels = [str(row[x_col]) for row in rows]
+    return plot_line(labels, _series(rows, y_cols), output_path, **kwargs)
@@ -0,0 +1,344 @@
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from chartroom.stats import to_float
+
+# Text previews of charts for --terminal. Lines and scatter plots are drawn
+# in braille, which packs a 2x4 grid of dots into each character; bars and
+# histograms use eighth-width blocks. Everything is pure Python, so there
+# is no matplotlib or NumPy import, and each value is visited once: points
+# are reduced to the low and high of each column of dots before drawing, so
+# a million-point line costs little more than converting its values.
+
+# Partial blocks, from empty to a full character, in eighths
+BLOCKS = " ▏▎▍▌▋▊▉█"
+
+# Bit of the braille dot at [row][column] within a character
+BRAILLE_DOTS = ((0x01, 0x08), (0x02, 0x10), (0x04, 0x20), (0x40, 0x80))
+BRAILLE_BASE = 0x2800
+
+# ANSI foreground colors for each series: blue, yellow, green, red,
+# magenta, cyan. click.echo strips them when stdout is not a terminal.
+COLORS = (34, 33, 32, 31, 35, 36)
+
+# Longest category label shown before it is truncated
+MAX_LABEL = 20
+
+
+def _color(text: str, index: Optional[int]) -> str:
+    if index is None:
+        return text
+    return f"\x1b[{COLORS[index % len(COLORS)]}m{text}\x1b[0m"
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.4g}"
+
+
+def _truncate(label: str, width: int) -> str:
+    return label if len(label) <= width else label[: width - 1] + "…"
+
+
+def _range(values: Sequence[float]) -> Tuple[float, float]:
+    """Return the (low, high) of the finite values, widened if they are equal."""
+    finite = [v for v in values if math.isfinite(v)]
+    low, high = min(finite, default=0.0), max(finite, default=1.0)
+    if low == high:
+        low, high = low - 1, high + 1
+    return low, high
+
+
+class _Braille:
+    """A grid of braille characters, addressed by dot from the top left."""
+
+    def __init__(self, columns: int, rows: int):
+        self.columns = columns
+        self.rows = rows
+        self.width = columns * 2
+        self.height = rows * 4
+        self.bits = [[0] * columns for _ in range(rows)]
+        self.colors: List[List[Optional[int]]] = [[None] * columns for _ in range(rows)]
+
+    def dot(self, x: int, y: int, color: Optional[int]):
+        row, column = y // 4, x // 2
+        self.bits[row][column] |= BRAILLE_DOTS[y % 4][x % 2]
+        self.colors[row][column] = color
+
+    def span(self, x: int, y0: int, y1: int, color: Optional[int]):
+        """Set the dots in column x from y0 to y1 inclusive."""
+        for y in range(min(y0, y1), max(y0, y1) + 1):
+            self.dot(x, y, color)
+
+    def line(self, x0: int, y0: int, x1: int, y1: int, color: Optional[int]):
+        steps = max(abs(x1 - x0), abs(y1 - y0), 1)
+        for i in range(steps + 1):
+            self.dot(
+                x0 + round((x1 - x0) * i / steps),
+                y0 + round((y1 - y0) * i / steps),
+                color,
+            )
+
+    def lines(self) -> List[str]:
+        return [
+            "".join(
+                _color(chr(BRAILLE_BASE + bits), color) if bits else " "
+                for bits, color in zip(bit_row, color_row)
+            )
+            for bit_row, color_row in zip(self.bits, self.colors)
+        ]
+
+
+def _draw_line(canvas: _Braille, values: Sequence[float], y_range, color):
+    """Draw values evenly spaced across the canvas.
+
+    Each column of dots keeps the first, lowest, highest and last value that
+    falls in it, which is all that can be drawn there. Columns are then
+    filled between their low and high and joined to their neighbours.
+    """
+    columns: List[Optional[List[int]]] = [None] * canvas.width
+    # Values are within y_range, so every dot lands on the canvas
+    x_factor = (canvas.width - 1) / max(len(values) - 1, 1)
+    top, y_factor = y_range[1], (canvas.height - 1) / (y_range[0] - y_range[1])
+    isfinite = math.isfinite
+    for i, value in enumerate(values):
+        if not isfinite(value):
+            continue
+        x = int(i * x_factor + 0.5)
+        y = int((value - top) * y_factor + 0.5)
+        column = columns[x]
+        if column is None:
+            columns[x] = [y, y, y, y]
+        else:
+            if y < column[1]:
+                column[1] = y
+            elif y > column[2]:
+                column[2] = y
+            column[3] = y
+    previous = None
+    for x, column in enumerate(columns):
+        if column is None:
+            continue
+        first, low, high, last = column
+        canvas.span(x, low, high, color)
+        if previous is not None:
+            canvas.line(previous[0], previous[1], x, first, color)
+        previous = (x, last)
+
+
+def _draw_scatter(canvas, x_values, y_values, x_range, y_range, color):
+    """Draw a dot per point, setting each distinct dot only once."""
+    x_low, x_factor = x_range[0], (canvas.width - 1) / (x_range[1] - x_range[0])
+    top, y_factor = y_range[1], (canvas.height - 1) / (y_range[0] - y_range[1])
+    isfinite = math.isfinite
+    dots = set()
+    for x, y in zip(x_values, y_values):
+        if isfinite(x) and isfinite(y):
+            dots.add(
+                (int((x - x_low) * x_factor + 0.5), int((y - top) * y_factor + 0.5))
+            )
+    for x, y in dots:
+        canvas.dot(x, y, color)
+
+
+def _plot_area(
+    canvas: _Braille,
+    y_range: Tuple[float, float],
+    x_labels: Tuple[str, str],
+    title: Optional[str],
+    xlabel: Optional[str],
+    ylabel: Optional[str],
+    names: Sequence[str],
+) -> str:
+    """Frame a braille canvas with its axes, labels, title and legend."""
+    high, low = _fmt(y_range[1]), _fmt(y_range[0])
+    gutter = max(len(high), len(low))
+    lines = []
+    if title:
+        lines.append(title.center(gutter + 2 + canvas.columns).rstrip())
+    if ylabel:
+        lines.append(ylabel)
+    for i, row in enumerate(canvas.lines()):
+        label = high if i == 0 else low if i == canvas.rows - 1 else ""
+        tick = "┤" if label else "│"
+        lines.append(f"{label:>{gutter}} {tick}{row}".rstrip())
+    lines.append(" " * gutter + " └" + "─" * canvas.columns)
+    first, last = x_labels
+    padding = max(1, canvas.columns - len(first) - len(last))
+    lines.append(" " * (gutter + 2) + first + " " * padding + last)
+    if xlabel:
+        lines.append(xlabel.center(gutter + 2 + canvas.columns).rstrip())
+    if len(names) > 1:
+        lines.append(
+            "  ".join(_color("⣿", i) + f" {name}" for i, name in enumerate(names))
+        )
+    return "\n".join(lines)
+
+
+def _canvas(columns: int, lines: int, gutter: int, extra_lines: int) -> _Braille:
+    return _Braille(max(10, columns - gutter - 2), max(4, lines - extra_lines))
+
+
+def _series_colors(series: Dict[str, Sequence[float]]):
+    """Color index per series, or None when a single series needs no key."""
+    if len(series) == 1:
+        return [None]
+    return list(range(len(series)))
+
+
+def plot_line(
+    labels: Sequence[str],
+    series: Dict[str, Sequence[float]],
+    columns: int = 80,
+    lines: int = 24,
+    title: Optional[str] = None,
+    xlabel: Optional[str] = None,
+    ylabel: Optional[str] = None,
+) -> str:
+    y_range = _range([v for values in series.values() for v in values])
+    gutter = max(len(_fmt(y_range[0])), len(_fmt(y_range[1])))
+    extra = 2 + bool(title) + bool(xlabel) + bool(ylabel) + (len(series) > 1)
+    canvas = _canvas(columns, lines, gutter, extra)
+    for values, color in zip(series.values(), _series_colors(series)):
+        _draw_line(canvas, values, y_range, color)
+    x_labels = (labels[0], labels[-1]) if labels else ("", "")
+    return _plot_area(canvas, y_range, x_labels, title, xlabel, ylabel, list(series))
+
+
+def plot_scatter(
+    x_values: Sequence[float],
+    series: Dict[str, Sequence[float]],
+    columns: int = 80,
+    lines: int = 24,
+    title: Optional[str] = None,
+    xlabel: Optional[str] = None,
+    ylabel: Optional[str] = None,
+) -> str:
+    x_range = _range(x_values)
+    y_range = _range([v for values in series.values() for v in values])
+    gutter = max(len(_fmt(y_range[0])), len(_fmt(y_range[1])))
+    extra = 2 + bool(title) + bool(xlabel) + bool(ylabel) + (len(series) > 1)
+    canvas = _canvas(columns, lines, gutter, extra)
+    for values, color in zip(series.values(), _series_colors(series)):
+        _draw_scatter(canvas, x_values, values, x_range, y_range, color)
+    x_labels = (_fmt(x_range[0]), _fmt(x_range[1]))
+    return _plot_area(canvas, y_range, x_labels, title, xlabel, ylabel, list(series))
+
+
+def _bars(
+    labels: Sequence[str],
+    series: Dict[str, Sequence[float]],
+    columns: int,
+    lines: int,
+    title: Optional[str],
+) -> str:
+    """Draw horizontal bars, one line per category and series.
+
+    Categories that do not fit in lines are left out and counted instead.
+    """
+    colors = _series_colors(series)
+    per_category = len(series)
+    shown = max(1, (lines - bool(title) - 1 - (per_category > 1)) // per_category)
+    if shown >= len(labels):
+        shown = len(labels)
+    label_width = min(MAX_LABEL, max((len(label) for label in labels), default=0))
+    value_width = max(
+        (len(_fmt(v)) for values in series.values() for v in values[:shown]),
+        default=1,
+    )
+    bar_width = max(10, columns - label_width - value_width - 4)
+    finite = [
+        v for values in series.values() for v in values[:shown] if math.isfinite(v)
+    ]
+    low = min([0.0, *finite])
+    high = max([0.0, *finite])
+    span = (high - low) or 1.0
+    # Negative bars grow left from the zero column in whole characters
+    zero = round(-low / span * bar_width)
+    out = []
+    if title:
+        out.append(title.center(label_width + 2 + bar_width).rstrip())
+    for i in range(shown):
+        for s, (values, color) in enumerate(zip(series.values(), colors)):
+            value = values[i]
+            label = _truncate(labels[i], label_width) if s == 0 else ""
+            if not math.isfinite(value):
+                bar = " " * zero
+            elif value < 0:
+                length = round(-value / span * bar_width)
+                bar = " " * (zero - length) + _color("█" * length, color)
+            else:
+                eighths = round(value / span * bar_width * 8)
+                full, part = divmod(eighths, 8)
+                bar = " " * zero + _color("█" * full + BLOCKS[part].strip(), color)
+            out.append(f"{label:<{label_width}} │{bar} {_fmt(value)}")
+    if shown < len(labels):
+        out.append(f"… {len(labels) - shown} more")
+    if per_category > 1:
+        out.append(
+            "  ".join(_color("█", i) + f" {name}" for i, name in enumerate(series))
+        )
+    return "\n".join(out)
+
+
+def plot_bar(
+    labels: Sequence[str],
+    series: Dict[str, Sequence[float]],
+    columns: int = 80,
+    lines: int = 24,
+    title: Optional[str] = None,
+    xlabel: Optional[str] = None,
+    ylabel: Optional[str] = None,
+) -> str:
+    return _bars(labels, series, columns, lines, title)
+
+
+def histogram_bins(values: Sequence[float], bins: int) -> Tuple[List[float], List[int]]:
+    """Count values into equal-width bins, as numpy.histogram does.
+
+    Returns (edges, counts); the last bin includes its upper edge.
+    """
+    if bins < 1:
+        raise ValueError("--bins must be at least 1")
+    finite = [v for v in values if math.isfinite(v)]
+    low, high = (min(finite), max(finite)) if finite else (0.0, 1.0)
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    width = (high - low) / bins
+    counts = [0] * bins
+    for value in finite:
+        counts[min(bins - 1, int((value - low) / width))] += 1
+    return [low + width * i for i in range(bins + 1)], counts
+
+
+def plot_histogram(
+    values: Sequence[float],
+    bins: int = 10,
+    columns: int = 80,
+    lines: int = 24,
+    title: Optional[str] = None,
+    xlabel: Optional[str] = None,
+    ylabel: Optional[str] = None,
+) -> str:
+    edges, counts = histogram_bins(values, bins)
+    labels = [f"{_fmt(edges[i])} – {_fmt(edges[i + 1])}" for i in range(bins)]
+    return _bars(labels, {"count": [float(c) for c in counts]}, columns, lines, title)
+
+
+def render_rows(
+    chart_type: str,
+    rows: List[Dict[str, Any]],
+    x_col: Optional[str],
+    y_cols: List[str],
+    bins: int = 10,
+    **kwargs,
+) -> str:
+    """Preview a chart of rows as text, sized by the columns and lines kwargs."""
+    series = {yc: to_float([row[yc] for row in rows], yc) for yc in y_cols}
+    if chart_type == "histogram":
+        return plot_histogram(series[y_cols[0]], bins=bins, **kwargs)
+    if chart_type == "scatter":
+        x_values = to_float([row[x_col] for row in rows], x_col)
+        return plot_scatter(x_values, series, **kwargs)
+    labels = [str(row[x_col]) for row in rows]
+    plot_fn = {"bar": plot_bar, "line": plot_line}[chart_type]
+    return plot_fn(labels, series, **kwargs)
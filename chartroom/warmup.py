@@ -0,0 +1,85 @@
+import io
+import os
+import warnings
+from typing import List, Tuple
+
+from chartroom.profiling import stage
+
+
+def available_styles() -> List[str]:
+    """The matplotlib styles chartroom offers, as listed by chartroom styles."""
+    import matplotlib.pyplot as plt
+
+    return sorted(style for style in plt.style.available if not style.startswith("_"))
+
+
+def font_cache_path() -> str:
+    """Where matplotlib saves its font list, named as matplotlib names it."""
+    import matplotlib
+    from matplotlib import font_manager
+
+    return os.path.join(
+        matplotlib.get_cachedir(),
+        f"fontlist-v{font_manager.FontManager.__version__}.json",
+    )
+
+
+def load_fonts():
+    """Load matplotlib's font list and resolve the default font.
+
+    Importing font_manager builds the font list and saves it to the
+    matplotlib cache directory if no cache is there yet.
+    """
+    from matplotlib import font_manager
+
+    font_manager.findfont(font_manager.FontProperties())
+
+
+def check_style(style: str) -> List[str]:
+    """Apply a style and resolve its font, returning any problems found."""
+    import matplotlib.pyplot as plt
+    from matplotlib import font_manager
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        try:
+            with plt.style.context(style):
+                font_manager.findfont(font_manager.FontProperties())
+        except Exception as e:
+            return [f"{style}: {e}"]
+    return [f"{style}: {warning.message}" for warning in caught]
+
+
+def warm(render: bool = False, rebuild_fonts: bool = False) -> Tuple[str, List[str]]:
+    """Do the one-off work of a first render ahead of time.
+
+    Builds and saves matplotlib's font cache, then loads every style and
+    resolves its font, then optionally renders a small chart. Each step
+    runs in a profiling stage, so an active profile records how long it
+    took. Returns (font_cache_path, problems), where problems describes
+    any style that failed to load or gave warnings.
+    """
+    with stage("import_matplotlib"):
+        import matplotlib  # noqa: F401
+
+    with stage("font_cache"):
+        load_fonts()
+        if rebuild_fonts:
+            from matplotlib import font_manager
+
+            # Scans the installed fonts again, whether or not a cache was read
+            font_manager.json_dump(font_manager.FontManager(), font_cache_path())
+    with stage("import_pyplot"):
+        import chartroom.charts  # noqa: F401
+
+    problems = []
+    with stage("styles"):
+        for style in available_styles():
+            with stage(style):
+                problems.extend(check_style(style))
+    if render:
+        from chartroom.charts import plot_bar
+
+        with stage("render"):
+            plot_bar(["a", "b", "c"], {"value": [3.0, 1.0, 2.0]}, io.BytesIO())
+    return font_cache_path(), problems
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from chartroom.aio import AsyncRenderer
+
+DATA = {"name": ["alice", "bob"], "value": [10, 20]}
+
+
+def test_async_render_and_render_spec(tmp_path):
+    (tmp_path / "data.csv").write_text("name,value\nalice,10\nbob,20\n")
+    output = str(tmp_path / "chart.png")
+
+    async def main():
+        async with AsyncRenderer(jobs=1, max_pending=1) as renderer:
+            results = await asyncio.gather(
+                renderer.render("bar", DATA),
+                renderer.render("pie", DATA, title="Share"),
+                renderer.render_spec(
+                    {
+                        "type": "line",
+                        "file": str(tmp_path / "data.csv"),
+                        "output": output,
+                    }
+                ),
+            )
+            with pytest.raises(ValueError, match="Unknown chart type"):
+                await renderer.render("donut", DATA)
+        return results
+
+    (bar, bar_alt), (pie, pie_alt), (path, line_alt) = asyncio.run(main())
+    assert bar.startswith(b"\x89PNG") and pie.startswith(b"\x89PNG")
+    assert bar_alt == "Bar chart of value by name — alice: 10, bob: 20"
+    assert pie_alt == "Share. Pie chart showing alice (33%), bob (67%)"
+    assert path == output
+    assert line_alt == "Line chart of value by name — alice: 10, bob: 20"
+
+
+def test_async_timeout_and_cancellation():
+    async def main():
+        async with AsyncRenderer(jobs=1, max_pending=1) as renderer:
+            with pytest.raises(asyncio.TimeoutError):
+                await renderer.render("bar", DATA, timeout=0.001)
+            task = asyncio.ensure_future(renderer.render("bar", DATA))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            # Slots held by the abandoned renders are released when the
+            # worker finishes them
+            return await renderer.render("bar", DATA)
+
+    image, alt = asyncio.run(main())
+    assert image.startswith(b"\x89PNG")
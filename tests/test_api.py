@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+import chartroom
+from chartroom import charts
+
+
+class FakeDataFrame:
+    """Just enough of the pandas/polars interface: .columns and df[name]."""
+
+    def __init__(self, data):
+        self._data = data
+        self.columns = list(data)
+
+    def __getitem__(self, name):
+        return self._data[name]
+
+
+def test_render_dict_of_arrays():
+    image, alt = chartroom.render(
+        "bar",
+        {"name": np.array(["alice", "bob"]), "value": np.array([10, 20])},
+        title="Scores",
+    )
+    assert image.startswith(b"\x89PNG")
+    assert alt == "Scores. Bar chart of value by name — alice: 10, bob: 20"
+
+
+def test_render_passes_float_columns_without_copying(monkeypatch):
+    values = np.linspace(0, 1, 50)
+    seen = {}
+    plot_line = charts.plot_line
+
+    def spy(labels, series, output, **kwargs):
+        seen.update(series)
+        return plot_line(labels, series, output, **kwargs)
+
+    monkeypatch.setattr(charts, "plot_line", spy)
+    frame = FakeDataFrame({"t": np.arange(50), "value": values})
+    image, alt = chartroom.render("line", frame, x="t", y="value")
+    assert seen["value"] is values
+    assert alt == ("Line chart of value by t. 50 points, ranging from 0 (0) to 1 (49)")
+
+
+def test_render_structured_array_scatter_svg():
+    data = np.array([(1, 2.5), (2, 3.5)], dtype=[("x", "i4"), ("y", "f8")])
+    image, alt = chartroom.render("scatter", data, image_format="svg")
+    assert b"<svg" in image
+    assert alt == "Scatter plot of y by x — 1: 2.5, 2: 3.5"
+
+
+@pytest.mark.parametrize("kind", ("pie", "histogram"))
+def test_render_rows_matches_cli_alt_text(kind):
+    rows = [{"name": f"n{i}", "value": str(i + 1)} for i in range(8)]
+    _, alt = chartroom.render(kind, rows)
+    _, columns_alt = chartroom.render(
+        kind, {"name": [r["name"] for r in rows], "value": np.arange(1, 9)}
+    )
+    assert alt == columns_alt
+    assert (
+        alt
+        == {
+            "pie": "Pie chart of 8 categories. Largest: n7 (22%), n6 (19%), n5 (17%)",
+            "histogram": "Histogram of 8 value values ranging from 1 to 8",
+        }[kind]
+    )
+
+
+@pytest.mark.parametrize(
+    "kind,data,error",
+    (
+        ("donut", {"a": [1]}, "Unknown chart type 'donut'"),
+        ("bar", {"name": ["a"], "value": ["x"]}, "Cannot convert value 'x'"),
+        ("bar", {"name": [], "value": []}, "No data rows found"),
+        ("bar", {"name": ["a"]}, "Need at least two columns"),
+    ),
+)
+def test_render_errors(kind, data, error):
+    with pytest.raises(ValueError, match=error):
+        chartroom.render(kind, data)
+
+
+def test_render_rejects_unknown_data():
+    with pytest.raises(TypeError):
+        chartroom.render("bar", 42)
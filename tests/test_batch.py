@@ -0,0 +1,177 @@
+import json
+import os
+import sqlite3
+
+from click.testing import CliRunner
+
+from chartroom.cli import cli
+
+
+def _make_csv():
+    with open("data.csv", "w") as f:
+        f.write("name,value\nalice,10\nbob,20\ncharlie,15\n")
+
+
+def _write_specs(specs, path="specs.jsonl"):
+    with open(path, "w") as f:
+        for spec in specs:
+            f.write(json.dumps(spec) + "\n")
+
+
+def test_batch_renders_each_spec():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _make_csv()
+        _write_specs(
+            [
+                {"type": "bar", "file": "data.csv", "output": "bar.png"},
+                {"type": "pie", "file": "data.csv", "output": "pie.png"},
+                {
+                    "type": "histogram",
+                    "file": "data.csv",
+                    "y": "value",
+                    "bins": 3,
+                    "output": "hist.png",
+                },
+            ]
+        )
+        result = runner.invoke(cli, ["batch", "specs.jsonl"])
+        assert result.exit_code == 0, result.output
+        lines = [json.loads(line) for line in result.output.strip().split("\n")]
+        assert [os.path.basename(line["path"]) for line in lines] == [
+            "bar.png",
+            "pie.png",
+            "hist.png",
+        ]
+        assert lines[0]["alt"] == (
+            "Bar chart of value by name — alice: 10, bob: 20, charlie: 15"
+        )
+        for name in ("bar.png", "pie.png", "hist.png"):
+            assert os.path.getsize(name) > 0
+
+
+def test_batch_matches_json_output_format():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _make_csv()
+        _write_specs(
+            [{"type": "line", "file": "data.csv", "title": "T", "output": "a.png"}]
+        )
+        batch_result = runner.invoke(cli, ["batch", "specs.jsonl"])
+        single_result = runner.invoke(
+            cli,
+            ["line", "data.csv", "--title", "T", "-o", "a.png", "-f", "json"],
+        )
+        assert batch_result.exit_code == 0, batch_result.output
+        assert batch_result.output == single_result.output
+
+
+def test_batch_spec_options():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("data.csv", "w") as f:
+            f.write("month,a,b\nJan,1,2\nFeb,3,4\n")
+        conn = sqlite3.connect("test.db")
+        conn.execute("CREATE TABLE t (name TEXT, value INTEGER)")
+        conn.execute("INSERT INTO t VALUES ('alice', 10)")
+        conn.commit()
+        conn.close()
+        _write_specs(
+            [
+                {
+                    "type": "line",
+                    "file": "data.csv",
+                    "csv": True,
+                    "x": "month",
+                    "y": ["a", "b"],
+                    "width": 4,
+                    "dpi": 50,
+                    "output": "multi.png",
+                },
+                {
+                    "type": "bar",
+                    "sql": ["test.db", "SELECT * FROM t"],
+                    "alt": "Custom",
+                    "output": "sql.png",
+                },
+            ]
+        )
+        result = runner.invoke(cli, ["batch", "specs.jsonl"])
+        assert result.exit_code == 0, result.output
+        lines = [json.loads(line) for line in result.output.strip().split("\n")]
+        assert lines[0]["alt"].endswith("and 1 more series")
+        assert lines[1]["alt"] == "Custom"
+
+
+def test_batch_reads_specs_from_stdin():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _make_csv()
+        result = runner.invoke(
+            cli,
+            ["batch", "-"],
+            input='{"type": "scatter", "file": "data.csv", "x": "value"}\n\n',
+        )
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.output)["path"].endswith("chart.png")
+
+
+def test_batch_invalid_specs():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _make_csv()
+        for spec, message in (
+            ({"type": "donut", "file": "data.csv"}, "Unknown chart type"),
+            ({"type": "bar", "file": "data.csv", "colour": "red"}, "colour"),
+            ({"type": "bar"}, "either 'file' or 'sql'"),
+            ({"type": "bar", "file": "data.csv", "dpi": "x"}, "'dpi'"),
+            ({"type": "bar", "file": "data.csv", "y": "missing"}, "not found"),
+        ):
+            _write_specs([spec])
+            result = runner.invoke(cli, ["batch", "specs.jsonl"])
+            assert result.exit_code == 1
+            error = json.loads(result.stdout)
+            assert error["line"] == 1
+            assert message in error["error"]
+            assert "Error: Line 1:" in result.stderr
+
+
+def test_batch_errors_do_not_stop_batch():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _make_csv()
+        with open("specs.jsonl", "w") as f:
+            f.write('{"type": "bar", "file": "data.csv", "output": "a.png"}\n')
+            f.write("not json\n")
+            f.write('{"type": "bar", "file": "missing.csv"}\n')
+            f.write('{"type": "pie", "file": "data.csv", "output": "b.png"}\n')
+        result = runner.invoke(cli, ["batch", "specs.jsonl"])
+        assert result.exit_code == 1
+        lines = [json.loads(line) for line in result.stdout.strip().split("\n")]
+        assert lines[0]["path"].endswith("a.png")
+        assert lines[1]["line"] == 2
+        assert lines[2]["line"] == 3
+        assert "missing.csv" in lines[2]["error"]
+        assert lines[3]["path"].endswith("b.png")
+        assert os.path.exists("b.png")
+
+
+def test_batch_jobs_preserves_input_order():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _make_csv()
+        specs = [
+            {"type": "bar", "file": "data.csv", "output": f"chart-{i}.png"}
+            for i in range(6)
+        ]
+        specs.insert(3, {"type": "bar", "file": "data.csv", "y": "missing"})
+        _write_specs(specs)
+        result = runner.invoke(cli, ["batch", "specs.jsonl", "--jobs", "3"])
+        assert result.exit_code == 1
+        lines = [json.loads(line) for line in result.stdout.strip().split("\n")]
+        assert len(lines) == 7
+        assert lines[3]["line"] == 4
+        outputs = [os.path.basename(line["path"]) for line in lines if "path" in line]
+        assert outputs == [f"chart-{i}.png" for i in range(6)]
+        for name in outputs:
+            assert os.path.getsize(name) > 0
@@ -0,0 +1,64 @@
+import json
+import pathlib
+import subprocess
+import sys
+
+BENCH = pathlib.Path(__file__).parent.parent / "benchmarks" / "bench.py"
+
+
+def _bench(*args, cwd):
+    return subprocess.run(
+        [sys.executable, str(BENCH), "--repeat", "1", *args],
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+    )
+
+
+def test_benchmark_results_and_baseline(tmp_path):
+    data_dir = str(tmp_path / "data")
+    result = _bench(
+        "--sizes", "20", "--data-dir", data_dir, "-o", "results.json", cwd=tmp_path
+    )
+    assert result.returncode == 0, result.stderr
+    results = json.loads((tmp_path / "results.json").read_text())
+    assert {"python", "chartroom", "matplotlib"} <= set(results["meta"])
+    benchmarks = {r["benchmark"]: r for r in results["results"]}
+    assert set(benchmarks) == {
+        "load_csv",
+        "load_tsv",
+        "load_json",
+        "load_jsonl",
+        "load_sqlite",
+        "render_bar",
+        "render_line",
+        "render_scatter",
+        "render_pie",
+        "render_histogram",
+    }
+    assert all(r["rows"] == 20 for r in results["results"])
+    assert all(r["seconds"] > 0 and r["peak_bytes"] > 0 for r in benchmarks.values())
+
+    # A baseline that was impossibly fast shows up as a regression
+    for r in results["results"]:
+        r["seconds"] /= 1000
+    (tmp_path / "baseline.json").write_text(json.dumps(results))
+    args = ["--sizes", "20", "--data-dir", data_dir, "--charts", "", "-o", "-"]
+    result = _bench(
+        *args, "--formats", "csv", "--baseline", "baseline.json", cwd=tmp_path
+    )
+    assert result.returncode == 1
+    assert "REGRESSION load_csv (20 rows) seconds" in result.stderr
+
+    result = _bench(
+        *args,
+        "--formats",
+        "csv",
+        "--baseline",
+        "results.json",
+        "--threshold",
+        "1e9",
+        cwd=tmp_path,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "No regressions" in result.stderr
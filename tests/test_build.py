@@ -0,0 +1,153 @@
+import json
+import os
+import sqlite3
+
+from click.testing import CliRunner
+
+from chartroom.build import BuildState, load_build_file
+from chartroom.cli import cli
+
+BUILD_FILE = """
+[defaults]
+width = 4
+height = 3
+
+[[chart]]
+type = "bar"
+file = "data/sales.csv"
+output = "charts/sales.png"
+
+[[chart]]
+type = "pie"
+sql = ["data/items.db", "select name, count from items"]
+output = "charts/items.png"
+variants = ["charts/items.svg"]
+"""
+
+
+def _make_project(path):
+    (path / "data").mkdir()
+    (path / "data" / "sales.csv").write_text("name,value\nalice,10\nbob,20\n")
+    conn = sqlite3.connect(path / "data" / "items.db")
+    conn.execute("create table items (name text, count integer)")
+    conn.execute("insert into items values ('apples', 3), ('pears', 1)")
+    conn.commit()
+    conn.close()
+    (path / "charts.toml").write_text(BUILD_FILE)
+
+
+def _build(path, *args):
+    result = CliRunner().invoke(cli, ["build", str(path / "charts.toml"), *args])
+    lines = [json.loads(line) for line in result.stdout.splitlines()]
+    return result, lines
+
+
+def test_load_build_file_resolves_paths(tmp_path):
+    _make_project(tmp_path)
+    specs = load_build_file(str(tmp_path / "charts.toml"))
+    assert specs[0] == {
+        "type": "bar",
+        "file": str(tmp_path / "data" / "sales.csv"),
+        "output": str(tmp_path / "charts" / "sales.png"),
+        "width": 4,
+        "height": 3,
+    }
+    assert specs[1]["sql"][0] == str(tmp_path / "data" / "items.db")
+    assert specs[1]["variants"] == [str(tmp_path / "charts" / "items.svg")]
+
+
+def test_build_only_rebuilds_changed_charts(tmp_path):
+    _make_project(tmp_path)
+    result, lines = _build(tmp_path, "-j", "1")
+    assert result.exit_code == 0, result.output
+    assert [line["built"] for line in lines] == [True, True]
+    assert lines[1]["alt"] == "Pie chart showing apples (75%), pears (25%)"
+    assert (tmp_path / "charts" / "items.svg").exists()
+
+    result, lines = _build(tmp_path)
+    assert [line["built"] for line in lines] == [False, False]
+    assert lines[1]["alt"] == "Pie chart showing apples (75%), pears (25%)"
+
+    # Touching an input without changing it does not rebuild
+    os.utime(tmp_path / "data" / "sales.csv")
+    _, lines = _build(tmp_path)
+    assert [line["built"] for line in lines] == [False, False]
+
+    (tmp_path / "data" / "sales.csv").write_text("name,value\nalice,30\nbob,20\n")
+    _, lines = _build(tmp_path)
+    assert [(line["path"], line["built"]) for line in lines] == [
+        (str(tmp_path / "charts" / "items.png"), False),
+        (str(tmp_path / "charts" / "sales.png"), True),
+    ]
+
+    # A deleted variant rebuilds its chart
+    (tmp_path / "charts" / "items.svg").unlink()
+    _, lines = _build(tmp_path)
+    assert [line["built"] for line in lines] == [False, True]
+    assert (tmp_path / "charts" / "items.svg").exists()
+
+    _, lines = _build(tmp_path, "--force", "-j", "1")
+    assert [line["built"] for line in lines] == [True, True]
+
+
+def test_build_rebuilds_when_options_change(tmp_path):
+    _make_project(tmp_path)
+    _build(tmp_path, "-j", "1")
+    build_file = tmp_path / "charts.toml"
+    build_file.write_text(build_file.read_text().replace("width = 4", "width = 5"))
+    _, lines = _build(tmp_path, "-j", "1")
+    assert [line["built"] for line in lines] == [True, True]
+
+
+def test_build_state_only_hashes_modified_files(tmp_path, monkeypatch):
+    from chartroom import build
+
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n")
+    state = BuildState(str(tmp_path / "state.json"))
+    digest = state.file_digest(str(path))
+    state.save()
+    hashed = []
+    hash_file = build.hash_file
+    monkeypatch.setattr(build, "hash_file", lambda p: hashed.append(p) or hash_file(p))
+    state = BuildState(str(tmp_path / "state.json"))
+    assert state.file_digest(str(path)) == digest
+    assert hashed == []
+    path.write_text("a,b\n1,3\n")
+    assert state.file_digest(str(path)) != digest
+    assert hashed == [str(path)]
+
+
+def test_build_reports_errors(tmp_path):
+    (tmp_path / "data.csv").write_text("name,value\nalice,10\n")
+    (tmp_path / "charts.toml").write_text("""
+[[chart]]
+type = "bar"
+file = "data.csv"
+
+[[chart]]
+type = "bar"
+file = "missing.csv"
+output = "missing.png"
+
+[[chart]]
+type = "bar"
+file = "data.csv"
+y = "nope"
+output = "bad.png"
+
+[[chart]]
+type = "bar"
+file = "data.csv"
+output = "good.png"
+""")
+    result, lines = _build(tmp_path, "-j", "1")
+    assert result.exit_code == 1
+    assert lines[0] == {"chart": 1, "error": "Chart must include 'output'"}
+    assert lines[1] == {
+        "chart": 2,
+        "error": f"File not found: {tmp_path / 'missing.csv'}",
+    }
+    assert lines[2]["chart"] == 3
+    assert lines[3]["built"] is True
+    assert "Error: Chart 3: " in result.stderr
@@ -0,0 +1,164 @@
+import json
+import os
+import sqlite3
+
+from click.testing import CliRunner
+
+import chartroom.cli
+from chartroom.cache import ChartCache
+from chartroom.cli import cli
+
+CSV = "name,value\nalice,10\nbob,20\ncharlie,15\n"
+
+
+def _make_csv(content=CSV):
+    with open("data.csv", "w") as f:
+        f.write(content)
+
+
+def _json(args, **kwargs):
+    result = CliRunner().invoke(cli, args + ["-f", "json"], **kwargs)
+    assert result.exit_code == 0, result.output
+    return json.loads(result.output)
+
+
+def test_cache_hit_skips_render(monkeypatch):
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _make_csv()
+        first = _json(["bar", "data.csv", "-o", "a.png", "--cache", "cache"])
+        os.remove("a.png")
+
+        def boom(*args, **kwargs):
+            raise AssertionError("chart should have come from the cache")
+
+        monkeypatch.setattr(chartroom.cli, "_render_bar_wrapper", boom)
+        second = _json(["bar", "data.csv", "-o", "a.png", "--cache", "cache"])
+        assert second == first
+        assert os.path.getsize("a.png") > 0
+
+
+def test_cache_copies_to_new_output():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _make_csv()
+        _json(["bar", "data.csv", "-o", "a.png", "--cache", "cache"])
+        _json(["bar", "data.csv", "-o", "b.png", "--cache", "cache"])
+        with open("a.png", "rb") as a, open("b.png", "rb") as b:
+            assert a.read() == b.read()
+
+
+def test_cache_key_includes_options_and_data(monkeypatch):
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _make_csv()
+        base = ["bar", "data.csv", "-o", "a.png", "--cache", "cache"]
+        first = _json(base)
+        titled = _json(base + ["--title", "Scores"])
+        assert titled["alt"] == "Scores. " + first["alt"]
+        assert _json(["line"] + base[1:])["alt"].startswith("Line chart")
+        _make_csv(CSV.replace("10", "11"))
+        assert "alice: 11" in _json(base)["alt"]
+        assert len([n for n in os.listdir("cache") if n.endswith(".img")]) == 4
+
+
+def test_cache_alt_override():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _make_csv()
+        base = ["bar", "data.csv", "-o", "a.png", "--cache", "cache"]
+        _json(base)
+        assert _json(base + ["--alt", "Custom"])["alt"] == "Custom"
+        assert _json(base)["alt"].startswith("Bar chart")
+
+
+def test_cache_stdin_round_trip():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        args = ["bar", "--csv", "-o", "a.png", "--cache", "cache", "-f", "alt"]
+        first = runner.invoke(cli, args, input=CSV)
+        second = runner.invoke(cli, args, input=CSV)
+        assert first.exit_code == second.exit_code == 0
+        assert first.output == second.output
+        assert len(os.listdir("cache")) == 2
+
+
+def test_cache_sql_invalidated_by_changes():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        conn = sqlite3.connect("test.db")
+        conn.execute("CREATE TABLE t (name TEXT, value INTEGER)")
+        conn.execute("INSERT INTO t VALUES ('alice', 10)")
+        conn.commit()
+        args = ["bar", "--sql", "test.db", "SELECT * FROM t", "--cache", "cache"]
+        assert _json(args + ["-o", "a.png"])["alt"].endswith("alice: 10")
+        conn.execute("INSERT INTO t VALUES ('bob', 20)")
+        conn.commit()
+        conn.close()
+        assert _json(args + ["-o", "a.png"])["alt"].endswith("bob: 20")
+
+
+def test_cache_hit_does_not_rewrite_unchanged_output():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _make_csv()
+        args = ["bar", "data.csv", "-o", "a.png", "--cache", "cache"]
+        _json(args)
+        os.utime("a.png", (1000, 1000))
+        _json(args)
+        assert os.stat("a.png").st_mtime == 1000
+
+
+def test_cache_still_validates_options():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _make_csv()
+        _json(["bar", "data.csv", "-o", "a.png", "--cache", "cache"])
+        result = runner.invoke(
+            cli, ["bar", "data.csv", "--csv", "--tsv", "--cache", "cache"]
+        )
+        assert result.exit_code == 2
+        result = runner.invoke(
+            cli, ["bar", "--sql", "missing.db", "SELECT 1", "--cache", "cache"]
+        )
+        assert result.exit_code == 1
+        assert "Database file not found" in result.output
+
+
+def test_cache_eviction(tmp_path):
+    cache = ChartCache(str(tmp_path / "cache"), max_size=25)
+    for i, key in enumerate(("a", "b", "c")):
+        image = tmp_path / f"{key}.png"
+        image.write_bytes(b"x" * 10)
+        cache.put(key, str(image), f"alt {key}")
+        # Give each entry a distinct, increasing last-used time
+        os.utime(cache._paths(key)[0], (i, i))
+        if key == "b":
+            # Reading "a" makes it more recently used than "b"
+            assert cache.get("a") == "alt a"
+    cache.evict()
+    assert cache.get("b") is None
+    assert cache.get("a") == "alt a"
+    assert cache.get("c") == "alt c"
+
+
+def test_cache_restores_variants(monkeypatch):
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _make_csv()
+        args = ["bar", "data.csv", "-o", "a.png", "--cache", "cache"]
+        args += ["--variant", "a.svg", "--variant", "thumb.png:w50"]
+        first = _json(args)
+        with open("thumb.png", "rb") as fp:
+            thumbnail = fp.read()
+        for name in ("a.png", "a.svg", "thumb.png"):
+            os.remove(name)
+
+        def boom(*args, **kwargs):
+            raise AssertionError("chart should have come from the cache")
+
+        monkeypatch.setattr(chartroom.cli, "_render_bar_wrapper", boom)
+        assert _json(args) == first
+        assert os.path.getsize("a.svg") > 0
+        with open("thumb.png", "rb") as fp:
+            assert fp.read() == thumbnail
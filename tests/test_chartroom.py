@@ -599,3 +599,42 @@ def test_histogram_with_title():
         )
         assert result.exit_code == 0, result.output
         assert os.path.exists("out.png")
+
+
+def test_multi_renders_each_chart_from_one_load(monkeypatch):
+    from chartroom import charts
+    from chartroom import cli as cli_module
+
+    loads = []
+    load_data = cli_module._load_data
+    monkeypatch.setattr(
+        cli_module, "_load_data", lambda *args: loads.append(args) or load_data(*args)
+    )
+    conversions = []
+    to_float = charts.to_float
+    monkeypatch.setattr(
+        charts,
+        "to_float",
+        lambda values, col: conversions.append(col) or to_float(values, col),
+    )
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("data.csv", "w") as f:
+            f.write("name,value\nalice,10\nbob,20\ncharlie,15\n")
+        args = ["multi", "data.csv", "--chart", "bar:bar.png", "--chart", "pie"]
+        result = runner.invoke(cli, args + ["--chart", "histogram", "-f", "alt"])
+        assert result.exit_code == 0, result.output
+        assert result.output.splitlines() == [
+            "Bar chart of value by name — alice: 10, bob: 20, charlie: 15",
+            "Pie chart showing alice (22%), bob (44%), charlie (33%)",
+            "Histogram of value values: 10, 20, 15",
+        ]
+        assert len(loads) == 1
+        assert conversions == ["value"]
+        assert {"bar.png", "chart.png", "chart-2.png"} <= set(os.listdir("."))
+
+
+def test_multi_invalid_chart():
+    result = CliRunner().invoke(cli, ["multi", "--csv", "--chart", "donut"], input="")
+    assert result.exit_code == 2
+    assert "unknown chart type 'donut'" in result.output
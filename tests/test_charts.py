@@ -0,0 +1,47 @@
+import io
+
+import numpy as np
+import pytest
+
+from chartroom import charts
+
+
+@pytest.mark.parametrize("plot_fn", (charts.plot_scatter, charts.plot_line))
+def test_large_data_is_rasterized_in_vector_output(plot_fn, monkeypatch):
+    monkeypatch.setattr(charts, "RASTERIZE_POINTS", 50)
+    for points, rasterized in ((50, False), (51, True)):
+        output = io.BytesIO()
+        values = np.arange(float(points))
+        plot_fn(values, {"y": values}, output, image_format="svg")
+        image = output.getvalue()
+        assert (b"<image" in image) == rasterized
+        # Axes and text are still vectors
+        assert b'id="text_' in image
+
+
+def test_prepare_for_size_scales_with_points():
+    fig, ax = charts._make_figure(4, 3)
+    ax.plot(np.arange(10))
+    assert charts._prepare_for_size(ax) == {}
+    assert not ax.lines[0].get_rasterized()
+    ax.plot(np.arange(charts.LARGE_PATH_POINTS * 3))
+    params = charts._prepare_for_size(ax)
+    assert params["agg.path.chunksize"] == 10_000
+    assert params["path.simplify_threshold"] == pytest.approx(1 / 3)
+    assert ax.lines[1].get_rasterized()
+    charts.plt.close(fig)
+
+
+@pytest.mark.parametrize(
+    "plot_fn,args",
+    (
+        (charts.plot_bar, (["a", "b"], {"y": [1.0, 2.0]})),
+        (charts.plot_pie, (["a", "b"], [1.0, 2.0])),
+        (charts.plot_histogram, ([1.0, 2.0],)),
+    ),
+)
+def test_figure_closed_when_save_fails(plot_fn, args):
+    open_figures = charts.plt.get_fignums()
+    with pytest.raises(ValueError):
+        plot_fn(*args, io.BytesIO(), image_format="not-a-format")
+    assert charts.plt.get_fignums() == open_figures
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from chartroom.charts import DATE_MARKER_POINTS, plot_bar, plot_line
+from chartroom.dates import parse_dates
+
+
+@pytest.mark.parametrize(
+    "values,expected",
+    [
+        (["2024-01-01", "2024-01-02"], ["2024-01-01", "2024-01-02"]),
+        (["2024-01-01 10:30", "2024-01-01T11:00:00.5"], None),
+        (["2024-01", "2024-02"], ["2024-01-01", "2024-02-01"]),
+        (["2024-01-01T12:00:00+01:00"], ["2024-01-01T11:00"]),
+        (["1700000000", "1700086400"], ["2023-11-14T22:13:20", "2023-11-15T22:13:20"]),
+        ([1700000000, 1700000000.5], ["2023-11-14T22:13:20", "2023-11-14T22:13:20.5"]),
+    ],
+)
+def test_parse_dates(values, expected):
+    dates = parse_dates(values)
+    assert dates.dtype.kind == "M"
+    assert len(dates) == len(values)
+    if expected is not None:
+        assert list(dates) == list(np.array(expected, dtype="datetime64[us]"))
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [],
+        ["alice", "bob"],
+        ["2023", "2024"],
+        ["2024-01-01", "bob"],
+        ["2024-13-01"],
+        ["2024-01-01", ""],
+        ["2024-01-01", "NaT"],
+        ["1700000000", ""],
+        ["1700000000", "12"],
+        ["123", "456"],
+    ],
+)
+def test_parse_dates_not_dates(values):
+    assert parse_dates(values) is None
+
+
+def test_plot_line_time_axis(tmp_path):
+    import matplotlib.dates as mdates
+    import matplotlib.pyplot as plt
+
+    figures = []
+    close = plt.close
+    labels = [
+        str(d) for d in np.arange("2024-01-01", "2024-12-31", dtype="datetime64[h]")
+    ]
+    assert len(labels) > DATE_MARKER_POINTS
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(plt, "close", lambda fig: figures.append(fig) or close(fig))
+        plot_line(labels, {"v": np.ones(len(labels))}, str(tmp_path / "line.png"))
+    [ax] = figures[0].axes
+    assert isinstance(ax.xaxis.get_major_locator(), mdates.AutoDateLocator)
+    assert isinstance(ax.xaxis.get_major_formatter(), mdates.ConciseDateFormatter)
+    assert len(ax.get_xticks()) < 20
+    assert ax.lines[0].get_marker() == "None"
+
+
+def test_plot_bar_time_axis(tmp_path):
+    import matplotlib.dates as mdates
+    import matplotlib.pyplot as plt
+
+    figures = []
+    close = plt.close
+    labels = ["1700000000", "1700086400", "1700172800"]
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(plt, "close", lambda fig: figures.append(fig) or close(fig))
+        plot_bar(labels, {"a": [1, 2, 3], "b": [3, 2, 1]}, str(tmp_path / "bar.png"))
+    [ax] = figures[0].axes
+    assert isinstance(ax.xaxis.get_major_formatter(), mdates.ConciseDateFormatter)
+    # Two series share 80% of the one day gap between dates
+    assert ax.patches[0].get_width() == pytest.approx(0.4)
+
+
+def test_plot_bar_categories_unchanged(tmp_path):
+    import matplotlib.pyplot as plt
+
+    figures = []
+    close = plt.close
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(plt, "close", lambda fig: figures.append(fig) or close(fig))
+        plot_bar(["2023", "2024"], {"a": [1, 2]}, str(tmp_path / "bar.png"))
+    [ax] = figures[0].axes
+    assert [t.get_text() for t in ax.get_xticklabels()] == ["2023", "2024"]
@@ -0,0 +1,88 @@
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+from PIL import Image
+
+from chartroom.cli import cli
+from chartroom.encode import Encoding
+
+CSV = "name,value\nalice,10\nbob,20\ncharlie,15\n"
+
+
+@pytest.mark.parametrize(
+    "image_format,expected",
+    (
+        ("png", {"compress_level": 1}),
+        ("jpg", {"quality": 40}),
+        ("webp", {"quality": 40}),
+        ("svg", {}),
+    ),
+)
+def test_pil_kwargs(image_format, expected):
+    encoding = Encoding(quality=40, compress_level=1, colors=8)
+    assert encoding.pil_kwargs(image_format) == expected
+
+
+def test_empty_encoding_is_false():
+    assert not Encoding()
+    assert Encoding(colors=4)
+
+
+@pytest.mark.parametrize("extension", ("svg", "pdf"))
+def test_vector_output_is_deterministic(extension, tmp_path):
+    (tmp_path / "data.csv").write_text(CSV)
+    outputs = []
+    for name in ("a", "b"):
+        output = str(tmp_path / f"{name}.{extension}")
+        args = ["bar", str(tmp_path / "data.csv"), "-o", output]
+        result = CliRunner().invoke(cli, args)
+        assert result.exit_code == 0, result.output
+        with open(output, "rb") as fp:
+            outputs.append(fp.read())
+    assert outputs[0] == outputs[1]
+
+
+def _render(args):
+    result = CliRunner().invoke(cli, ["bar", "data.csv", "-f", "json"] + args)
+    assert result.exit_code == 0, result.output
+    return json.loads(result.output)
+
+
+def test_encoder_options():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("data.csv", "w") as f:
+            f.write(CSV)
+        default = _render(["-o", "default.png"])
+        assert default["bytes"] == os.path.getsize("default.png")
+
+        quantized = _render(["-o", "palette.png", "--colors", "16"])
+        assert quantized["bytes"] < default["bytes"]
+        with Image.open("palette.png") as image:
+            assert image.mode == "P"
+
+        fast = _render(["-o", "fast.png", "--png-compression", "0"])
+        assert fast["bytes"] > default["bytes"]
+
+        low = _render(["-o", "low.webp", "--quality", "10"])
+        high = _render(["-o", "high.webp", "--quality", "100"])
+        assert low["bytes"] < high["bytes"]
+        with Image.open("low.webp") as image:
+            assert image.format == "WEBP"
+
+        _render(["-o", "photo.jpg", "--variant", "thumb.jpg:w80", "--quality", "50"])
+        with Image.open("thumb.jpg") as image:
+            assert (image.format, image.width) == ("JPEG", 80)
+
+
+def test_encoder_options_are_part_of_cache_key():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("data.csv", "w") as f:
+            f.write(CSV)
+        base = ["-o", "a.png", "--cache", "cache"]
+        first = _render(base)
+        second = _render(base + ["--colors", "8"])
+        assert second["bytes"] < first["bytes"]
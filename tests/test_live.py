@@ -0,0 +1,230 @@
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from chartroom import live
+from chartroom.cli import cli
+
+
+def test_file_tailer_reads_appended_bytes(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"name,value\n")
+    tailer = live.FileTailer(str(path))
+    assert tailer.read_all() == b"name,value\n"
+    assert tailer.poll() is None
+    with open(path, "ab") as fp:
+        fp.write(b"alice,10\n")
+    assert tailer.poll() == b"alice,10\n"
+    assert tailer.poll() is None
+
+
+@pytest.mark.parametrize(
+    "change",
+    (
+        lambda path: path.write_bytes(b"name"),
+        lambda path: path.write_bytes(b"NAME,VALUE\nbob,20\n"),
+        lambda path: os.replace(path.with_suffix(".new"), path),
+    ),
+    ids=("truncated", "rewritten", "replaced"),
+)
+def test_file_tailer_detects_rewrites(tmp_path, change):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"name,value\n")
+    path.with_suffix(".new").write_bytes(b"name,value\n")
+    tailer = live.FileTailer(str(path))
+    tailer.read_all()
+    change(path)
+    with pytest.raises(live.FileRewritten):
+        tailer.poll()
+
+
+def test_file_source_parses_complete_lines(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"name,value\nalice,10\n")
+    source = live.FileSource(str(path))
+    assert source.load() == [{"name": "alice", "value": "10"}]
+    with open(path, "ab") as fp:
+        fp.write(b"bob,20\ncharlie,1")
+    assert source.poll() == (False, [{"name": "bob", "value": "20"}])
+    with open(path, "ab") as fp:
+        fp.write(b"5\n")
+    assert source.poll() == (False, [{"name": "charlie", "value": "15"}])
+    path.write_bytes(b"name,value\nzed,1\n")
+    assert source.poll() == (True, [{"name": "zed", "value": "1"}])
+
+
+def test_file_source_jsonl(tmp_path):
+    path = tmp_path / "data.jsonl"
+    path.write_bytes(b'{"name": "alice", "value": 10}\n{"name": "al", "value": 5}\n')
+    source = live.FileSource(str(path))
+    assert len(source.load()) == 2
+    with open(path, "ab") as fp:
+        fp.write(b'{"name": "bob", "value": 20}\n')
+    assert source.poll() == (False, [{"name": "bob", "value": 20}])
+
+
+def _rows(start, stop):
+    return [{"name": f"n{i}", "value": str(i)} for i in range(start, stop)]
+
+
+def test_live_line_chart_reuses_artists(tmp_path):
+    chart = live.LiveChart("line", "name", ["value"])
+    chart.reset(_rows(0, 3))
+    summaries = chart.save(str(tmp_path / "a.png"))
+    line = chart._artists["value"]
+    assert summaries["value"].max == 2.0
+    chart.extend(_rows(3, 50))
+    summaries = chart.save(str(tmp_path / "a.png"))
+    assert chart._artists["value"] is line
+    assert len(line.get_xdata()) == 50
+    assert summaries["value"].count == 50
+    assert len(chart.ax.get_xticks()) <= live.MAX_CATEGORY_TICKS
+    chart.close()
+
+
+def test_live_bar_chart_adds_patches(tmp_path):
+    chart = live.LiveChart("bar", "name", ["value"])
+    chart.reset(_rows(0, 3))
+    chart.save(str(tmp_path / "a.png"))
+    first = list(chart._artists["value"])
+    chart.extend(_rows(3, 5))
+    chart.save(str(tmp_path / "a.png"))
+    patches = chart._artists["value"]
+    assert patches[:3] == first
+    assert [p.get_height() for p in patches] == [0, 1, 2, 3, 4]
+    chart.reset(_rows(0, 2))
+    chart.save(str(tmp_path / "a.png"))
+    assert len(chart._artists["value"]) == 2
+    chart.close()
+
+
+@pytest.mark.parametrize("chart_type", ("scatter", "pie", "histogram"))
+def test_live_chart_types(tmp_path, chart_type):
+    rows = [{"name": f"n{i}", "x": i, "value": i + 1} for i in range(5)]
+    x_col = {"scatter": "x", "pie": "name", "histogram": None}[chart_type]
+    chart = live.LiveChart(chart_type, x_col, ["value"], title="Live")
+    chart.reset(rows[:2])
+    chart.save(str(tmp_path / "a.png"))
+    chart.extend(rows[2:])
+    summaries = chart.save(str(tmp_path / "a.png"))
+    assert summaries["value"].count == 5
+    assert chart.ax.get_title() == "Live"
+    assert (tmp_path / "a.png").read_bytes().startswith(b"\x89PNG")
+    chart.close()
+
+
+def test_watch_cli(monkeypatch):
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 1:
+            with open("data.csv", "a") as f:
+                f.write("charlie,30\n")
+        elif len(sleeps) == 3:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(live.time, "sleep", fake_sleep)
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("data.csv", "w") as f:
+            f.write("name,value\nalice,10\nbob,20\n")
+        result = runner.invoke(
+            cli,
+            ["line", "data.csv", "-o", "out.png", "--watch", "--interval", "0.5"]
+            + ["-f", "json"],
+        )
+        assert result.exit_code == 0, result.output
+        frames = [json.loads(line) for line in result.output.splitlines()]
+        assert [frame["alt"] for frame in frames] == [
+            "Line chart of value by name — alice: 10, bob: 20",
+            "Line chart of value by name — alice: 10, bob: 20, charlie: 30",
+        ]
+        assert sleeps == [0.5, 0.5, 0.5]
+        assert os.path.exists("out.png")
+
+
+def test_watch_requires_file():
+    result = CliRunner().invoke(cli, ["bar", "--csv", "--watch"], input="a,b\n1,2\n")
+    assert result.exit_code == 2
+    assert "--watch requires a FILE or --sql" in result.output
+
+
+def test_ring_buffer_keeps_latest_values():
+    ring = live.RingBuffer(4)
+    ring.extend([1, 2, 3])
+    assert ring.values().tolist() == [1, 2, 3]
+    ring.extend([4, 5])
+    assert ring.values().tolist() == [2, 3, 4, 5]
+    ring.extend([6])
+    assert ring.values().tolist() == [3, 4, 5, 6]
+    ring.extend(range(10, 20))
+    assert ring.values().tolist() == [16, 17, 18, 19]
+    assert len(ring) == 4
+    ring.clear()
+    assert ring.values().tolist() == []
+
+
+def test_ring_buffer_objects():
+    ring = live.RingBuffer(2, object)
+    ring.extend(["a", "b", "c"])
+    assert ring.values().tolist() == ["b", "c"]
+
+
+def test_stream_source_keeps_window():
+    import io
+
+    stream = io.BytesIO(
+        b"name,value\n" + b"".join(b"n%d,%d\n" % (i, i) for i in range(100))
+    )
+    source = live.StreamSource(stream, window=5)
+    source._thread.join()
+    rows = source.load()
+    assert [row["name"] for row in rows] == ["n95", "n96", "n97", "n98", "n99"]
+    assert source.finished
+
+
+def test_live_window_chart(tmp_path):
+    chart = live.LiveChart("line", "name", ["value"], window=10)
+    chart.reset(_rows(0, 5))
+    chart.save(str(tmp_path / "a.png"))
+    line = chart._artists["value"]
+    chart.extend(_rows(5, 25))
+    summaries = chart.save(str(tmp_path / "a.png"))
+    assert chart._artists["value"] is line
+    assert list(line.get_ydata()) == list(range(15, 25))
+    assert (summaries["value"].min, summaries["value"].max) == (15, 24)
+
+
+def test_live_cli():
+    lines = "".join(f'{{"t": "t{i}", "value": {i}}}\n' for i in range(30))
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        result = runner.invoke(
+            cli,
+            ["line", "--jsonl", "--live", "--window", "5", "-o", "live.png"]
+            + ["--interval", "0.01", "-f", "json"],
+            input=lines,
+        )
+        assert result.exit_code == 0, result.output
+        frames = [json.loads(line) for line in result.output.splitlines()]
+        assert frames[-1]["alt"] == (
+            "Line chart of value by t — t25: 25, t26: 26, t27: 27, t28: 28, t29: 29"
+        )
+        assert os.path.exists("live.png")
+
+
+@pytest.mark.parametrize(
+    "args,error",
+    (
+        (["--sql", "x.db", "select 1"], "cannot use --sql"),
+        (["--json"], "--live needs CSV, TSV or newline-delimited JSON"),
+        (["--watch", "data.csv"], "--watch and --live cannot be used together"),
+    ),
+)
+def test_live_usage_errors(args, error):
+    result = CliRunner().invoke(cli, ["line", "--live"] + args, input="[]")
+    assert result.exit_code == 2
+    assert error in result.output
@@ -0,0 +1,106 @@
+import os
+import threading
+
+import pytest
+from click.testing import CliRunner
+
+from chartroom.cli import cli
+from chartroom.output import Variant, atomic_write, reserve_output, save_figure
+
+
+def test_reserve_output_fills_first_gap(tmp_path):
+    for name in ("chart.png", "chart-3.png", "chart-01.png", "chart-x.png"):
+        (tmp_path / name).write_bytes(b"x")
+    path = reserve_output(str(tmp_path))
+    assert os.path.basename(path) == "chart-2.png"
+    assert os.path.getsize(path) == 0
+    assert os.path.basename(reserve_output(str(tmp_path))) == "chart-4.png"
+
+
+def test_reserve_output_is_unique_across_threads(tmp_path):
+    paths = []
+    barrier = threading.Barrier(8)
+
+    def reserve():
+        barrier.wait()
+        paths.append(reserve_output(str(tmp_path)))
+
+    threads = [threading.Thread(target=reserve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(paths)) == 8
+
+
+def test_atomic_write_keeps_original_on_failure(tmp_path):
+    path = tmp_path / "out.png"
+    path.write_bytes(b"original")
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path)) as fp:
+            fp.write(b"partial")
+            raise RuntimeError("boom")
+    assert path.read_bytes() == b"original"
+    assert os.listdir(tmp_path) == ["out.png"]
+
+
+@pytest.mark.parametrize("name,magic", (("out.png", b"\x89PNG"), ("out.SVG", b"<?xml")))
+def test_save_figure_uses_extension_format(tmp_path, name, magic):
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure()
+    save_figure(fig, str(tmp_path / name))
+    plt.close(fig)
+    assert (tmp_path / name).read_bytes().startswith(magic)
+    assert os.listdir(tmp_path) == [name]
+
+
+def test_failed_render_releases_auto_output():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("data.csv", "w") as f:
+            f.write("name,value\nalice,ten\n")
+        result = runner.invoke(cli, ["bar", "data.csv"])
+        assert result.exit_code == 1
+        assert "Cannot convert" in result.output
+        assert os.listdir(".") == ["data.csv"]
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    (
+        ("chart.svg", ("chart.svg", 1.0, None)),
+        ("chart@2x.png:2x", ("chart@2x.png", 2.0, None)),
+        ("thumb.jpg:w200", ("thumb.jpg", 1.0, 200)),
+        ("C:\\charts\\chart.png", ("C:\\charts\\chart.png", 1.0, None)),
+        ("odd:name.png", ("odd:name.png", 1.0, None)),
+    ),
+)
+def test_variant_parse(value, expected):
+    variant = Variant.parse(value)
+    assert (variant.path, variant.scale, variant.width) == expected
+
+
+def test_variants_from_one_figure():
+    from PIL import Image
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("data.csv", "w") as f:
+            f.write("name,value\nalice,10\nbob,20\n")
+        args = ["bar", "data.csv", "-o", "chart.png", "--dpi", "50"]
+        for variant in ("chart@2x.png:2x", "chart.svg", "thumb.jpg:w100"):
+            args += ["--variant", variant]
+        result = runner.invoke(cli, args)
+        assert result.exit_code == 0, result.output
+        sizes = {
+            name: Image.open(name).size
+            for name in ("chart.png", "chart@2x.png", "thumb.jpg")
+        }
+        assert sizes == {
+            "chart.png": (500, 300),
+            "chart@2x.png": (1000, 600),
+            "thumb.jpg": (100, 60),
+        }
+        with open("chart.svg") as fp:
+            assert "<svg" in fp.read()
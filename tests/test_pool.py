@@ -0,0 +1,17 @@
+import time
+
+import pytest
+
+from chartroom.pool import RenderTimeout, time_limit
+
+
+def test_time_limit():
+    with pytest.raises(RenderTimeout):
+        with time_limit(0.05):
+            time.sleep(1)
+    # No limit, and the alarm is cleared after a block that finishes in time
+    with time_limit(0):
+        pass
+    with time_limit(0.05):
+        pass
+    time.sleep(0.1)
@@ -0,0 +1,158 @@
+import json
+
+import pytest
+
+from click.testing import CliRunner
+
+from chartroom import profiling
+from chartroom.cli import cli
+
+
+def _write_csv():
+    with open("data.csv", "w") as f:
+        f.write("name,value\nalice,10\nbob,20\n")
+
+
+def test_profile_json_output():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _write_csv()
+        result = runner.invoke(
+            cli, ["bar", "data.csv", "-o", "out.png", "-f", "json", "--profile"]
+        )
+        assert result.exit_code == 0, result.output
+        data = json.loads(result.stdout)
+        stages = {item["stage"]: item for item in data["profile"]}
+        assert list(stages) == [
+            "load",
+            "detect_format",
+            "resolve_columns",
+            "import_matplotlib",
+            "render",
+            "tight_layout",
+            "savefig",
+            "alt_text",
+            "total",
+        ]
+        assert stages["load"]["rows"] == 2
+        assert stages["render"]["rows"] == 2
+        assert stages["savefig"]["depth"] == 1
+        assert all(item["ms"] >= 0 for item in data["profile"])
+        assert result.stderr == ""
+
+
+def test_profile_to_stderr():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _write_csv()
+        result = runner.invoke(cli, ["pie", "data.csv", "-o", "out.png", "--profile"])
+        assert result.exit_code == 0, result.output
+        assert result.stdout.strip().endswith("out.png")
+        lines = result.stderr.splitlines()
+        assert lines[0] == "Profile:"
+        assert any(line.split()[0] == "savefig" for line in lines[1:])
+        assert "(2 rows)" in result.stderr
+
+
+@pytest.mark.parametrize("jobs", ("1", "2"))
+def test_multi_profile_per_chart_in_json(jobs):
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _write_csv()
+        args = ["multi", "data.csv", "-f", "json", "--profile", "-j", jobs]
+        result = runner.invoke(
+            cli, args + ["--chart", "bar:bar.png", "--chart", "pie:pie.png"]
+        )
+        assert result.exit_code == 0, result.output
+        assert result.stderr == ""
+        lines = [json.loads(line) for line in result.stdout.splitlines()]
+        assert len(lines) == 2
+        for line, chart_type in zip(lines, ("bar", "pie")):
+            stages = [item["stage"] for item in line["profile"]]
+            assert stages[0] == "load"
+            assert f"render_{chart_type}" in stages
+            assert "render" not in stages
+            assert stages[-1] == "total"
+            assert line["profile"][-1]["ms"] > 0
+
+
+def test_profile_cache_stages():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _write_csv()
+        args = ["bar", "data.csv", "-o", "out.png", "-f", "json", "--profile"]
+        args += ["--cache", "cache"]
+        runner.invoke(cli, args)
+        result = runner.invoke(cli, args)
+        stages = [item["stage"] for item in json.loads(result.stdout)["profile"]]
+        assert stages == ["hash_input", "cache_restore", "total"]
+
+
+def test_no_profile_by_default():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _write_csv()
+        result = runner.invoke(cli, ["bar", "data.csv", "-o", "out.png", "-f", "json"])
+        assert "profile" not in json.loads(result.stdout)
+        assert result.stderr == ""
+
+
+def test_stage_is_noop_without_profile():
+    with profiling.stage("load") as stage:
+        stage.rows = 5
+    with profiling.record() as profile:
+        with profiling.stage("outer"):
+            with profiling.stage("inner", rows=3):
+                pass
+    assert [(s.name, s.depth, s.rows) for s in profile.stages] == [
+        ("outer", 0, None),
+        ("inner", 1, 3),
+    ]
+
+
+def test_memory_profile():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _write_csv()
+        result = runner.invoke(
+            cli, ["bar", "data.csv", "-o", "out.png", "-f", "json", "--memory-profile"]
+        )
+        assert result.exit_code == 0, result.output
+        stages = {item["stage"]: item for item in json.loads(result.stdout)["profile"]}
+        assert all("peak_bytes" in item for item in stages.values())
+        assert stages["render"]["peak_bytes"] >= stages["savefig"]["peak_bytes"]
+        assert stages["total"]["peak_bytes"] >= stages["render"]["peak_bytes"] > 0
+        # Allocation sites are only collected for top level stages
+        assert stages["render"]["top_allocations"]
+        assert stages["savefig"]["top_allocations"] == []
+        site = stages["render"]["top_allocations"][0]
+        assert set(site) == {"location", "bytes", "count"}
+
+
+def test_memory_profile_stops_tracing():
+    import tracemalloc
+
+    with profiling.record(memory=True) as profile:
+        with profiling.stage("allocate"):
+            data = [bytearray(1024) for _ in range(100)]
+    del data
+    assert not tracemalloc.is_tracing()
+    assert profile.stages[0].peak_bytes >= 100 * 1024
+    assert profile.peak_bytes >= profile.stages[0].peak_bytes
+
+
+def test_profile_out_writes_pstats():
+    import pstats
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        _write_csv()
+        result = runner.invoke(
+            cli, ["bar", "data.csv", "-o", "out.png", "--profile-out", "run.pstats"]
+        )
+        assert result.exit_code == 0, result.output
+        assert result.stderr == ""
+        stats = pstats.Stats("run.pstats")
+        functions = {name for _, _, name in stats.stats}
+        assert "_render_chart" in functions
+        assert "savefig" in functions
@@ -0,0 +1,218 @@
+import json
+import os
+import socket
+import stat
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import pytest
+
+from chartroom.cli import _forward_to_daemon
+from chartroom.server import (
+    ChartServer,
+    UnixChartServer,
+    _run_cli,
+)
+
+CSV = b"name,value\nalice,10\nbob,20\ncharlie,15\n"
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = ChartServer(("127.0.0.1", 0), jobs=1, max_body=1000, max_pending=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _post(server, path, body=CSV):
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    request = urllib.request.Request(url, data=body, method="POST")
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def test_render_returns_png_and_alt(server):
+    status, headers, body = _post(server, "/render/bar?csv=1&title=Scores")
+    assert status == 200
+    assert headers["Content-Type"] == "image/png"
+    assert body.startswith(b"\x89PNG")
+    assert urllib.parse.unquote(headers["X-Chartroom-Alt"]) == (
+        "Scores. Bar chart of value by name — alice: 10, bob: 20, charlie: 15"
+    )
+
+
+def test_render_multiple_y(server):
+    status, headers, _ = _post(
+        server,
+        "/render/line?x=month&y=a&y=b",
+        b"month,a,b\nJan,1,2\nFeb,3,4\n",
+    )
+    assert status == 200
+    alt = urllib.parse.unquote(headers["X-Chartroom-Alt"])
+    assert alt.endswith("and 1 more series")
+
+
+@pytest.mark.parametrize(
+    "path,body,expected_status,message",
+    (
+        ("/render/donut", CSV, 404, "/render/TYPE"),
+        ("/render/bar?file=/etc/passwd", CSV, 400, "not allowed"),
+        ("/render/bar?sql=a&sql=b", CSV, 400, "not allowed"),
+        ("/render/bar?y=missing", CSV, 400, "not found"),
+        ("/render/bar?dpi=high", CSV, 400, "'dpi'"),
+        ("/render/bar", b"x" * 2000, 413, "exceeds 1000 bytes"),
+    ),
+)
+def test_render_errors(server, path, body, expected_status, message):
+    status, headers, response_body = _post(server, path, body)
+    assert status == expected_status
+    assert message in json.loads(response_body)["error"]
+
+
+@pytest.mark.parametrize("length", ("-1", "lots"))
+def test_render_rejects_invalid_content_length(server, length):
+    with socket.create_connection(server.server_address, timeout=5) as sock:
+        sock.sendall(
+            b"POST /render/bar HTTP/1.0\r\n"
+            + f"Content-Length: {length}\r\n\r\n".encode("ascii")
+            + b"x" * 100
+        )
+        response = b""
+        while chunk := sock.recv(65536):
+            response += chunk
+    head, _, body = response.partition(b"\r\n\r\n")
+    assert head.split()[1] == b"400"
+    assert "Invalid Content-Length" in json.loads(body)["error"]
+
+
+def test_render_rejects_when_busy(server):
+    server.slots.acquire()
+    try:
+        status, _, body = _post(server, "/render/bar")
+    finally:
+        server.slots.release()
+    assert status == 503
+    assert "Too many renders" in json.loads(body)["error"]
+
+
+def test_health(server):
+    url = f"http://127.0.0.1:{server.server_address[1]}/health"
+    with urllib.request.urlopen(url) as response:
+        assert json.loads(response.read()) == {"ok": True}
+
+
+# --- Unix socket daemon and CLI forwarding ---
+
+
+@pytest.fixture
+def unix_server(tmp_path, monkeypatch):
+    socket_path = str(tmp_path / "chartroom.sock")
+    monkeypatch.setenv("CHARTROOM_SOCKET", socket_path)
+    server = UnixChartServer(socket_path, jobs=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_unix_socket_is_private(unix_server):
+    mode = os.stat(unix_server.server_address).st_mode
+    assert stat.S_IMODE(mode) == 0o600
+
+
+def test_forward_to_daemon(unix_server, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data.csv").write_bytes(CSV)
+    exit_code = _forward_to_daemon(["bar", "data.csv", "-o", "out.png", "-f", "alt"])
+    assert exit_code == 0
+    captured = capsys.readouterr()
+    assert captured.out == (
+        "Bar chart of value by name — alice: 10, bob: 20, charlie: 15\n"
+    )
+    assert (tmp_path / "out.png").stat().st_size > 0
+
+
+def test_forward_to_daemon_uses_caller_environment(
+    unix_server, tmp_path, monkeypatch, capsys
+):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data.csv").write_bytes(CSV)
+    # Set after the daemon's workers started, so only the request carries it
+    monkeypatch.setenv("CHARTROOM_CACHE", str(tmp_path / "cache"))
+    exit_code = _forward_to_daemon(["bar", "data.csv", "-o", "out.png"])
+    assert exit_code == 0, capsys.readouterr().err
+    assert (tmp_path / "out.png").stat().st_size > 0
+    assert os.listdir(tmp_path / "cache")
+
+
+def test_forward_to_daemon_ignores_render_timeout(tmp_path, monkeypatch, capsys):
+    socket_path = str(tmp_path / "chartroom.sock")
+    monkeypatch.setenv("CHARTROOM_SOCKET", socket_path)
+    # Far less time than any chart takes to render
+    server = UnixChartServer(socket_path, jobs=1, timeout=0.001)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "data.csv").write_bytes(CSV)
+        exit_code = _forward_to_daemon(["bar", "data.csv", "-o", "out.png"])
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert exit_code == 0, capsys.readouterr().err
+    assert (tmp_path / "out.png").stat().st_size > 0
+
+
+def test_forward_to_daemon_error(unix_server, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data.csv").write_bytes(CSV)
+    exit_code = _forward_to_daemon(["bar", "data.csv", "-y", "missing"])
+    assert exit_code == 1
+    assert "Column 'missing' not found" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "args", (["styles"], ["bar", "--help"], ["--version"], [], ["serve"])
+)
+def test_forward_to_daemon_skips_non_chart_commands(unix_server, args):
+    assert _forward_to_daemon(args) is None
+
+
+def test_forward_to_daemon_without_daemon(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHARTROOM_SOCKET", str(tmp_path / "missing.sock"))
+    assert _forward_to_daemon(["bar", "data.csv"]) is None
+    monkeypatch.setenv("CHARTROOM_SOCKET", "")
+    assert _forward_to_daemon(["bar", "data.csv"]) is None
+
+
+def test_run_cli_with_stdin(tmp_path):
+    status, exit_code, stdout, stderr = _run_cli(
+        ["line", "--csv", "-o", "out.png"], str(tmp_path), CSV
+    )
+    assert (status, exit_code, stderr) == ("ok", 0, "")
+    assert stdout == str(tmp_path / "out.png") + "\n"
+
+
+def test_run_cli_without_stdin(tmp_path):
+    _, exit_code, _, stderr = _run_cli(["bar"], str(tmp_path), None)
+    assert exit_code == 2
+    assert "Provide a FILE argument" in stderr
+
+
+def test_stale_socket_is_replaced(tmp_path):
+    socket_path = str(tmp_path / "stale.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)
+    stale.close()
+    server = UnixChartServer(socket_path, jobs=1)
+    server.server_close()
+    assert not os.path.exists(socket_path)
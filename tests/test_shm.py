@@ -0,0 +1,127 @@
+import os
+from multiprocessing import shared_memory
+
+import pytest
+from click.testing import CliRunner
+
+from chartroom.charts import RowColumns
+from chartroom.cli import cli
+from chartroom.shm import SharedColumns, attach
+
+ROWS = [
+    {"name": "alice", "value": "10", "score": 1.5},
+    {"name": "bob", "value": "20", "score": 2},
+    {"name": "charlie", "value": "15", "score": 3},
+]
+
+
+def _block_exists(name):
+    try:
+        block = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return False
+    block.close()
+    return True
+
+
+def test_shared_columns_round_trip():
+    columns = RowColumns(ROWS)
+    charts = [("bar", "name", ["value"]), ("scatter", "score", ["value"])]
+    with SharedColumns(columns, charts) as shared:
+        assert sorted(shared.handle) == [
+            "labels:name",
+            "labels:score",
+            "numbers:score",
+            "numbers:value",
+            "offsets:name",
+            "offsets:score",
+        ]
+        with attach(shared.handle) as attached:
+            assert attached.count == 3
+            assert list(attached.labels("name")) == ["alice", "bob", "charlie"]
+            assert list(attached.numbers("value")) == [10.0, 20.0, 15.0]
+            assert list(attached.x_values("scatter", "score")) == [1.5, 2.0, 3.0]
+            assert attached.x_values("histogram", "name") is None
+            assert attached.label("name", 1) == "bob"
+            assert attached.label("score", 0) == "1.5"
+            assert attached.label("missing", 0) == ""
+            with pytest.raises(ValueError):
+                attached.numbers("value")[0] = 1
+
+
+def test_shared_labels_are_not_padded():
+    rows = [{"name": "x" * 1000, "value": 1}]
+    rows += [{"name": f"é{i}", "value": i} for i in range(999)]
+    columns = RowColumns(rows)
+    with SharedColumns(columns, [("bar", "name", ["value"])]) as shared:
+        _, _, length = shared.handle["labels:name"]
+        assert length == sum(
+            len(name.encode("utf-8")) for name in columns.labels("name")
+        )
+        with attach(shared.handle) as attached:
+            assert attached.labels("name") == columns.labels("name")
+            assert attached.label("name", 5) == "é4"
+
+
+def test_shared_columns_unlinked_on_exit():
+    with SharedColumns(RowColumns(ROWS), [("bar", "name", ["value"])]) as shared:
+        names = [name for name, _, _ in shared.handle.values()]
+        assert all(_block_exists(name) for name in names)
+    assert not any(_block_exists(name) for name in names)
+    # Closing again is harmless
+    shared.close()
+
+
+def test_shared_columns_unlinked_on_error():
+    created = []
+    original = shared_memory.SharedMemory.__init__
+
+    def record(self, *args, **kwargs):
+        original(self, *args, **kwargs)
+        created.append(self.name)
+
+    charts = [("bar", "name", ["value", "name"])]
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(shared_memory.SharedMemory, "__init__", record)
+        with pytest.raises(ValueError):
+            # name cannot be converted to numbers
+            SharedColumns(RowColumns(ROWS), charts)
+    assert created
+    assert not any(_block_exists(name) for name in created)
+
+
+def test_multi_jobs_matches_serial():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("data.csv", "w") as f:
+            f.write("name,value\nalice,10\nbob,20\ncharlie,15\n")
+        charts = ["--chart", "bar:bar.png", "--chart", "pie:pie.png"]
+        charts += ["--chart", "histogram:hist.png"]
+        serial = runner.invoke(cli, ["multi", "data.csv", "-f", "alt"] + charts)
+        assert serial.exit_code == 0, serial.output
+        for name in ("bar.png", "pie.png", "hist.png"):
+            os.remove(name)
+        parallel = runner.invoke(
+            cli, ["multi", "data.csv", "-f", "alt", "-j", "2"] + charts
+        )
+        assert parallel.exit_code == 0, parallel.output
+        assert parallel.output == serial.output
+        for name in ("bar.png", "pie.png", "hist.png"):
+            assert os.path.getsize(name) > 0
+
+
+def test_multi_jobs_scatter_alt_text_matches_serial():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("s.csv", "w") as f:
+            f.write("x,y\n10.50,1\n2.25,3\n")
+        args = ["multi", "s.csv", "-f", "alt"]
+        args += ["--chart", "scatter:a.png", "--chart", "histogram:b.png"]
+        serial = runner.invoke(cli, args)
+        assert serial.exit_code == 0, serial.output
+        assert serial.output.startswith("Scatter plot of y by x — 10.50: 1")
+        os.remove("a.png")
+        os.remove("b.png")
+        parallel = runner.invoke(cli, args + ["-j", "2"])
+        assert parallel.exit_code == 0, parallel.output
+        assert parallel.output == serial.output
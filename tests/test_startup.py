@@ -0,0 +1,96 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Importing these takes hundreds of milliseconds, so commands that never
+# render a chart should not pay for them
+HEAVY_MODULES = ("matplotlib", "numpy", "PIL")
+
+RUN_CLI = """
+import sys
+from chartroom.cli import cli
+try:
+    cli.main(args=sys.argv[1:], prog_name="chartroom")
+except SystemExit:
+    pass
+heavy = sorted(m for m in sys.modules if m.split(".")[0] in {heavy!r})
+sys.stderr.write("\\nHEAVY:" + ",".join(heavy))
+""".format(heavy=HEAVY_MODULES)
+
+
+def _heavy_modules_loaded(args, cwd):
+    result = subprocess.run(
+        [sys.executable, "-c", RUN_CLI, *args],
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+        env=dict(os.environ, CHARTROOM_SOCKET=""),
+    )
+    return [m for m in result.stderr.rsplit("HEAVY:", 1)[1].split(",") if m]
+
+
+@pytest.mark.parametrize(
+    "args",
+    (
+        ["--help"],
+        ["--version"],
+        ["bar", "--help"],
+        ["batch", "--help"],
+        ["bar", "--sql", "data.db"],
+        ["bar", "--sql", "data.db", "SELECT 1", "--csv"],
+        ["bar", "--csv", "--tsv", "data.csv"],
+        ["bar", "data.csv", "-y", "missing"],
+    ),
+)
+def test_non_render_commands_skip_heavy_imports(args, tmp_path):
+    (tmp_path / "data.csv").write_text("name,value\nalice,10\n")
+    assert _heavy_modules_loaded(args, tmp_path) == []
+
+
+def test_render_imports_matplotlib(tmp_path):
+    (tmp_path / "data.csv").write_text("name,value\nalice,10\n")
+    loaded = _heavy_modules_loaded(["bar", "data.csv", "-o", "out.png"], tmp_path)
+    assert "matplotlib" in loaded
+    assert (tmp_path / "out.png").exists()
+
+
+@pytest.mark.parametrize(
+    "args,output",
+    (
+        (["-o", "out.svg"], "out.svg"),
+        (["-y", "a", "-y", "b"], "chart.svg"),
+    ),
+)
+def test_svg_lite_backend_skips_heavy_imports(args, output, tmp_path):
+    (tmp_path / "data.csv").write_text("name,a,b\nalice,10,3\nbob,20,4\n")
+    args = ["line", "data.csv", "--backend", "svg-lite", *args]
+    assert _heavy_modules_loaded(args, tmp_path) == []
+    assert (tmp_path / output).read_text().startswith("<?xml")
+
+
+def test_terminal_preview_skips_heavy_imports(tmp_path):
+    (tmp_path / "data.csv").write_text("name,value\nalice,10\n")
+    args = ["scatter", "data.csv", "-x", "value", "--terminal"]
+    assert _heavy_modules_loaded(args, tmp_path) == []
+
+
+def test_cli_import_time():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import chartroom.cli"],
+        capture_output=True,
+        text=True,
+    )
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    timings = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                timings[name.strip()] = int(cumulative)
+    assert "chartroom.cli" in timings
+    heavy = [name for name in timings if name.split(".")[0] in HEAVY_MODULES]
+    assert heavy == [], "chartroom.cli took {:.0f}ms to import".format(
+        timings["chartroom.cli"] / 1000
+    )
@@ -0,0 +1,48 @@
+import pytest
+
+from chartroom.alt import rows_alt_text
+from chartroom.stats import summarize, summarize_list
+
+
+@pytest.mark.parametrize("summarize_fn", (summarize, summarize_list))
+def test_summarize(summarize_fn):
+    summary = summarize_fn([3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0])
+    assert summary.count == 8
+    assert summary.total == 31.0
+    assert (summary.min, summary.argmin) == (1.0, 1)
+    assert (summary.max, summary.argmax) == (9.0, 5)
+    assert summary.top == [5, 7, 4]
+
+
+@pytest.mark.parametrize(
+    "values,top",
+    (
+        # Ties keep the earliest values, as a stable sort would
+        ([1.0, 5.0, 5.0, 5.0, 5.0], [1, 2, 3]),
+        ([5.0, 1.0, 7.0, 5.0, 5.0, 2.0], [2, 0, 3]),
+        ([2.0, 1.0], [0, 1]),
+        ([], []),
+    ),
+)
+@pytest.mark.parametrize("summarize_fn", (summarize, summarize_list))
+def test_summarize_top_matches_sort(values, top, summarize_fn):
+    assert summarize_fn(values).top == top
+    expected = sorted(range(len(values)), key=lambda i: values[i], reverse=True)
+    assert top == expected[:3]
+
+
+@pytest.mark.parametrize("summarize_fn", (summarize, summarize_list))
+def test_summarize_empty(summarize_fn):
+    summary = summarize_fn([])
+    assert (summary.count, summary.min, summary.argmax) == (0, None, None)
+
+
+def test_alt_text_uses_renderer_summaries():
+    rows = [{"name": f"n{i}", "value": "not scanned again"} for i in range(10)]
+    values = [float(i % 7) for i in range(10)]
+    alt = rows_alt_text(
+        "bar", rows, "name", ["value"], summaries={"value": summarize(values)}
+    )
+    assert alt == (
+        "Bar chart of value by name. 10 points, ranging from 0 (n0) to 6 (n6)"
+    )
@@ -0,0 +1,111 @@
+import io
+import json
+import math
+import xml.dom.minidom
+
+import pytest
+from click.testing import CliRunner
+
+from chartroom import svglite
+from chartroom.cli import cli
+from chartroom.stats import summarize
+
+CSV = "month,a,b\nJan,1,4\nFeb,3,2\nMar,2,5\n"
+
+
+def _render(plot_fn, labels, series, **kwargs):
+    buffer = io.BytesIO()
+    summaries = plot_fn(labels, series, buffer, **kwargs)
+    return xml.dom.minidom.parseString(buffer.getvalue()), summaries
+
+
+def _texts(dom):
+    return [node.firstChild.data for node in dom.getElementsByTagName("text")]
+
+
+def test_plot_bar():
+    dom, summaries = _render(
+        svglite.plot_bar,
+        ["Jan", "Feb", "Mar"],
+        {"a": [1.0, 3.0, 2.0], "b": [4.0, -2.0, 5.0]},
+        title="Sales <& costs>",
+        xlabel="Month",
+        ylabel="Total",
+        width=4,
+        height=3,
+    )
+    svg = dom.documentElement
+    assert (svg.getAttribute("width"), svg.getAttribute("height")) == ("288pt", "216pt")
+    texts = _texts(dom)
+    assert {"Sales <& costs>", "Month", "Total", "Jan", "Feb", "Mar"} <= set(texts)
+    # The legend names each series
+    assert {"a", "b"} <= set(texts)
+    # One bar per value, plus the frame and the legend box and swatches
+    fills = [rect.getAttribute("fill") for rect in dom.getElementsByTagName("rect")]
+    assert fills.count(svglite.COLORS[0]) == 4
+    assert fills.count(svglite.COLORS[1]) == 4
+    for name, values in (("a", [1.0, 3.0, 2.0]), ("b", [4.0, -2.0, 5.0])):
+        expected = summarize(values)
+        assert (summaries[name].argmax, summaries[name].top) == (
+            expected.argmax,
+            expected.top,
+        )
+
+
+def test_plot_line_breaks_at_missing_values():
+    dom, _ = _render(
+        svglite.plot_line, list("abcde"), {"v": [1.0, 2.0, math.nan, 4.0, 5.0]}
+    )
+    polylines = dom.getElementsByTagName("polyline")
+    assert [len(p.getAttribute("points").split()) for p in polylines] == [2, 2]
+    assert len(dom.getElementsByTagName("circle")) == 4
+    # A single series needs no legend
+    assert "v" not in _texts(dom)
+
+
+@pytest.mark.parametrize(
+    "step,value,expected",
+    ((1, 3.0, "3"), (0.25, 0.5, "0.50"), (0.2, -0.0, "0.0"), (2.5, 7.5, "7.5")),
+)
+def test_format_tick(step, value, expected):
+    assert svglite._format_tick(value, step) == expected
+
+
+def test_cli_svg_lite_backend():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("data.csv", "w") as f:
+            f.write(CSV)
+        result = runner.invoke(
+            cli, ["line", "data.csv", "-y", "a", "-y", "b", "--backend", "svg-lite"]
+        )
+        assert result.exit_code == 0, result.output
+        assert result.output.strip().endswith("chart.svg")
+        xml.dom.minidom.parse("chart.svg")
+        result = runner.invoke(
+            cli,
+            ["bar", "data.csv", "-y", "a", "--backend", "svg-lite", "-f", "json"],
+        )
+        assert result.exit_code == 0, result.output
+        output = json.loads(result.output)
+        assert output["path"].endswith("chart-2.svg")
+        assert output["alt"] == "Bar chart of a by month — Jan: 1, Feb: 3, Mar: 2"
+
+
+@pytest.mark.parametrize(
+    "args,error",
+    (
+        (["-o", "chart.png"], "--backend svg-lite can only write .svg files"),
+        (["--style", "ggplot"], "--style cannot be used with --backend svg-lite"),
+        (["--variant", "x.svg"], "--variant cannot be used with --backend svg-lite"),
+        (["--watch"], "--backend svg-lite cannot be used with --watch or --live"),
+    ),
+)
+def test_cli_svg_lite_unsupported_options(args, error):
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("data.csv", "w") as f:
+            f.write(CSV)
+        result = runner.invoke(cli, ["bar", "data.csv", "--backend", "svg-lite"] + args)
+        assert result.exit_code != 0
+        assert error in result.output
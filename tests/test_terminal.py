@@ -0,0 +1,115 @@
+import math
+
+import pytest
+from click.testing import CliRunner
+
+from chartroom import terminal
+from chartroom.cli import cli
+
+CSV = "month,a,b\nJan,1,4\nFeb,3,2\nMar,2,5\n"
+
+
+def test_plot_bar():
+    text = terminal.plot_bar(
+        ["alice", "bob", "a-very-long-name-indeed"], {"value": [10, 5, 2.5]}, 40
+    )
+    assert text.splitlines() == [
+        "alice                │█████████████ 10",
+        "bob                  │██████▌ 5",
+        "a-very-long-name-in… │███▎ 2.5",
+    ]
+
+
+def test_plot_bar_leaves_out_categories_that_do_not_fit():
+    labels = [str(i) for i in range(50)]
+    lines = terminal.plot_bar(labels, {"v": [1.0] * 50}, 40, 10).splitlines()
+    assert len(lines) == 10
+    assert lines[-1] == "… 41 more"
+
+
+def test_plot_bar_all_nan():
+    text = terminal.plot_bar(["x", "y"], {"v": [math.nan, math.nan]}, 40)
+    assert text.splitlines() == ["x │ nan", "y │ nan"]
+
+
+def test_cli_terminal_bar_all_nan():
+    result = CliRunner().invoke(
+        cli, ["bar", "--csv", "--terminal"], input="a,b\nx,nan\ny,nan\n"
+    )
+    assert result.exit_code == 0, result.output
+    assert "nan" in result.output
+
+
+def test_histogram_bins_match_numpy():
+    np = pytest.importorskip("numpy")
+    values = [1.0, 2.0, 2.0, 3.0, 7.0, 7.0, math.nan]
+    edges, counts = terminal.histogram_bins(values, 4)
+    expected_counts, expected_edges = np.histogram(values[:-1], 4)
+    assert counts == list(expected_counts)
+    assert edges == pytest.approx(list(expected_edges))
+
+
+@pytest.mark.parametrize("bins", (0, -3))
+def test_cli_terminal_histogram_invalid_bins(bins):
+    result = CliRunner().invoke(
+        cli,
+        ["histogram", "--csv", "-y", "a", "--terminal", "--bins", str(bins)],
+        input=CSV,
+    )
+    assert result.exit_code == 1
+    assert "Error: --bins must be at least 1" in result.output
+
+
+def test_plot_line_size_does_not_grow_with_points():
+    values = [math.sin(i / 1000) for i in range(100_000)]
+    labels = [str(i) for i in range(len(values))]
+    lines = terminal.plot_line(labels, {"v": values}, 60, 12).splitlines()
+    assert len(lines) == 12
+    assert max(len(line) for line in lines) <= 60
+    assert lines[-1].split() == ["0", "99999"]
+    assert lines[0].startswith(" 1 ┤")
+    assert lines[-3].startswith("-1 ┤")
+
+
+def test_plot_scatter_legend_for_several_series():
+    text = terminal.plot_scatter([1, 2, 3], {"a": [1, 4, 9], "b": [2, 2, 2]}, 40, 10)
+    assert "\x1b[34m⣿\x1b[0m a  \x1b[33m⣿\x1b[0m b" in text.splitlines()[-1]
+
+
+def test_cli_terminal(monkeypatch):
+    monkeypatch.setenv("COLUMNS", "40")
+    monkeypatch.setenv("LINES", "11")
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("data.csv", "w") as f:
+            f.write(CSV)
+        result = runner.invoke(
+            cli, ["line", "data.csv", "-y", "a", "-y", "b", "--terminal"]
+        )
+        assert result.exit_code == 0, result.output
+        lines = result.output.splitlines()
+        assert len(lines) == 10
+        # click strips the colors when stdout is not a terminal
+        assert lines[-1] == "⣿ a  ⣿ b"
+        assert lines[-2].split() == ["Jan", "Mar"]
+        result = runner.invoke(
+            cli, ["histogram", "data.csv", "-y", "b", "--bins", "2", "--terminal"]
+        )
+        assert result.exit_code == 0, result.output
+        assert result.output.splitlines() == [
+            "2 – 3.5 │" + "█" * 14 + " 1",
+            "3.5 – 5 │" + "█" * 28 + " 2",
+        ]
+
+
+@pytest.mark.parametrize(
+    "args", (["-o", "out.png"], ["-f", "json"], ["--variant", "x.svg"], ["--watch"])
+)
+def test_cli_terminal_conflicting_options(args):
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("data.csv", "w") as f:
+            f.write(CSV)
+        result = runner.invoke(cli, ["bar", "data.csv", "--terminal"] + args)
+        assert result.exit_code == 2
+        assert "--terminal prints the chart" in result.output
@@ -0,0 +1,30 @@
+from click.testing import CliRunner
+
+from chartroom.cli import cli
+from chartroom.warmup import available_styles, check_style
+
+
+def test_warmup_times_each_step():
+    result = CliRunner().invoke(cli, ["warmup", "--render"])
+    assert result.exit_code == 0, result.output
+    lines = result.output.splitlines()
+    assert lines[0].startswith("Font cache: ")
+    assert lines[0].endswith(".json")
+    stages = [line.split()[0] for line in lines[2:]]
+    assert stages[:4] == ["import_matplotlib", "font_cache", "import_pyplot", "styles"]
+    assert set(available_styles()) <= set(stages)
+    assert stages[-4:] == ["render", "tight_layout", "savefig", "total"]
+
+
+def test_check_style_reports_problems():
+    assert check_style("ggplot") == []
+    [problem] = check_style("no-such-style")
+    assert problem.startswith("no-such-style: ")
+
+
+def test_styles_lists_public_styles():
+    result = CliRunner().invoke(cli, ["styles"])
+    assert result.exit_code == 0
+    assert result.output.splitlines() == available_styles()
+    assert "ggplot" in result.output
+    assert "_classic_test_patch" not in result.output